@@ -0,0 +1,98 @@
+"""
+Measure EventsWorker.push() throughput from many threads while the worker
+holds a deep backlog of batches waiting to be retried.
+
+    PYTHONPATH=. python benchmarks/events_push.py [--threads N] [--pushes N]
+
+The backlog is put in place before the threads start and the worker sleeps
+throughout, so only push() is timed; the queue limit is sized so no push is
+dropped.
+"""
+
+import argparse
+import threading
+import time
+
+from honeybadger.config import Configuration
+from honeybadger.events_worker import EventBatch, EventsWorker
+from honeybadger.types import EventsSendResult, EventsSendStatus
+
+
+class FailingConnection:
+    def send_events(self, config, batch):
+        return EventsSendResult(EventsSendStatus.ERROR, "benchmark")
+
+
+def make_worker(backlog, batch_size, pushes):
+    config = Configuration(
+        api_key="bench",
+        endpoint="http://localhost",
+        environment="bench",
+        events_batch_size=pushes + 1,  # no batch forms while threads push
+        events_max_queue_size=backlog * batch_size + pushes,
+        events_max_queue_bytes=(backlog * batch_size + pushes) * 1024,
+        events_timeout=3600,
+        events_max_batch_retries=1_000_000,
+        events_throttle_wait=3600,
+    )
+    worker = EventsWorker(FailingConnection(), config)
+    # A backlog as left by earlier failed sends, each batch holding its places
+    with worker._lock:
+        for n in range(backlog):
+            batch = EventBatch()
+            for i in range(batch_size):
+                batch.add({"event_type": "backlog", "batch": n, "i": i})
+            lane = worker._lanes[batch.lane]
+            lane.slots.take(len(batch))
+            lane.byte_budget.take(batch.cost)
+            worker._batched_cost += batch.cost
+            worker._batches.append((batch, 1, None))
+    return worker
+
+
+def push_rate(worker, threads, pushes):
+    per_thread = pushes // threads
+    start = threading.Barrier(threads + 1)
+    event = {"event_type": "bench", "duration": 1.25}
+
+    def push_many():
+        start.wait()
+        for _ in range(per_thread):
+            worker.push(event)
+
+    workers = [threading.Thread(target=push_many) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    start.wait()
+    began = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - began
+    return per_thread * threads / elapsed
+
+
+def run(threads, pushes, batch_size):
+    print("{:>16} {:>16} {:>16}".format("retry batches", "queued events", "pushes/sec"))
+    for backlog in (0, 100, 1_000, 10_000):
+        worker = make_worker(backlog, batch_size, pushes)
+        rate = push_rate(worker, threads, pushes)
+        dropped = worker.get_stats()["dropped_events"]
+        worker._stop_event.set()  # don't wait on the backlog
+        worker._batch_ready_event.set()
+        print(
+            "{:>16,} {:>16,} {:>16,.0f}{}".format(
+                backlog,
+                backlog * batch_size,
+                rate,
+                " ({} dropped)".format(dropped) if dropped else "",
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--pushes", type=int, default=640_000)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+    run(args.threads, args.pushes, args.batch_size)
@@ -0,0 +1,86 @@
+"""
+Compare notice and event-batch encoding throughput for each JSON backend.
+
+    PYTHONPATH=. python benchmarks/serializer.py [--repeat N]
+
+"stdlib-encoder" is the StringReprJSONEncoder path notices and events used
+before honeybadger.serializer existed.
+"""
+
+import argparse
+import datetime
+import json
+import timeit
+
+from honeybadger import serializer
+from honeybadger.config import Configuration
+from honeybadger.notice import Notice
+from honeybadger.utils import StringReprJSONEncoder, encode_events
+
+
+def make_notice_payload():
+    config = Configuration(api_key="bench", report_local_variables=True)
+    try:
+        raise ValueError("benchmark")
+    except ValueError as e:
+        notice = Notice(
+            exception=e,
+            context={"user_id": 42, "plan": "enterprise", "tags": ["a", "b"]},
+            config=config,
+        )
+    return notice.payload
+
+
+def make_event_batch(size=1000):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        {
+            "ts": now.isoformat(),
+            "event_type": "db.query",
+            "query": "SELECT * FROM users WHERE id = %s",
+            "duration": 1.25 + i,
+            "request_id": "req-{}".format(i),
+            "params": [i, "x" * 20],
+            "started": now,  # repr'd
+        }
+        for i in range(size)
+    ]
+
+
+def stdlib_encoder(obj):
+    return json.dumps(obj, cls=StringReprJSONEncoder).encode("utf-8")
+
+
+def run(repeat):
+    notice = make_notice_payload()
+    batch = make_event_batch()
+
+    cases = [("stdlib-encoder", None)] + [
+        (name, name) for name in serializer.available_backends()
+    ]
+    print(
+        "{:<16} {:>16} {:>20}".format("backend", "notices/sec", "events/sec (batched)")
+    )
+    for label, name in cases:
+        if name is None:
+            encode_notice = lambda: stdlib_encoder(notice)
+            encode_batch = lambda: b"\n".join(stdlib_encoder(e) for e in batch)
+        else:
+            serializer.use(name)
+            encode_notice = lambda: serializer.dumps(notice)
+            encode_batch = lambda: encode_events(batch)
+
+        notice_time = min(timeit.repeat(encode_notice, number=200, repeat=repeat))
+        batch_time = min(timeit.repeat(encode_batch, number=5, repeat=repeat))
+        print(
+            "{:<16} {:>16,.0f} {:>20,.0f}".format(
+                label, 200 / notice_time, 5 * len(batch) / batch_time
+            )
+        )
+    serializer.use()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    run(parser.parse_args().repeat)
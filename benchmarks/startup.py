@@ -0,0 +1,60 @@
+"""
+Measure what `import honeybadger` and constructing Honeybadger() cost a
+process that never sends anything, each in a fresh interpreter.
+
+    PYTHONPATH=. python benchmarks/startup.py [--runs N]
+
+For a per-module breakdown of the import, use `python -X importtime -c
+"import honeybadger"`.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, threading, time
+began = time.perf_counter()
+import honeybadger
+imported = time.perf_counter()
+from honeybadger.core import Honeybadger
+Honeybadger()
+constructed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - began) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "threads": sorted(t.name for t in threading.enumerate()),
+}))
+"""
+
+
+def probe():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def run(runs):
+    results = [probe() for _ in range(runs)]
+    for key, label in (
+        ("import_ms", "import honeybadger"),
+        ("construct_ms", "Honeybadger()"),
+    ):
+        times = [r[key] for r in results]
+        print(
+            "{:<20} median {:>8.2f} ms   min {:>8.2f} ms".format(
+                label, statistics.median(times), min(times)
+            )
+        )
+    threads = results[-1]["threads"]
+    print("{:<20} {} ({})".format("threads", len(threads), ", ".join(threads)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    run(args.runs)
@@ -26,6 +26,8 @@ def _register_signal_handler():
         if callable(orig):
             orig(signum, frame)
         else:
+            # honeybadger.shutdown() runs from atexit, delivering what it can
+            # within shutdown_timeout
             sys.exit(0)
 
     signal.signal(signal.SIGTERM, _on_term)
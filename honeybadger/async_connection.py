@@ -0,0 +1,315 @@
+"""
+asyncio counterpart of honeybadger.connection.
+
+Requests are written over non-blocking sockets opened with
+asyncio.open_connection, so reporting from a coroutine never blocks the event
+loop or starts a thread. Keep-alive connections are pooled per event loop.
+"""
+
+import asyncio
+import logging
+import ssl
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+from urllib.error import URLError
+from urllib.parse import urlsplit
+from urllib import request
+
+from .http_pool import PoolKey, PooledResponse, _pool_key, _uses_proxy, default_pool
+from .connection import (
+    _circuit_open,
+    _events_request,
+    _events_result,
+    _log_notice_result,
+    _notice_body,
+    _notice_body_request,
+    _notice_result,
+    _record_status,
+    _retry_after,
+    circuit_breaker,
+    scheduler,
+    send_notice_body,
+)
+from .scheduler import NOTICE
+from .types import EventsSendResult, EventsSendStatus
+
+logger = logging.getLogger(__name__)
+
+Stream = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+_NETWORK_ERRORS = (
+    OSError,
+    asyncio.IncompleteReadError,
+    asyncio.TimeoutError,
+    ValueError,
+)
+
+
+class AsyncHTTPConnectionPool:
+    """
+    Keeps idle keep-alive streams per event loop and (scheme, host, port).
+    Mirrors HTTPConnectionPool: error statuses are returned, network failures
+    are raised as URLError, and a stale pooled stream is retried once.
+    """
+
+    def __init__(self, maxsize: int = 4, idle_timeout: float = 50.0) -> None:
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+
+        self._idle: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[PoolKey, List[Tuple[Stream, float]]]]" = (weakref.WeakKeyDictionary())
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def urlopen(
+        self,
+        req: request.Request,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+    ) -> PooledResponse:
+        if connect_timeout is None:
+            connect_timeout = timeout
+
+        parts = urlsplit(req.full_url)
+        if _uses_proxy(parts):
+            # Proxy support comes from urllib, which only blocks.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, default_pool.urlopen, req, timeout)
+
+        key = _pool_key(parts)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        body: bytes = req.data or b""  # type: ignore[assignment]
+        head = self._request_head(req, key, path, len(body))
+
+        stream, reused = await self._checkout(key, connect_timeout)
+        try:
+            response, keep_alive = await asyncio.wait_for(
+                self._send(stream, head, body), timeout
+            )
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self._close(stream)
+            if not reused:
+                raise URLError(e)
+            logger.debug("Pooled stream to %s:%s went stale; reconnecting", *key[1:])
+            stream = await self._connect(key, connect_timeout)
+            try:
+                response, keep_alive = await asyncio.wait_for(
+                    self._send(stream, head, body), timeout
+                )
+            except _NETWORK_ERRORS as e:
+                self._close(stream)
+                raise URLError(e)
+        except _NETWORK_ERRORS as e:
+            self._close(stream)
+            raise URLError(e)
+
+        if keep_alive:
+            self._checkin(key, stream)
+        else:
+            self._close(stream)
+        return response
+
+    def clear(self) -> None:
+        idle, self._idle = self._idle, weakref.WeakKeyDictionary()
+        for by_key in idle.values():
+            for streams in by_key.values():
+                for stream, _ in streams:
+                    self._close(stream)
+
+    async def _checkout(
+        self, key: PoolKey, timeout: Optional[float]
+    ) -> Tuple[Stream, bool]:
+        now = time.monotonic()
+        streams = self._idle.get(asyncio.get_running_loop(), {}).get(key, [])
+        while streams:
+            stream, last_used = streams.pop()
+            if now - last_used < self.idle_timeout and not stream[0].at_eof():
+                return stream, True
+            self._close(stream)
+        return await self._connect(key, timeout), False
+
+    def _checkin(self, key: PoolKey, stream: Stream) -> None:
+        by_key = self._idle.setdefault(asyncio.get_running_loop(), {})
+        streams = by_key.setdefault(key, [])
+        if len(streams) < self.maxsize:
+            streams.append((stream, time.monotonic()))
+        else:
+            self._close(stream)
+
+    async def _connect(self, key: PoolKey, timeout: Optional[float]) -> Stream:
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context), timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise URLError(e)
+
+    @staticmethod
+    def _request_head(
+        req: request.Request, key: PoolKey, path: str, content_length: int
+    ) -> bytes:
+        scheme, host, port = key
+        default_port = 443 if scheme == "https" else 80
+        host_header = host if port == default_port else "{}:{}".format(host, port)
+        lines = [
+            "{} {} HTTP/1.1".format(req.get_method(), path),
+            "Host: {}".format(host_header),
+        ]
+        lines += ["{}: {}".format(k, v) for k, v in req.header_items()]
+        lines.append("Content-Length: {}".format(content_length))
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    @staticmethod
+    async def _send(
+        stream: Stream, head: bytes, body: bytes
+    ) -> Tuple[PooledResponse, bool]:
+        reader, writer = stream
+        writer.write(head)
+        writer.write(body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1"
+        connection_header = headers.get("connection", "").lower()
+        if connection_header == "close":
+            keep_alive = False
+        elif connection_header == "keep-alive":
+            keep_alive = True
+
+        if "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await reader.read()
+            keep_alive = False
+
+        return PooledResponse(int(status), headers, data), keep_alive
+
+    @staticmethod
+    def _close(stream: Stream) -> None:
+        stream[1].close()
+
+
+default_async_pool = AsyncHTTPConnectionPool()
+
+
+async def send_notice(config, notice) -> Optional[str]:
+    """
+    Send a notice without blocking the event loop, and wait for the result.
+    Unless force_sync is set, a notice that could not be delivered is handed
+    to the notices worker, which retries it as it would a notice from notify().
+    So is one whose send is cancelled, as when its event loop closes.
+    """
+    payload = notice.payload
+    notice_id = payload.get("error", {}).get("token", None)
+
+    body = _notice_body(config, payload)
+    request_object = _notice_body_request(config, body)
+    if request_object is None:
+        return notice_id
+
+    try:
+        # Wait for the scheduler as the notices worker would, without blocking.
+        wait = scheduler.reserve(config, NOTICE)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = scheduler.reserve(config, NOTICE)
+
+        response, failure = await _urlopen(config, request_object)
+    except asyncio.CancelledError:
+        # e.g. the loop closing at the end of asyncio.run(): the notice
+        # threads outlive it
+        logger.debug("Notice send cancelled; queuing it on the notices worker")
+        send_notice_body(config, body)
+        raise
+
+    result = failure or _notice_result(response.getcode(), _retry_after(response))
+    if result.status == EventsSendStatus.THROTTLING:
+        scheduler.throttled(result.retry_after, float(config.notices_throttle_wait))
+    elif result.status in (EventsSendStatus.OK, EventsSendStatus.REJECTED):
+        scheduler.delivered()
+
+    if config.force_sync or result.status in (
+        EventsSendStatus.OK,
+        EventsSendStatus.REJECTED,
+    ):
+        _log_notice_result(result)
+    else:
+        logger.debug(
+            "Notice not sent (%s); queuing it for retry",
+            result.reason or result.status.value,
+        )
+        send_notice_body(config, body)
+    return notice_id
+
+
+async def send_events(config, payload) -> EventsSendResult:
+    """Coroutine version of connection.send_events."""
+    if not config.api_key:
+        return EventsSendResult(EventsSendStatus.ERROR, "missing api key")
+
+    req = _events_request(config, payload)
+
+    response, failure = await _urlopen(config, req)
+    if failure is not None:
+        return failure
+
+    return _events_result(response.getcode(), len(payload), _retry_after(response))
+
+
+async def _urlopen(config, request_object):
+    """Coroutine version of connection._urlopen."""
+    wait = circuit_breaker.before_send(
+        config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+    )
+    if wait is not None:
+        return None, _circuit_open(wait)
+
+    try:
+        response = await default_async_pool.urlopen(
+            request_object,
+            timeout=config.read_timeout,
+            connect_timeout=config.connect_timeout,
+        )
+    except URLError as e:
+        circuit_breaker.record_failure(
+            config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+        )
+        return None, EventsSendResult(EventsSendStatus.ERROR, str(e.reason))
+    except BaseException:
+        # Whatever went wrong, a half-open trial must not stay in flight
+        circuit_breaker.record_failure(
+            config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+        )
+        raise
+
+    _record_status(config, response.getcode())
+    return response, None
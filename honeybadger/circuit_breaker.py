@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .utils import reinit_after_fork
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops sending to an endpoint that keeps failing. After `threshold`
+    consecutive failures the breaker opens and sends are refused for
+    `cooldown` seconds. Then a single trial send is let through (half open):
+    if it succeeds the breaker closes, otherwise it opens again.
+
+    Thresholds are passed in on each call so they follow the current config.
+    A threshold of 0 disables the breaker.
+    """
+
+    # How long to tell callers to wait while a half-open trial is in flight.
+    _TRIAL_WAIT = 1.0  # seconds
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._cooldown = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+        reinit_after_fork(self)
+
+    def _after_fork(self) -> None:
+        # A trial send in flight at the fork finishes only in the parent.
+        self._lock = threading.Lock()
+        self._trial_in_flight = False
+
+    def before_send(self, threshold: int, cooldown: float) -> Optional[float]:
+        """
+        Return None if a send may go ahead, or the number of seconds to wait
+        before trying again.
+        """
+        if threshold <= 0:
+            return None
+        with self._lock:
+            if self._state == CLOSED:
+                return None
+            if self._state == OPEN:
+                remaining = self._opened_at + self._cooldown - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self._state = HALF_OPEN
+            if self._trial_in_flight:
+                return self._TRIAL_WAIT
+            self._trial_in_flight = True
+            return None
+
+    def reset(self) -> None:
+        """Close the breaker and forget past failures."""
+        self.record_success()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, threshold: int, cooldown: float) -> None:
+        if threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= threshold:
+                if self._state != OPEN:
+                    self._times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._cooldown = cooldown
+            self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened,
+            }
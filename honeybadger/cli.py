@@ -0,0 +1,187 @@
+"""
+Command line tools.
+
+    python -m honeybadger spool inspect [DIR]
+    python -m honeybadger spool upload [DIR] [--api-key KEY] [--endpoint URL]
+    python -m honeybadger relay [--socket PATH] [--api-key KEY] [--endpoint URL]
+
+DIR defaults to HONEYBADGER_SPOOL_DIR. Upload sends every segment no live
+process owns, deleting each one once all of its records have been accepted.
+
+The relay listens on PATH (default HONEYBADGER_RELAY_SOCKET) until it gets
+SIGINT or SIGTERM; the rest of its settings come from HONEYBADGER_*
+variables as usual.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from .config import Configuration
+from . import connection
+from .relay import Relay
+from .spool import EVENTS, NOTICE, Spool, list_segments, read_segment, segment_in_use
+from .types import EventsSendStatus
+from .utils import decode_events
+
+_KIND_NAMES = {EVENTS: "event batches", NOTICE: "notices"}
+
+
+def inspect(directory: str) -> int:
+    segments = list_segments(directory)
+    if not segments:
+        print("{}: no spooled segments".format(directory))
+        return 0
+
+    total: Counter = Counter()
+    for path in segments:
+        counts = Counter(kind for kind, _ in read_segment(path))
+        total.update(counts)
+        in_use = segment_in_use(path)
+        print(
+            "{}  {} bytes  {}{}".format(
+                os.path.basename(path),
+                os.path.getsize(path),
+                _describe(counts),
+                "  (in use)" if in_use else "",
+            )
+        )
+    print("total: {} segments, {}".format(len(segments), _describe(total)))
+    return 0
+
+
+def upload(directory: str, config: Configuration, rate: float) -> int:
+    if not config.api_key:
+        print("An API key is required (--api-key or HONEYBADGER_API_KEY)")
+        return 1
+
+    spool = Spool(directory)
+    failed = 0
+    for path in spool.claim_orphans():
+        sent = 0
+        for kind, body in read_segment(path):
+            if kind == EVENTS:
+                result = connection.send_events(config, decode_events(body))
+            else:
+                request_object = connection._notice_body_request(config, body)
+                result = connection._send_notice_request(config, request_object)
+
+            if result.status not in (EventsSendStatus.OK, EventsSendStatus.REJECTED):
+                print(
+                    "{}: stopped after {} records: {}".format(
+                        os.path.basename(path),
+                        sent,
+                        result.reason or result.status.value,
+                    )
+                )
+                break
+            sent += 1
+            if rate > 0:
+                time.sleep(1.0 / rate)
+        else:
+            spool.release(path)
+            print("{}: uploaded {} records".format(os.path.basename(path), sent))
+            continue
+        spool.release_claim(path)
+        failed += 1
+
+    spool.close()
+    return 1 if failed else 0
+
+
+def relay(path: str, config: Configuration) -> int:
+    if not config.api_key:
+        print("An API key is required (--api-key or HONEYBADGER_API_KEY)")
+        return 1
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        server = Relay(path, config).start()
+    except (OSError, RuntimeError) as e:
+        print("Could not start relay: {}".format(e))
+        return 1
+
+    print("Relaying from {} to {}".format(path, config.endpoint))
+    try:
+        while not stopping.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+    return 0
+
+
+def _describe(counts: Counter) -> str:
+    return ", ".join(
+        "{} {}".format(counts.get(kind, 0), name) for kind, name in _KIND_NAMES.items()
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="honeybadger")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    spool_parser = commands.add_parser("spool", help="inspect or upload a spool")
+    spool_commands = spool_parser.add_subparsers(dest="spool_command", required=True)
+
+    inspect_parser = spool_commands.add_parser("inspect", help="list spooled records")
+    upload_parser = spool_commands.add_parser("upload", help="send spooled records")
+    for p in (inspect_parser, upload_parser):
+        p.add_argument(
+            "directory", nargs="?", default=os.environ.get("HONEYBADGER_SPOOL_DIR")
+        )
+    upload_parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="max records per second (default: no limit)",
+    )
+
+    relay_parser = commands.add_parser(
+        "relay", help="batch and forward for local processes"
+    )
+    relay_parser.add_argument(
+        "--socket", default=os.environ.get("HONEYBADGER_RELAY_SOCKET")
+    )
+
+    for p in (upload_parser, relay_parser):
+        p.add_argument("--api-key")
+        p.add_argument("--endpoint")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "relay":
+        if not args.socket:
+            parser.error("no socket given and HONEYBADGER_RELAY_SOCKET is not set")
+        config = Configuration()
+        _apply_overrides(config, args)
+        return relay(args.socket, config)
+
+    if not args.directory:
+        parser.error("no spool directory given and HONEYBADGER_SPOOL_DIR is not set")
+    if not os.path.isdir(args.directory):
+        parser.error("{} is not a directory".format(args.directory))
+
+    if args.spool_command == "inspect":
+        return inspect(args.directory)
+
+    config = Configuration(force_sync=True)
+    _apply_overrides(config, args)
+    return upload(args.directory, config, args.rate)
+
+
+def _apply_overrides(config: Configuration, args: argparse.Namespace) -> None:
+    if args.api_key:
+        config.api_key = args.api_key
+    if args.endpoint:
+        config.endpoint = args.endpoint
+
+
+if __name__ == "__main__":
+    sys.exit(main())
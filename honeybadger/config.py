@@ -106,8 +106,31 @@ class BaseConfig:
     )
     force_report_data: bool = False
     force_sync: bool = False
+    shutdown_timeout: float = 10.0
     excluded_exceptions: List[str] = field(default_factory=list)
     report_local_variables: bool = False
+    notices_workers: int = 2
+    notices_max_queue_size: int = 100
+    notices_drop_policy: str = "newest"
+    notices_max_retries: int = 3
+    notices_retry_backoff: float = 1.0
+    notices_throttle_wait: float = 60.0
+    notices_max_payload_bytes: int = 512 * 1024
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_cooldown: float = 30.0
+    delivery_rate: float = 0.0
+    delivery_burst: int = 10
+    compression: str = "none"
+    compression_threshold: int = 1024
+    compression_level: int = 6
+    spool_dir: str = ""
+    spool_max_bytes: int = 64 * 1024 * 1024
+    spool_segment_bytes: int = 4 * 1024 * 1024
+    spool_replay_rate: float = 10.0
+    relay_socket: str = ""
+    sinks: List[Any] = field(default_factory=list)
     before_notify: Callable[[Any], Any] = lambda notice: notice
 
     insights_enabled: bool = False
@@ -118,8 +141,19 @@ class BaseConfig:
     events_sample_rate: int = 100
     events_batch_size: int = 1000
     events_max_queue_size: int = 10_000
+    events_max_batch_bytes: int = 4 * 1024 * 1024
+    events_max_queue_bytes: int = 64 * 1024 * 1024
     events_timeout: float = 5.0
     events_max_batch_retries: int = 3
+    events_concurrency: int = 1
+    events_critical_types: List[str] = field(default_factory=list)
+    events_bulk_types: List[str] = field(default_factory=list)
+    events_critical_quota: float = 0.2
+    events_bulk_quota: float = 0.5
+    events_drop_policy: str = "newest"
+    events_block_timeout: float = 1.0
+    events_max_age: float = 0.0
+    events_client_stats_interval: float = 0.0
     events_throttle_wait: float = 60.0
 
 
@@ -144,7 +178,7 @@ class Configuration(BaseConfig):
             if env_val is not None:
                 typ = f.type
                 try:
-                    if typ == list or typ == List[str]:
+                    if typ == list or typ == List[str] or typ == List[Any]:
                         val = env_val.split(",")
                     elif typ == int:
                         val = int(env_val)
@@ -1,53 +1,232 @@
 import logging
-import json
 import threading
 
-from urllib.error import HTTPError, URLError
+from urllib.error import URLError
 from six.moves.urllib import request
-from six import b
 
-from .utils import StringReprJSONEncoder
+from .circuit_breaker import CircuitBreaker
+from .scheduler import DeliveryScheduler, parse_retry_after
+from .http_pool import default_pool
+from .notices_worker import NoticesWorker
+from .spool import NOTICE, get_spool
+from .payload import truncate_payload
+from .utils import compress_body, encode_events
 from .types import EventsSendResult, EventsSendStatus
 
 logger = logging.getLogger(__name__)
 
+# Shared by notices and events, which go to the same endpoint.
+circuit_breaker = CircuitBreaker()
+scheduler = DeliveryScheduler()
 
-def _make_http_request(path, config, payload):
+notices_worker = NoticesWorker(
+    logger=logging.getLogger("honeybadger"), scheduler=scheduler
+)
+
+
+def _build_request(config, path, data, content_type):
+    data, content_encoding = compress_body(config, data)
+    request_object = request.Request(url=config.endpoint + path, data=data)
+    request_object.add_header("X-Api-Key", config.api_key)
+    request_object.add_header("Content-Type", content_type)
+    if content_encoding:
+        request_object.add_header("Content-Encoding", content_encoding)
+    request_object.add_header("Accept", "application/json")
+    return request_object
+
+
+def _notice_body(config, payload):
+    return truncate_payload(payload, config.notices_max_payload_bytes)[1]
+
+
+def _notice_request(config, payload):
+    return _notice_body_request(config, _notice_body(config, payload))
+
+
+def _notice_body_request(config, body):
     if not config.api_key:
         logger.error(
             "Honeybadger API key missing from configuration: cannot report errors."
         )
-        return
+        return None
 
-    request_object = request.Request(
-        url=config.endpoint + path,
-        data=b(json.dumps(payload, cls=StringReprJSONEncoder)),
+    return _build_request(config, "/v1/notices/", body, "application/json")
+
+
+def _send_notice_request(config, request_object) -> EventsSendResult:
+    response, failure = _urlopen(config, request_object)
+    if failure is not None:
+        return failure
+    return _notice_result(response.getcode(), _retry_after(response))
+
+
+def _circuit_open(wait) -> EventsSendResult:
+    return EventsSendResult(
+        EventsSendStatus.CIRCUIT_OPEN, "circuit breaker open", retry_after=wait
     )
-    request_object.add_header("X-Api-Key", config.api_key)
-    request_object.add_header("Content-Type", "application/json")
-    request_object.add_header("Accept", "application/json")
 
-    def send_request():
-        response = request.urlopen(request_object)
 
-        status = response.getcode()
-        if status != 201:
-            logger.error(
-                "Received error response [{}] from Honeybadger API.".format(status)
+def _record_status(config, status):
+    """Count 5xx and 408 responses as endpoint failures for the breaker."""
+    if isinstance(status, int) and (status >= 500 or status == 408):
+        circuit_breaker.record_failure(
+            config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+        )
+    else:
+        circuit_breaker.record_success()
+
+
+def _urlopen(config, request_object):
+    """
+    Send a request through the circuit breaker with the configured timeouts.
+
+    :return: a tuple of (response, None), or (None, EventsSendResult) if
+        the request was not sent or failed on the network.
+    """
+    wait = circuit_breaker.before_send(
+        config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+    )
+    if wait is not None:
+        return None, _circuit_open(wait)
+
+    try:
+        response = default_pool.urlopen(
+            request_object,
+            timeout=config.read_timeout,
+            connect_timeout=config.connect_timeout,
+        )
+    except URLError as e:
+        circuit_breaker.record_failure(
+            config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+        )
+        return None, EventsSendResult(EventsSendStatus.ERROR, str(e.reason))
+    except BaseException:
+        # Whatever went wrong, a half-open trial must not stay in flight
+        circuit_breaker.record_failure(
+            config.circuit_breaker_threshold, config.circuit_breaker_cooldown
+        )
+        raise
+
+    _record_status(config, response.getcode())
+    return response, None
+
+
+def _retry_after(response):
+    getheader = getattr(response, "getheader", None)
+    return parse_retry_after(getheader("Retry-After")) if getheader else None
+
+
+def _notice_result(status, retry_after=None) -> EventsSendResult:
+    if status == 201:
+        return EventsSendResult(EventsSendStatus.OK)
+    if status == 429:
+        return EventsSendResult(EventsSendStatus.THROTTLING, retry_after=retry_after)
+    if isinstance(status, int) and 400 <= status < 500 and status != 408:
+        return EventsSendResult(EventsSendStatus.REJECTED, f"got HTTP {status}")
+    return EventsSendResult(
+        EventsSendStatus.ERROR, f"got HTTP {status}", retry_after=retry_after
+    )
+
+
+def _log_notice_result(result):
+    if result.status != EventsSendStatus.OK:
+        logger.error(
+            "Could not send notice to Honeybadger: {}".format(
+                result.reason or result.status.value
             )
+        )
+
+
+def _events_request(config, payload):
+    # Batches from the events worker carry their encoded body already.
+    body = getattr(payload, "body", None)
+    if body is None:
+        body = encode_events(payload)
+    return _build_request(config, "/v1/events/", body, "application/x-ndjson")
+
+
+# Responses that refuse the events themselves rather than the request
+_PAYLOAD_REJECTED = (400, 413, 422)
+
+
+def _events_result(status, count, retry_after=None) -> EventsSendResult:
+    if status == 201 or status == 200:
+        logger.debug("Sent {} events to Honeybadger, got HTTP {}".format(count, status))
+        return EventsSendResult(EventsSendStatus.OK)
+    if status == 429:
+        return EventsSendResult(EventsSendStatus.THROTTLING, retry_after=retry_after)
+    if status in _PAYLOAD_REJECTED:
+        # Too large (413) or malformed (400, 422); the worker will split it.
+        return EventsSendResult(EventsSendStatus.REJECTED, f"got HTTP {status}")
+    # Anything else, such as a bad API key (401, 403) or an account problem
+    # (402), says nothing about the events, so the batch is retried whole.
+    return EventsSendResult(
+        EventsSendStatus.ERROR, f"got HTTP {status}", retry_after=retry_after
+    )
 
+
+def _make_http_request(config, payload):
+    body = _notice_body(config, payload)
     if config.force_sync:
-        send_request()
+        request_object = _notice_body_request(config, body)
+        if request_object is not None:
+            _log_notice_result(_send_notice_request(config, request_object))
     else:
-        t = threading.Thread(target=send_request)
-        t.start()
+        send_notice_body(config, body)
+
+
+def send_notice_body(config, body):
+    """
+    Queue an encoded notice for delivery by the notices worker. When a spool
+    is configured the notice is written to it first, and only removed once
+    the API has accepted or rejected it, or the full queue dropped it.
+    """
+    request_object = _notice_body_request(config, body)
+    if request_object is None:
+        return
+
+    spool = get_spool(config)
+    record_id = spool.append(NOTICE, body) if spool is not None else None
+
+    def send_request():
+        result = _send_notice_request(config, request_object)
+        if spool is not None and result.status in (
+            EventsSendStatus.OK,
+            EventsSendStatus.REJECTED,
+        ):
+            spool.ack(record_id)
+        return result
+
+    def forget():
+        # Dropped by a full queue: don't replay what this process gave up on
+        if spool is not None:
+            spool.ack(record_id)
+
+    notices_worker.push(config, send_request, on_drop=forget)
+
+
+def prewarm(config):
+    """
+    Open a connection to the configured endpoint in the background, so DNS
+    resolution and the TLS handshake are done before the first send.
+    """
+    if not config.api_key:
+        return
+
+    def warm():
+        try:
+            default_pool.warm(config.endpoint, config.connect_timeout)
+        except Exception as e:
+            logger.debug("Could not pre-warm connection to %s: %s", config.endpoint, e)
+
+    t = threading.Thread(target=warm, name="honeybadger-prewarm", daemon=True)
+    t.start()
 
 
 def send_notice(config, notice):
     payload = notice.payload
     notice_id = payload.get("error", {}).get("token", None)
-    path = "/v1/notices/"
-    _make_http_request(path, config, payload)
+    _make_http_request(config, payload)
     return notice_id
 
 
@@ -59,34 +238,19 @@ def send_events(config, payload) -> EventsSendResult:
     Returns:
       - "ok" if status == 201
       - "throttling" if status == 429
-      - "error" for any 400–599 or network failure
+      - "rejected" if status is 400, 413 or 422: the payload itself was
+        refused, and the worker splits the batch to find the bad events
+      - "error" for any other status or a network failure
+      - "circuit_open" if the request wasn't sent because the endpoint has
+        been failing
     """
     if not config.api_key:
         return EventsSendResult(EventsSendStatus.ERROR, "missing api key")
 
-    jsonl = "\n".join(json.dumps(it, cls=StringReprJSONEncoder) for it in payload)
+    req = _events_request(config, payload)
 
-    req = request.Request(
-        url=f"{config.endpoint}/v1/events/",
-        data=jsonl.encode("utf-8"),
-    )
-    req.add_header("X-Api-Key", config.api_key)
-    req.add_header("Content-Type", "application/x-ndjson")
-    req.add_header("Accept", "application/json")
-
-    try:
-        resp = request.urlopen(req)
-        status = resp.getcode()
-    except HTTPError as e:
-        status = e.code
-    except URLError as e:
-        return EventsSendResult(EventsSendStatus.ERROR, str(e.reason))
+    response, failure = _urlopen(config, req)
+    if failure is not None:
+        return failure
 
-    if status == 201 or status == 200:
-        logger.debug(
-            "Sent {} events to Honeybadger, got HTTP {}".format(len(payload), status)
-        )
-        return EventsSendResult(EventsSendStatus.OK)
-    if status == 429:
-        return EventsSendResult(EventsSendStatus.THROTTLING)
-    return EventsSendResult(EventsSendStatus.ERROR, f"got HTTP {status}")
+    return _events_result(response.getcode(), len(payload), _retry_after(response))
@@ -133,7 +133,7 @@ class ASGIHoneybadger(plugins.Plugin):
         try:
             return await app_callable(receive, send_wrapper)
         except Exception as exc:
-            honeybadger.notify(exception=exc, context=_as_context(scope))
+            await honeybadger.notify_async(exception=exc, context=_as_context(scope))
             raise
         finally:
             try:
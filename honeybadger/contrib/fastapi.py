@@ -22,7 +22,9 @@ class HoneybadgerRoute(APIRoute):
                 body = await request.body()
                 scope = dict(request)
                 scope["body"] = body
-                honeybadger.notify(exception=exc, context=asgi._as_context(scope))
+                await honeybadger.notify_async(
+                    exception=exc, context=asgi._as_context(scope)
+                )
                 raise exc from None
             finally:
                 honeybadger.reset_context()
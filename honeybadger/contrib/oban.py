@@ -7,6 +7,7 @@ End-user usage and configuration: see the Oban section in the project README.
 Design and rationale (for maintainers): see oban.md alongside this file.
 """
 
+import asyncio
 import logging
 from contextlib import contextmanager
 from contextvars import ContextVar
@@ -312,7 +313,7 @@ class ObanHoneybadger:
                 job_token = _current_job_var.set(job)
                 try:
                     with _event_context_from_meta(job):
-                        honeybadger.notify(exception=result)
+                        hb_oban._notify(result)
                 except Exception:
                     logger.exception("Failed to report Oban exception to Honeybadger")
                 finally:
@@ -321,6 +322,19 @@ class ObanHoneybadger:
 
         return _wrap_result
 
+    def _notify(self, exception):
+        """Report from the executor without blocking its event loop: when a
+        loop is running, notify_async() is scheduled on it (the task copies
+        the current job and event context); otherwise fall back to notify()."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            honeybadger.notify(exception=exception)
+            return
+
+        task = loop.create_task(honeybadger.notify_async(exception=exception))
+        honeybadger._track_async_delivery(task)
+
     def _on_job_event(self, name, meta):
         try:
             if not self._insights_active():
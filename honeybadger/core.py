@@ -1,8 +1,10 @@
+import asyncio
 import threading
 from contextlib import contextmanager
 import sys
 import logging
 import datetime
+import time
 import atexit
 import uuid
 import hashlib
@@ -12,8 +14,11 @@ from typing import Optional, Dict, Any, List
 
 from honeybadger.plugins import default_plugin_manager
 import honeybadger.connection as connection
+import honeybadger.async_connection as async_connection
 import honeybadger.fake_connection as fake_connection
+import honeybadger.relay_connection as relay_connection
 from .events_worker import EventsWorker
+from . import sinks
 from .config import Configuration
 from .notice import Notice
 from .context_store import ContextStore
@@ -36,9 +41,31 @@ class Honeybadger(object):
         self.events_worker = EventsWorker(
             self._connection(), self.config, logger=logging.getLogger("honeybadger")
         )
+        # Workers for the second and later of config.sinks, if any
+        self._sink_workers: List[EventsWorker] = []
+        self._resolved_sinks: Dict[str, Any] = {}
+        if self.config.sinks:
+            self._configure_sinks()
+        self.notices_worker = connection.notices_worker
+        self._async_deliveries = set()  # background notify_async() sends
         atexit.register(self.shutdown)
 
     def _send_notice(self, notice):
+        notice = self._filter_notice(notice)
+        if notice is None:
+            return None
+
+        return self._deliver_notice(notice)
+
+    def _deliver_notice(self, notice):
+        notice_id = None
+        for sink in self._sinks():
+            sink_notice_id = sink.send_notice(self.config, notice)
+            if notice_id is None:
+                notice_id = sink_notice_id
+        return notice_id
+
+    def _filter_notice(self, notice):
         if callable(self.config.before_notify):
             try:
                 notice = self.config.before_notify(notice)
@@ -53,7 +80,7 @@ class Honeybadger(object):
             logger.debug("Notice was excluded by exception filter")
             return None
 
-        return self._connection().send_notice(self.config, notice)
+        return notice
 
     def begin_request(self, _):
         error_context.clear()
@@ -72,8 +99,99 @@ class Honeybadger(object):
         self.notify(exception=exception, exc_traceback=exc_traceback)
         self.existing_except_hook(type, exception, exc_traceback)
 
-    def shutdown(self):
-        self.events_worker.shutdown()
+    def flush(self, timeout: float = 10.0) -> Dict[str, int]:
+        """
+        Deliver queued events and notices, waiting up to timeout seconds in
+        all, without stopping anything. Returns how many of each were sent
+        and how many were still pending when it returned.
+        """
+        # Delivery carries on in the background while we wait on any one
+        # worker, so waiting on each in turn shares the deadline fairly
+        deadline = time.monotonic() + timeout
+        summary = {"sent_events": 0, "pending_events": 0}
+        for worker in [self.events_worker, *self._sink_workers]:
+            result = worker.flush(max(0.0, deadline - time.monotonic()))
+            for key, count in result.items():
+                summary[key] += count
+        # Async sends first: one that fails is handed to the notices worker
+        in_flight = self._wait_async_deliveries(deadline)
+        summary.update(self.notices_worker.flush(max(0.0, deadline - time.monotonic())))
+        summary["pending_notices"] += in_flight
+        return summary
+
+    @contextmanager
+    def flushing(self, timeout: float = 10.0):
+        """
+        Flush when the block exits, even on error. The yielded dict is
+        filled in with flush()'s summary.
+        """
+        summary: Dict[str, int] = {}
+        try:
+            yield summary
+        finally:
+            summary.update(self.flush(timeout))
+
+    def _track_async_delivery(self, task: "asyncio.Future") -> None:
+        """Keep a background notice send alive and visible to flush()."""
+        self._async_deliveries.add(task)
+        task.add_done_callback(self._async_deliveries.discard)
+
+    def _wait_async_deliveries(self, deadline: float) -> int:
+        """
+        Wait until deadline for background notify_async() sends to finish,
+        and return how many are still running. Sends on the calling thread's
+        own event loop, or on a loop that has stopped, can't be waited for
+        here and are only counted.
+        """
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+
+        while True:
+            by_loop: Dict[Any, List[Any]] = {}
+            for task in list(self._async_deliveries):
+                loop = task.get_loop()
+                if not task.done() and loop is not current and loop.is_running():
+                    by_loop.setdefault(loop, []).append(task)
+            remaining = deadline - time.monotonic()
+            if not by_loop or remaining <= 0:
+                break
+            for loop, tasks in by_loop.items():
+                remaining = max(0.0, deadline - time.monotonic())
+                waiting = asyncio.run_coroutine_threadsafe(
+                    asyncio.wait(tasks, timeout=remaining), loop
+                )
+                try:
+                    waiting.result(remaining)
+                except Exception:
+                    waiting.cancel()
+
+        return sum(1 for task in list(self._async_deliveries) if not task.done())
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Deliver what is queued and stop, spending at most timeout seconds
+        (config.shutdown_timeout by default) across events and notices.
+        """
+        if timeout is None:
+            timeout = float(self.config.shutdown_timeout)
+        deadline = time.monotonic() + timeout
+
+        # Every events worker starts draining now, while we wait on notices
+        workers = [self.events_worker, *self._sink_workers]
+        for worker in workers:
+            worker.shutdown(timeout, wait=False)
+        in_flight = self._wait_async_deliveries(deadline)
+        if in_flight:
+            logger.warning(
+                f"Shutting down with {in_flight} async notice(s) still being sent"
+            )
+        self.notices_worker.shutdown(max(0.0, deadline - time.monotonic()))
+        for worker in workers:
+            worker.shutdown(max(0.0, deadline - time.monotonic()))
+        for sink in self._resolved_sinks.values():
+            sink.close()
 
     def notify(
         self,
@@ -84,6 +202,27 @@ class Honeybadger(object):
         fingerprint=None,
         tags: Optional[List[str]] = None,
         exc_traceback: Optional[TracebackType] = None,
+    ):
+        notice = self._build_notice(
+            exception=exception,
+            error_class=error_class,
+            error_message=error_message,
+            context=context,
+            fingerprint=fingerprint,
+            tags=tags,
+            exc_traceback=exc_traceback,
+        )
+        return self._send_notice(notice)
+
+    def _build_notice(
+        self,
+        exception=None,
+        error_class=None,
+        error_message=None,
+        context: Optional[Dict[str, Any]] = None,
+        fingerprint=None,
+        tags: Optional[List[str]] = None,
+        exc_traceback: Optional[TracebackType] = None,
     ):
         base = error_context.get()
         tag_ctx = base.pop("_tags", [])
@@ -92,7 +231,7 @@ class Honeybadger(object):
 
         request_id = self._get_event_context().get("request_id", None)
 
-        notice = Notice(
+        return Notice(
             exception=exception,
             error_class=error_class,
             error_message=error_message,
@@ -103,7 +242,57 @@ class Honeybadger(object):
             config=self.config,
             request_id=request_id,
         )
-        return self._send_notice(notice)
+
+    async def notify_async(
+        self,
+        exception=None,
+        error_class=None,
+        error_message=None,
+        context: Optional[Dict[str, Any]] = None,
+        fingerprint=None,
+        tags: Optional[List[str]] = None,
+        exc_traceback: Optional[TracebackType] = None,
+    ):
+        """
+        Coroutine version of notify() for code running on an event loop.
+
+        The notice is delivered over non-blocking sockets instead of the
+        notice worker threads. Unless force_sync is set, delivery runs as a
+        background task and the notice ID is returned straight away; a notice
+        that fails to send is handed to the notice worker to retry.
+        """
+        notice = self._filter_notice(
+            self._build_notice(
+                exception=exception,
+                error_class=error_class,
+                error_message=error_message,
+                context=context,
+                fingerprint=fingerprint,
+                tags=tags,
+                exc_traceback=exc_traceback,
+            )
+        )
+        if notice is None:
+            return None
+
+        # Past as many background sends as the notice queue holds, queue the
+        # notice on the worker instead so the number of tasks stays bounded.
+        if (
+            self.config.sinks
+            or self._connection() is not connection
+            or len(self._async_deliveries)
+            >= max(1, int(self.config.notices_max_queue_size))
+        ):
+            return self._deliver_notice(notice)
+
+        # Build the payload now, while the caller's stack is still current.
+        notice_id = notice.payload.get("error", {}).get("token", None)
+        if self.config.force_sync:
+            return await async_connection.send_notice(self.config, notice)
+
+        task = asyncio.ensure_future(async_connection.send_notice(self.config, notice))
+        self._track_async_delivery(task)
+        return notice_id
 
     def event(self, event_type=None, data=None, **kwargs):
         """
@@ -150,15 +339,44 @@ class Honeybadger(object):
         # Strip internal _hb metadata before sending
         final_payload.pop("_hb", None)
 
-        return self.events_worker.push(final_payload)
+        queued = self.events_worker.push(final_payload)
+        for worker in self._sink_workers:
+            queued = worker.push(final_payload) and queued
+        return queued
+
+    async def event_async(self, event_type=None, data=None, **kwargs):
+        """
+        Coroutine version of event(). Queuing an event never blocks, so this
+        is event() under a name that async code can await uniformly.
+        """
+        return self.event(event_type, data, **kwargs)
 
     def configure(self, **kwargs):
         self.config.set_config_from_dict(kwargs)
         self.auto_discover_plugins()
 
-        # Update events worker with new config
-        self.events_worker.connection = self._connection()
-        self.events_worker.config = self.config
+        if connection in self._configure_sinks():
+            connection.prewarm(self.config)
+        if self.config.spool_dir:
+            # Replay what earlier processes left in the spool without
+            # waiting for this one to send an event
+            self.events_worker.start()
+
+    def get_sink_stats(self) -> List[Dict[str, Any]]:
+        """Delivery stats for each sink, in config.sinks order."""
+        workers = [self.events_worker, *self._sink_workers]
+        stats = []
+        for worker in workers:
+            sink = worker.connection
+            sink_stats = sink.get_stats() if hasattr(sink, "get_stats") else {}
+            stats.append(
+                dict(
+                    sink_stats,
+                    name=sinks.sink_name(sink),
+                    events_worker=worker.get_stats(),
+                )
+            )
+        return stats
 
     def auto_discover_plugins(self):
         # Avoiding circular import error
@@ -220,8 +438,51 @@ class Honeybadger(object):
         with event_context.override(ctx, **kwargs):
             yield
 
+    def _sinks(self) -> List[Any]:
+        api = self._connection()
+        if not self.config.sinks:
+            return [api]
+
+        resolved = []
+        for spec in self.config.sinks:
+            sink = self._resolved_sinks.get(spec) if isinstance(spec, str) else None
+            if sink is None:
+                sink = sinks.resolve(spec, api)
+                if isinstance(spec, str) and sink is not api:
+                    self._resolved_sinks[spec] = sink
+            resolved.append(sink)
+        return resolved
+
+    def _configure_sinks(self) -> List[Any]:
+        """Point the events workers at the configured sinks, one per sink."""
+        first, *rest = sink_list = self._sinks()
+        self.events_worker.connection = first
+        self.events_worker.config = sinks.worker_config(self.config, first)
+        self.events_worker.apply_config()
+
+        current = {id(w.connection): w for w in self._sink_workers}
+        workers = []
+        for sink in rest:
+            worker = current.pop(id(sink), None)
+            if worker is None:
+                worker = EventsWorker(
+                    sink, self.config, logger=logging.getLogger("honeybadger")
+                )
+            worker.config = sinks.worker_config(self.config, sink)
+            worker.apply_config()
+            workers.append(worker)
+        self._sink_workers = workers
+
+        # Removed sinks' workers drain in the background; configure() mustn't
+        # block for the shutdown timeout
+        for worker in current.values():
+            worker.shutdown(wait=False)
+        return sink_list
+
     def _connection(self):
         if self.config.is_dev() and not self.config.force_report_data:
             return fake_connection
+        elif self.config.relay_socket:
+            return relay_connection
         else:
             return connection
@@ -1,22 +1,358 @@
+import datetime
 import os
+import random
 import time
+from fnmatch import fnmatchcase
 import threading
 import logging
+import queue
 from collections import deque
-from typing import Deque, Dict, Any, Optional, Tuple, List
+from itertools import count, repeat
+from typing import Callable, Deque, Dict, Any, Generator, Optional, Tuple, List
 
+from .histogram import Histogram, exponential_bounds
+from .notices_worker import DROP_NEWEST, DROP_OLDEST
 from .protocols import Connection
 from .config import Configuration
+from .scheduler import EVENTS as EVENT_BATCH, backoff
+from .spool import EVENTS, NOTICE, Spool, get_spool, read_segment
 from .types import EventsSendStatus, EventsSendResult, Event
+from . import serializer
+from .utils import decode_events, reinit_after_fork
+
+
+class EventBatch(List[Event]):
+    """
+    A list of events that keeps its NDJSON encoding in ``body``, built up as
+    events are added, so a batch is serialized once however many times it is
+    sent or retried.
+    """
+
+    def __init__(self, lane: str = "default") -> None:
+        super().__init__()
+        self.body = bytearray()
+        self.cost = 0  # bytes held in the worker's byte budget
+        self.lane = lane
+        self.queued_at = time.monotonic()  # when its first event was pushed
+        self.not_before = 0.0  # backing off from a failed send until then
+
+    @classmethod
+    def from_body(cls, body: bytes, lane: str = "default") -> "EventBatch":
+        batch = cls(lane)
+        batch.extend(decode_events(body))
+        batch.body += body
+        batch.cost = sum(byte_cost(line) for line in body.split(b"\n"))
+        return batch
+
+    def add(self, event: Event, line: Optional[bytes] = None) -> None:
+        """Append an event, with its encoding if it has already been made."""
+        if line is None:
+            line = serializer.dumps(event)
+        if self:
+            self.body += b"\n"
+        self.body += line
+        self.cost += byte_cost(line)
+        self.append(event)
+
+    def split(self) -> Tuple["EventBatch", "EventBatch"]:
+        """Halve the batch, reusing the encoded lines rather than re-encoding."""
+        middle = len(self) // 2
+        lines = bytes(self.body).split(b"\n")
+        halves = []
+        for events, body in (
+            (self[:middle], lines[:middle]),
+            (self[middle:], lines[middle:]),
+        ):
+            half = EventBatch(self.lane)
+            half.queued_at = self.queued_at
+            half.extend(events)
+            half.body += b"\n".join(body)
+            half.cost = sum(byte_cost(line) for line in body)
+            halves.append(half)
+        return halves[0], halves[1]
+
+
+# (events, attempts, spool record id)
+Batch = Tuple[EventBatch, int, Optional[str]]
+
+
+def byte_cost(line: bytes) -> int:
+    """Bytes of budget an encoded event holds, with its separator."""
+    return len(line) + 1
+
+
+class Slots:
+    """
+    A fixed number of places, claimed from any thread without a lock: each
+    free place is a token in a deque, and deque.pop() is atomic. Places
+    held without being claimed (replayed batches, or a lowered capacity)
+    are owed, and the debt is repaid before tokens are returned; a short
+    lock keeps the debt consistent.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._free: Deque[None] = deque(repeat(None, capacity))
+        self._debt = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Places in use."""
+        return self.capacity - len(self._free) + self._debt
+
+    def claim(self, count: int = 1) -> bool:
+        # Under contention a claim may fail while another is part-way
+        # through, but together they never hold more than capacity.
+        for claimed in range(count):
+            try:
+                self._free.pop()
+            except IndexError:
+                self.release(claimed)
+                return False
+        return True
+
+    def take(self, count: int) -> None:
+        """Hold count places whether or not they are free."""
+        with self._lock:
+            self._take(count)
+
+    def release(self, count: int) -> None:
+        if not count:
+            return
+        with self._lock:
+            repaid = min(count, self._debt)
+            self._debt -= repaid
+            self._free.extend(repeat(None, count - repaid))
+
+    def resize(self, capacity: int) -> None:
+        if capacity > self.capacity:
+            self.release(capacity - self.capacity)
+        elif capacity < self.capacity:
+            self.take(self.capacity - capacity)
+        self.capacity = capacity
+
+    def _take(self, count: int) -> None:
+        for taken in range(count):
+            try:
+                self._free.pop()
+            except IndexError:
+                self._debt += count - taken
+                return
+
+
+class ByteBudget:
+    """
+    A cap on the encoded bytes held, claimed without a lock like Slots: free
+    bytes are kept as chunk sizes in a deque, and a claim pops chunks until
+    it has enough, putting back the excess. Free bytes are spread over
+    several chunks so that concurrent claims rarely find the deque empty.
+    Bytes held without being claimed are owed as in Slots, and released
+    chunks are merged back now and then.
+    """
+
+    _SPREAD = 64  # chunks free bytes are split into
+    _MAX_CHUNKS = 1024
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._free: Deque[int] = deque()
+        self._debt = 0
+        self._lock = threading.Lock()
+        self._put(capacity)
+
+    def __len__(self) -> int:
+        """Bytes in use."""
+        return self.capacity - sum(list(self._free)) + self._debt
+
+    def claim(self, count: int) -> bool:
+        # As with Slots, a claim may fail under contention while another
+        # holds chunks part-way through, but never takes more than is free.
+        claimed = 0
+        while claimed < count:
+            try:
+                claimed += self._free.pop()
+            except IndexError:
+                if claimed:
+                    self._free.append(claimed)
+                return False
+        if claimed > count:
+            self._free.append(claimed - count)
+        return True
+
+    def take(self, count: int) -> None:
+        """Hold count bytes whether or not they are free."""
+        with self._lock:
+            self._take(count)
+
+    def release(self, count: int) -> None:
+        if count <= 0:
+            return
+        with self._lock:
+            repaid = min(count, self._debt)
+            self._debt -= repaid
+            if count > repaid:
+                self._free.append(count - repaid)
+            if len(self._free) > self._MAX_CHUNKS:
+                self._merge()
+
+    def resize(self, capacity: int) -> None:
+        if capacity > self.capacity:
+            with self._lock:
+                added = capacity - self.capacity
+                repaid = min(added, self._debt)
+                self._debt -= repaid
+                self._put(added - repaid)
+        elif capacity < self.capacity:
+            self.take(self.capacity - capacity)
+        self.capacity = capacity
+
+    def _take(self, count: int) -> None:
+        while count > 0:
+            try:
+                chunk = self._free.pop()
+            except IndexError:
+                self._debt += count
+                return
+            if chunk > count:
+                self._free.append(chunk - count)
+                return
+            count -= chunk
+
+    def _merge(self) -> None:
+        merged = 0
+        for _ in range(len(self._free)):
+            try:
+                merged += self._free.popleft()
+            except IndexError:
+                break
+        self._put(merged)
+
+    def _put(self, count: int) -> None:
+        if count <= 0:
+            return
+        chunks = min(count, self._SPREAD)
+        size, extra = divmod(count, chunks)
+        self._free.extend(repeat(size, chunks - extra))
+        self._free.extend(repeat(size + 1, extra))
+
+
+CRITICAL = "critical"
+DEFAULT = "default"
+BULK = "bulk"
+
+# What push() does when a lane is full (events_drop_policy)
+BLOCK = "block"
+RESERVOIR = "reservoir"
+# Events removed because they waited longer than events_max_age
+EXPIRED = "expired"
+
+# event_type of the stats a worker reports about itself
+CLIENT_STATS = "honeybadger.client_stats"
+
+# (event, encoding, time pushed)
+Queued = Tuple[Event, bytes, float]
+
+
+class Lane:
+    """The queue, queue space and drop counts for one priority lane of events."""
+
+    def __init__(self, name: str, weight: int) -> None:
+        self.name = name
+        self.weight = weight  # batches sent per turn
+        self.queue: Deque[Queued] = deque()
+        # Held to take events out of the queue; appending needs no lock
+        self.lock = threading.Lock()
+        self.slots = Slots(0)
+        self.byte_budget = ByteBudget(0)
+        self.seen = count(1)  # events offered since the queue was last drained
+        self.dropped = {
+            policy: 0
+            for policy in (DROP_NEWEST, DROP_OLDEST, BLOCK, RESERVOIR, EXPIRED)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_queue_size": self.slots.capacity,
+            "total_events": len(self.slots),
+            "total_bytes": len(self.byte_budget),
+            "dropped_events": sum(self.dropped.values()),
+            "dropped_by_policy": dict(self.dropped),
+        }
+
+
+class SenderPool:
+    """
+    Daemon threads that send a wave of batches at once. Unlike a
+    concurrent.futures executor, they keep taking work once the interpreter
+    starts shutting down, so the drain at exit can still use them.
+    """
+
+    def __init__(self, size: int, name: str) -> None:
+        self.size = size
+        self._jobs: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        try:
+            for i in range(size):
+                thread = threading.Thread(
+                    target=self._run, name=f"{name}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        except RuntimeError:
+            self.shutdown()
+            raise
+
+    def map(self, fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Call fn on each item on the pool, and return the results in order."""
+        done: "queue.SimpleQueue[Tuple[int, Any, Optional[BaseException]]]" = (
+            queue.SimpleQueue()
+        )
+        for i, item in enumerate(items):
+            self._jobs.put((fn, item, i, done))
+        results: List[Any] = [None] * len(items)
+        error = None
+        for _ in items:
+            i, result, failure = done.get()
+            results[i] = result
+            error = error or failure
+        if error is not None:
+            raise error
+        return results
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._jobs.put(None)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            fn, item, i, done = job
+            try:
+                done.put((i, fn(item), None))
+            except BaseException as e:
+                done.put((i, None, e))
 
 
 class EventsWorker:
     """
     Asynchronously batches events and sends them to a backend connection,
     applying retry logic, rate-limit backoff, and drop-on-overflow.
+
+    Events are queued in critical, default and bulk lanes, each held to its
+    share of the queue limits, and pending batches are sent in weighted turns
+    across them. push() never waits on the worker. See the README for the
+    events_* settings.
     """
 
     _DROP_LOG_INTERVAL = 60.0  # seconds
+    _REJECTED_SAMPLE_SIZE = 10
+    _LANE_WEIGHTS = {CRITICAL: 4, DEFAULT: 2, BULK: 1}
+    _LANE_CACHE_SIZE = 1000
+    _SERIALIZE_SAMPLE = 16  # time the encoding of one push in this many
+    _SHUTDOWN_TIMEOUT = 10.0  # seconds, without a valid config.shutdown_timeout
+    _DRAIN_ORDER = {CRITICAL: 0, DEFAULT: 1, BULK: 2}
 
     def __init__(
         self,
@@ -28,93 +364,262 @@ class EventsWorker:
         self.config = config
 
         self.log = logger or logging.getLogger(__name__)
+        self._init_state()
+
+        # The thread starts with the first push(), so processes that never
+        # send an event don't pay for it
+        self._thread: Optional[threading.Thread] = None
+        self._pending_start = True
+        reinit_after_fork(self)
+
+    def _init_state(self) -> None:
         self._lock = threading.RLock()
         self._batch_ready_event = threading.Event()
+        self._passed = threading.Condition(self._lock)  # after each _flush()
 
-        self._queue: Deque[Event] = deque()
-        self._batches: Deque[Tuple[List[Event], int]] = deque()
+        self._batches: Deque[Batch] = deque()
+        self._space = threading.Condition(threading.Lock())  # for blocked pushes
+        self._blocked = 0
+
+        # Each lane's places for events and their encoded bytes, claimed in
+        # push(); event_type -> lane lookups are cached until the types change
+        self._lanes = {
+            name: Lane(name, weight) for name, weight in self._LANE_WEIGHTS.items()
+        }
+        self._lane_types: Tuple[Tuple[str, ...], Tuple[str, ...]] = ((), ())
+        self._lane_cache: Dict[Any, Lane] = {}
+        self._resize_lanes()
+        self._batched_cost = 0  # byte budget held by self._batches
+
+        self._spool: Optional[Spool] = None
+        self._replay_paths: Deque[str] = deque()
+        self._replay_records: Optional[Generator[Tuple[bytes, bytes], None, None]] = (
+            None
+        )
+        self._replay_budget = 0.0
+        self._replay_checked = time.monotonic()
+
+        self._senders: Optional[SenderPool] = None
 
         self._throttled = False
+        self._throttle_wait = 0.0
+        self._throttled_until = 0.0
+        self._hold_wait: Optional[float] = None  # circuit open, or paced
+        self._retry_wait: Optional[float] = None
         self._stop_event = threading.Event()
-        self._dropped = 0
+        self._deadline: Optional[float] = None  # set by shutdown()
+        self._dropped_since_log = 0
+        self._sent = 0
+        self._gave_up = 0  # events dropped after running out of retries
+        self._abandoned = 0  # events still held at the shutdown deadline
+        self._rejected = 0
+        self._rejected_sample: Deque[Event] = deque(maxlen=self._REJECTED_SAMPLE_SIZE)
         self._last_drop_log = time.monotonic()
         self._start_time = time.monotonic()
 
-        self._thread = threading.Thread(
+        self._pushes = count()
+        self._histograms = {
+            "send_latency_ms": Histogram(exponential_bounds(1, 2, 17)),
+            "batch_events": Histogram(exponential_bounds(1, 2, 17)),
+            "batch_bytes": Histogram(exponential_bounds(1024, 2, 16)),
+            "serialize_us": Histogram(exponential_bounds(1, 2, 20)),
+            "batch_retries": Histogram(range(11)),
+        }
+        self._stats_emitted = time.monotonic()
+
+    def _new_thread(self) -> threading.Thread:
+        return threading.Thread(
             target=self._run,
             name=f"honeybadger-events-worker-{os.getpid()}",
             daemon=True,
         )
-        self._thread.start()
-        self.log.debug("Events worker started")
 
     def restart(self):
         """Restart the batch worker thread (useful after process forking)"""
         if hasattr(self, "_thread") and self._thread and self._thread.is_alive():
             self.shutdown()
 
-        # Reset state
+        # Reset state; sender threads don't survive a fork
         self._stop_event.clear()
+        self._deadline = None
+        self._senders = None
+        self._pending_start = False
 
-        self._thread = threading.Thread(
-            target=self._run,
-            name=f"honeybadger-events-worker-{os.getpid()}",
-            daemon=True,
-        )
+        self._thread = self._new_thread()
         self._thread.start()
 
         return self._thread.is_alive()
 
+    def start(self) -> None:
+        """Start the worker thread now rather than on the first push()."""
+        with self._lock:
+            if self._pending_start:
+                self._pending_start = False
+                if not self._stop_event.is_set():
+                    self._thread = self._new_thread()
+                    self._thread.start()
+                    self.log.debug("Events worker started")
+
+    def apply_config(self) -> None:
+        """
+        Take up changes to the lane settings and queue limits now, rather
+        than on the next flush, so the next push() already follows them.
+        """
+        with self._lock:
+            self._resize_lanes()
+
+    def _after_fork(self) -> None:
+        """
+        In a forked child: the worker and sender threads are gone, and any
+        lock they held stays held, so start over with fresh locks and empty
+        queues. What was queued before the fork belongs to the parent, which
+        still sends it. The thread restarts on the next push().
+        """
+        stopped = self._stop_event.is_set()
+        self._init_state()
+        if stopped:
+            self._stop_event.set()
+        else:
+            self._pending_start = True
+
     def push(self, event: Event) -> bool:
-        # Small race condition is acceptable - may slightly exceed max size briefly
-        current_size = self._all_events_queued_len()
-        if current_size >= self.config.events_max_queue_size:
-            self._drop()
-            return False
+        if self._pending_start:
+            self.start()
 
-        self._queue.append(event)
+        lane = self._lane_for(event)
+        if next(self._pushes) % self._SERIALIZE_SAMPLE:
+            line = serializer.dumps(event)
+        else:
+            began = time.perf_counter()
+            line = serializer.dumps(event)
+            elapsed = time.perf_counter() - began
+            self._histograms["serialize_us"].record(elapsed * 1_000_000)
+        policy = self.config.events_drop_policy
+        seen = next(lane.seen) if policy == RESERVOIR else 0
 
-        # Signal worker thread if batch size reached
-        if len(self._queue) >= self.config.events_batch_size:
+        if not self._claim(lane, line):
+            if policy == DROP_OLDEST:
+                accepted = self._evict_oldest(lane, line)
+            elif policy == BLOCK:
+                accepted = self._wait_for_space(lane, line)
+            elif policy == RESERVOIR:
+                return self._sample(lane, (event, line, time.monotonic()), seen)
+            else:
+                accepted = False
+            if not accepted:
+                self._drop(lane, BLOCK if policy == BLOCK else DROP_NEWEST)
+                return False
+
+        lane.queue.append((event, line, time.monotonic()))
+
+        # Signal worker thread if a batch's worth of events or bytes is queued
+        if (
+            self._queued_len() >= self.config.events_batch_size
+            or self._held_bytes() - self._batched_cost >= self._max_batch_bytes()
+        ):
             self._batch_ready_event.set()
 
         return True
 
-    def shutdown(self) -> None:
+    def shutdown(self, timeout: Optional[float] = None, wait: bool = True) -> None:
+        """
+        Stop the worker, spending up to timeout seconds (by default
+        config.shutdown_timeout) sending what it holds: critical batches
+        first, then default, then bulk, newest first within each. Retries
+        and throttling waits that would end past the deadline aren't waited
+        out. Whatever is left at the deadline is abandoned and logged. With
+        wait=False, return without waiting for the worker to finish.
+        """
         self.log.debug("Shutting down events worker")
+        if timeout is None:
+            timeout = self._shutdown_timeout()
+        deadline = time.monotonic() + timeout
+        if self._deadline is None or deadline < self._deadline:
+            self._deadline = deadline
         self._stop_event.set()
         self._batch_ready_event.set()  # Wake up the worker thread
+        if not wait:
+            return
 
-        if self._thread.is_alive():
-            try:
-                # Coerce to float so the result is always numeric — with two
-                # string values, max(str, str) * 2 would "succeed" and hand
-                # join() a string.
-                timeout = (
-                    max(
-                        float(self.config.events_timeout),
-                        float(self.config.events_throttle_wait),
-                    )
-                    * 2
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(max(0.0, self._deadline - time.monotonic()))
+            if thread.is_alive():
+                self.log.warning(
+                    "Events worker still sending at the shutdown deadline; "
+                    "not waiting for it"
                 )
-            except (TypeError, ValueError):
-                # Config values may be invalid (e.g. untypecast env vars) —
-                # the worker exits promptly on such errors once stopped, so a
-                # modest fallback join timeout is enough.
-                timeout = 10.0
-            self._thread.join(timeout)
+        if self._senders is not None and not (thread and thread.is_alive()):
+            self._senders.shutdown()
+            self._senders = None
         self.log.debug("Events worker stopped")
 
+    def _shutdown_timeout(self) -> float:
+        try:
+            return float(self.config.shutdown_timeout)
+        except (TypeError, ValueError):
+            # e.g. an untypecast env var
+            return self._SHUTDOWN_TIMEOUT
+
+    def flush(self, timeout: float) -> Dict[str, int]:
+        """
+        Send what is queued now and wait up to timeout for it to be
+        delivered, without stopping the worker. Batches held back by
+        throttling or retry backoff keep their schedule. Returns how many
+        events were sent meanwhile and how many were still held at the end.
+        """
+        with self._lock:
+            sent = self._sent
+            thread = self._thread
+            if thread is not None:
+                self._batch_ready_event.set()
+                self._passed.wait_for(
+                    lambda: not (self._queued_len() or self._batches)
+                    or not thread.is_alive(),
+                    timeout=timeout,
+                )
+            return {
+                "sent_events": self._sent - sent,
+                "pending_events": sum(len(l.slots) for l in self._lanes.values()),
+            }
+
     def get_stats(self) -> Dict[str, Any]:
         with self._lock:
+            dropped = {
+                policy: sum(l.dropped[policy] for l in self._lanes.values())
+                for policy in self._lanes[DEFAULT].dropped
+            }
             return {
-                "queue_size": len(self._queue),
+                "queue_size": self._queued_len(),
                 "batch_count": len(self._batches),
-                "total_events": self._all_events_queued_len(),
-                "dropped_events": self._dropped,
+                "total_events": sum(len(l.slots) for l in self._lanes.values()),
+                "total_bytes": self._held_bytes(),
+                "dropped_events": sum(dropped.values()),
+                "dropped_by_policy": dropped,
+                "blocked_pushes": self._blocked,
+                "lanes": {name: l.get_stats() for name, l in self._lanes.items()},
+                "sent_events": self._sent,
+                "dropped_by_reason": dict(
+                    dropped,
+                    rejected=self._rejected,
+                    retries=self._gave_up,
+                    shutdown=self._abandoned,
+                ),
+                "histograms": {
+                    name: h.get_stats() for name, h in self._histograms.items()
+                },
+                "rejected_events": self._rejected,
+                "recent_rejected_events": list(self._rejected_sample),
                 "throttling": self._throttled,
+                "replay_pending": bool(self._replay_paths),
+                "circuit_breaker": self._connection_stats("circuit_breaker"),
+                "scheduler": self._connection_stats("scheduler"),
             }
 
+    def _connection_stats(self, name: str) -> Optional[Dict[str, Any]]:
+        component = getattr(self.connection, name, None)
+        return component.get_stats() if component is not None else None
+
     def _run(self) -> None:
         """
         Main loop: wait until stop or enough events to batch, then flush.
@@ -122,7 +627,11 @@ class EventsWorker:
         while True:
             try:
                 # Wait for batch ready signal or timeout
-                self._batch_ready_event.wait(timeout=self._compute_timeout())
+                if self._deadline is None:
+                    timeout = self._compute_timeout()
+                else:
+                    timeout = self._drain_wait()
+                self._batch_ready_event.wait(timeout=timeout)
                 self._batch_ready_event.clear()
 
                 # Perform send/retry logic
@@ -132,12 +641,16 @@ class EventsWorker:
                 # shutdown breaks now instead of blocking in one more wait()
                 # (need consistent view of state)
                 with self._lock:
-                    if (
-                        self._stop_event.is_set()
-                        and not self._queue
-                        and not self._batches
-                    ):
+                    self._passed.notify_all()
+                    if self._stop_event.is_set():
+                        if self._queued_len() or self._batches:
+                            if not self._out_of_time():
+                                continue
+                            self._abandon_pending()
+                        self._abandon_replay()
                         break
+
+                self._emit_client_stats()
             except Exception:
                 # An unexpected error (e.g. a misconfigured timeout value) must
                 # not kill the worker thread — that would silently drop every
@@ -156,79 +669,631 @@ class EventsWorker:
         each batch with retry/backoff. Update throttled state and pending list.
         """
         with self._lock:
-            # If there are new queued events, package them as a fresh batch
+            self._resize_lanes()
+            expired = 0
+
+            # Package queued events into fresh batches for each lane, cut by
+            # count and size
             # Use popleft() which is atomic/thread-safe (unlike list() or clear())
-            batch = []
-            while True:
-                try:
-                    batch.append(self._queue.popleft())
-                except IndexError:
+            spool = self._current_spool()
+            batch_size = max(1, int(self.config.events_batch_size))
+            max_bytes = self._max_batch_bytes()
+            max_age = self._max_age()
+            for lane in self._lanes.values():
+                batch = None
+                for event, line, queued_at in self._drain(lane):
+                    if max_age and time.monotonic() - queued_at > max_age:
+                        lane.slots.release(1)
+                        lane.byte_budget.release(byte_cost(line))
+                        lane.dropped[EXPIRED] += 1
+                        expired += 1
+                        continue
+                    if batch is not None and (
+                        len(batch) >= batch_size
+                        or len(batch.body) + 1 + len(line) > max_bytes
+                    ):
+                        self._add_batch(batch, spool)
+                        batch = None
+                    if batch is None:
+                        batch = EventBatch(lane.name)
+                        batch.queued_at = queued_at
+                    batch.add(event, line)
+                if batch is not None:
+                    self._add_batch(batch, spool)
+            if expired:
+                self._notify_space()
+
+            if spool is not None and self._deadline is None:
+                self._replay_spooled(spool)
+            self._batches = self._interleave(self._batches)
+            if self._deadline is not None:
+                self._batches = deque(sorted(self._batches, key=self._drain_order))
+
+            new: Deque[Batch] = deque()
+            hold_wait: Optional[float] = None
+            scheduler = getattr(self.connection, "scheduler", None)
+
+            # Still paused by a 429: send nothing, whatever woke us
+            throttle_left = self._throttled_until - time.monotonic()
+            throttled = throttle_left > 0
+            if throttled:
+                self._throttle_wait = throttle_left
+
+            # Send in waves of up to events_concurrency batches, in FIFO
+            # order, and handle the results in the same order
+            concurrency = self._concurrency()
+            while (
+                self._batches
+                and not throttled
+                and hold_wait is None
+                and (self._deadline is None or time.monotonic() < self._deadline)
+            ):
+                wave: List[Batch] = []
+                while self._batches and len(wave) < concurrency:
+                    if self._expired(self._batches[0], max_age, spool):
+                        self._batches.popleft()
+                        continue
+                    # Backing off from a failed send: it keeps its place
+                    if self._batches[0][0].not_before > time.monotonic():
+                        new.append(self._batches.popleft())
+                        continue
+                    # Paced, or giving way to notices: not an attempt either
+                    if scheduler is not None:
+                        wait = scheduler.reserve(self.config, EVENT_BATCH)
+                        if wait > 0:
+                            hold_wait = wait
+                            break
+                    wave.append(self._batches.popleft())
+                if not wave:
                     break
 
-            if batch:
-                self._batches.append((batch, 0))
-                self._start_time = time.monotonic()
+                results = self._send_wave([batch for batch, _, _ in wave])
+                for (batch, attempts, record_id), result in zip(wave, results):
+                    if scheduler is not None and result.status in (
+                        EventsSendStatus.OK,
+                        EventsSendStatus.REJECTED,
+                    ):
+                        scheduler.delivered()
 
-            new: Deque[Tuple[List[Event], int]] = deque()
-            throttled = False
+                    if result.status == EventsSendStatus.OK:
+                        self._sent += len(batch)
+                        self._histograms["batch_retries"].record(attempts)
+                        self._release(batch)
+                        if spool is not None:
+                            spool.ack(record_id)
+                        continue
 
-            # Process each batch in FIFO order
-            while self._batches:
-                batch, attempts = self._batches.popleft()
-                # If already throttled earlier this pass, skip sends
-                if throttled:
-                    new.append((batch, attempts))
-                    continue
+                    if result.status == EventsSendStatus.REJECTED:
+                        self._isolate_rejected(batch, record_id, result, spool)
+                        continue
 
-                # Attempt to send; wrap in try/except for resiliency
-                try:
-                    result = self.connection.send_events(self.config, batch)
-                except Exception as err:
-                    self.log.exception("Unexpected error sending batch")
-                    result = EventsSendResult(EventsSendStatus.ERROR, str(err))
-
-                if result.status == EventsSendStatus.OK:
-                    continue
-
-                attempts += 1
-                # Rate-limited path
-                if result.status == EventsSendStatus.THROTTLING:
-                    throttled = True
-                    self.log.warning(
-                        f"Rate limited – backing off {self.config.events_throttle_wait}s"
-                    )
-                else:
-                    reason = result.reason or "unknown"
-                    self.log.debug(f"Batch failed (attempt {attempts}): {reason}")
+                    # Breaker open: nothing was sent, so this isn't an attempt
+                    if result.status == EventsSendStatus.CIRCUIT_OPEN:
+                        hold_wait = result.retry_after or 1.0
+                        new.append((batch, attempts, record_id))
+                        continue
 
-                # Retry or drop based on max_retries
-                if attempts < self.config.events_max_batch_retries:
-                    new.append((batch, attempts))
-                else:
-                    self.log.debug(f"Dropping batch after {attempts} retries")
+                    attempts += 1
+                    # Rate-limited path
+                    if result.status == EventsSendStatus.THROTTLING:
+                        # One 429 per wave counts; the rest are the same one
+                        if not throttled:
+                            throttled = True
+                            self._throttle_wait = self._throttle_delay(
+                                scheduler, result
+                            )
+                            self._throttled_until = (
+                                time.monotonic() + self._throttle_wait
+                            )
+                            self.log.warning(
+                                f"Rate limited – backing off {self._throttle_wait:.1f}s"
+                            )
+                    else:
+                        reason = result.reason or "unknown"
+                        self.log.debug(f"Batch failed (attempt {attempts}): {reason}")
+                        delay = self._retry_delay(attempts, result)
+                        batch.not_before = time.monotonic() + delay
+
+                    # Retry or drop based on max_retries
+                    if attempts < self.config.events_max_batch_retries:
+                        new.append((batch, attempts, record_id))
+                        continue
+
+                    self._release(batch)
+                    self._histograms["batch_retries"].record(attempts)
+                    if record_id is not None:
+                        self.log.debug(
+                            f"Giving up on batch after {attempts} retries; "
+                            "leaving it in the spool"
+                        )
+                    else:
+                        self._gave_up += len(batch)
+                        self.log.debug(f"Dropping batch after {attempts} retries")
+
+            # Anything not reached this pass keeps its place
+            new.extend(self._batches)
+
+            # Sleep until the first backed-off batch falls due
+            now = time.monotonic()
+            retry_at = min(
+                (b.not_before for b, _, _ in new if b.not_before > now), default=None
+            )
+            retry_wait = None if retry_at is None else retry_at - now
 
             # Replace batch list and set throttling flag
             self._batches = new
             self._throttled = throttled
+            self._hold_wait = hold_wait
+            self._retry_wait = retry_wait
+
+    def _drain_order(self, item: Batch) -> Tuple[int, float]:
+        batch = item[0]
+        return self._DRAIN_ORDER[batch.lane], -batch.queued_at
+
+    def _drain_wait(self) -> float:
+        """While shutting down: how long until the next pass may send."""
+        if (
+            self._throttled
+            or self._hold_wait is not None
+            or self._retry_wait is not None
+        ):
+            return self._compute_timeout()
+        return 0.0
+
+    def _out_of_time(self) -> bool:
+        """Whether the next send would start past the shutdown deadline."""
+        if self._deadline is None:
+            return False
+        return time.monotonic() + self._drain_wait() >= self._deadline
+
+    def _abandon_pending(self) -> None:
+        """Give up on everything still held at the shutdown deadline."""
+        events = dict.fromkeys(self._lanes, 0)
+        spooled = 0
+        for batch, _, record_id in self._batches:
+            events[batch.lane] += len(batch)
+            if record_id is not None:
+                spooled += len(batch)
+            self._release(batch)
+        batches = len(self._batches)
+        self._batches.clear()
+        queued = 0
+        for lane in self._lanes.values():
+            for _, line, _ in self._drain(lane):
+                events[lane.name] += 1
+                queued += 1
+                lane.slots.release(1)
+                lane.byte_budget.release(byte_cost(line))
+        self._notify_space()
+
+        total = sum(events.values())
+        self._abandoned += total
+        lanes = ", ".join(f"{name}: {n}" for name, n in events.items())
+        self.log.warning(
+            f"Shutdown deadline reached; abandoning {total} event(s) ({lanes}) "
+            f"in {batches} batch(es) and {queued} not yet batched"
+            + (f"; {spooled} remain in the spool for replay" if spooled else "")
+        )
+
+    def _emit_client_stats(self) -> None:
+        """
+        Every events_client_stats_interval seconds, queue this worker's
+        delivery stats as a honeybadger.client_stats event.
+        """
+        interval = float(self.config.events_client_stats_interval)
+        now = time.monotonic()
+        if interval <= 0 or now - self._stats_emitted < interval:
+            return
+        if self._stop_event.is_set():
+            return
+        self._stats_emitted = now
+        stats = self.get_stats()
+        ts = datetime.datetime.now(datetime.timezone.utc)
+        self.push(
+            {
+                "event_type": CLIENT_STATS,
+                "ts": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "pid": os.getpid(),
+                **{
+                    key: stats[key]
+                    for key in (
+                        "queue_size",
+                        "total_events",
+                        "total_bytes",
+                        "sent_events",
+                        "dropped_by_reason",
+                        "histograms",
+                    )
+                },
+            }
+        )
+
+    def _concurrency(self) -> int:
+        return max(1, int(self.config.events_concurrency))
+
+    def _send(self, batch: EventBatch) -> EventsSendResult:
+        # Attempt to send; wrap in try/except for resiliency
+        began = time.monotonic()
+        try:
+            return self.connection.send_events(self.config, batch)
+        except Exception as err:
+            self.log.exception("Unexpected error sending batch")
+            return EventsSendResult(EventsSendStatus.ERROR, str(err))
+        finally:
+            elapsed = time.monotonic() - began
+            self._histograms["send_latency_ms"].record(elapsed * 1000)
+
+    def _send_wave(self, batches: List[EventBatch]) -> List[EventsSendResult]:
+        """Send batches at once, on the sender pool, and return their results."""
+        if len(batches) == 1:
+            return [self._send(batches[0])]
+
+        concurrency = self._concurrency()
+        if self._senders is None or self._senders.size != concurrency:
+            if self._senders is not None:
+                self._senders.shutdown()
+            try:
+                self._senders = SenderPool(
+                    concurrency, f"honeybadger-events-sender-{os.getpid()}"
+                )
+            except RuntimeError:
+                # Too late in interpreter shutdown to start threads
+                self._senders = None
+                return [self._send(batch) for batch in batches]
+        return self._senders.map(self._send, batches)
+
+    def _throttle_delay(self, scheduler: Any, result: EventsSendResult) -> float:
+        """
+        How long to back off after a 429: Retry-After if the API sent one,
+        else a growing, jittered wait of up to events_throttle_wait.
+        """
+        cap = float(self.config.events_throttle_wait)
+        if scheduler is not None:
+            return scheduler.throttled(result.retry_after, cap)
+        if result.retry_after is not None:
+            return result.retry_after
+        return cap
+
+    def _retry_delay(self, attempts: int, result: EventsSendResult) -> float:
+        """Jittered exponential backoff from events_timeout for a failed batch."""
+        base = float(self.config.events_timeout)
+        cap = max(base, float(self.config.events_throttle_wait))
+        delay = backoff(attempts, base, cap)
+        if result.retry_after is not None:
+            delay = max(delay, result.retry_after)
+        return delay
+
+    def _isolate_rejected(
+        self,
+        batch: EventBatch,
+        record_id: Optional[str],
+        result: EventsSendResult,
+        spool: Optional[Spool],
+    ) -> None:
+        """
+        Split a rejected batch and put the halves at the front of the queue,
+        to be sent in this same pass. A single rejected event is dropped.
+        """
+        if len(batch) <= 1:
+            self._release(batch)
+            self._rejected += len(batch)
+            self._rejected_sample.extend(batch)
+            self.log.warning(
+                f"Dropping event rejected by the API ({result.reason or 'unknown'})"
+            )
+        else:
+            self.log.debug(
+                f"Batch of {len(batch)} rejected ({result.reason or 'unknown'}); "
+                "splitting to isolate the bad events"
+            )
+            for half in reversed(batch.split()):
+                half_id = spool.append(EVENTS, half.body) if spool is not None else None
+                self._batches.appendleft((half, 0, half_id))
+
+        if spool is not None:
+            spool.ack(record_id)
 
     def _compute_timeout(self) -> float:
         """
         Determine sleep time: use backoff if throttled, else fixed flush interval.
         """
         if self._throttled:
-            return self.config.events_throttle_wait
+            return self._throttle_wait
+        if self._hold_wait is not None:
+            return self._hold_wait
+        if self._retry_wait is not None:
+            return self._retry_wait
+        if self._replay_paths:
+            return min(float(self.config.events_timeout), 1.0)
         return self.config.events_timeout
 
-    def _drop(self) -> None:
+    def _current_spool(self) -> Optional[Spool]:
+        """
+        The spool for the current config. The first time a spool is seen,
+        claim the segments earlier processes left behind for replay.
         """
-        Increment drop counter and occasionally log a summary.
+        spool = get_spool(self.config)
+        if spool is not None and spool is not self._spool:
+            self._abandon_replay()
+            self._spool = spool
+            self._replay_paths.extend(spool.claim_orphans())
+            if self._replay_paths:
+                self.log.info(
+                    f"Replaying {len(self._replay_paths)} spooled segment(s) "
+                    f"from {spool.directory}"
+                )
+        return spool
+
+    def _replay_spooled(self, spool: Spool) -> None:
         """
-        self._dropped += 1
+        Re-queue records from claimed segments, limited to spool_replay_rate
+        per second so a backlog doesn't arrive at the API all at once.
+        Replayed batches are appended to the live spool before their old
+        segment is deleted, so a crash mid-replay loses nothing. Notices this
+        connection can't send are carried over to the live spool, unacked,
+        for a later process to deliver.
+        """
+        if not self._replay_paths:
+            return
+
+        rate = float(self.config.spool_replay_rate)
+        now = time.monotonic()
+        self._replay_budget = min(
+            max(rate, 1.0), self._replay_budget + (now - self._replay_checked) * rate
+        )
+        self._replay_checked = now
+
+        kept_notices = 0
+        while self._replay_paths and self._replay_budget >= 1:
+            if self._replay_records is None:
+                self._replay_records = read_segment(self._replay_paths[0])
+            record = next(self._replay_records, None)
+            if record is None:
+                self._replay_records = None
+                spool.release(self._replay_paths.popleft())
+                continue
+
+            self._replay_budget -= 1
+            kind, body = record
+            if kind == EVENTS:
+                replayed = EventBatch.from_body(body)
+                if replayed:
+                    replayed.lane = self._lane_for(replayed[0]).name
+                lane = self._lanes[replayed.lane]
+                lane.slots.take(len(replayed))
+                lane.byte_budget.take(replayed.cost)
+                self._batched_cost += replayed.cost
+                self._batches.append((replayed, 0, spool.append(EVENTS, body)))
+            elif kind == NOTICE:
+                send_notice_body = getattr(self.connection, "send_notice_body", None)
+                if send_notice_body is not None:
+                    send_notice_body(self.config, body)
+                else:
+                    spool.append(NOTICE, body)
+                    kept_notices += 1
+
+        if kept_notices:
+            self.log.warning(
+                f"Kept {kept_notices} spooled notice(s) for a later process: "
+                "this connection can't send notices"
+            )
+
+    def _abandon_replay(self) -> None:
+        """Leave unreplayed segments on disk for the next process."""
+        if self._replay_records is not None:
+            self._replay_records.close()
+            self._replay_records = None
+        if self._spool is not None:
+            for path in self._replay_paths:
+                self._spool.release_claim(path)
+        self._replay_paths.clear()
+
+    def _drop(self, lane: Lane, policy: str) -> None:
+        """
+        Increment drop counters and occasionally log a summary.
+        """
+        lane.dropped[policy] += 1
+        self._dropped_since_log += 1
         now = time.monotonic()
         if now - self._last_drop_log >= self._DROP_LOG_INTERVAL:
-            self.log.info(f"Dropped {self._dropped} events (queue full)")
-            self._dropped = 0
+            self.log.info(f"Dropped {self._dropped_since_log} events (queue full)")
+            self._dropped_since_log = 0
             self._last_drop_log = now
 
-    def _all_events_queued_len(self) -> int:
-        return len(self._queue) + sum(len(b) for b, _ in self._batches)
+    def _add_batch(self, batch: EventBatch, spool: Optional[Spool]) -> None:
+        record_id = None
+        if spool is not None:
+            record_id = spool.append(EVENTS, batch.body)
+        self._batches.append((batch, 0, record_id))
+        self._batched_cost += batch.cost
+        self._start_time = time.monotonic()
+        self._histograms["batch_events"].record(len(batch))
+        self._histograms["batch_bytes"].record(len(batch.body))
+
+    def _release(self, batch: EventBatch) -> None:
+        """Return the places held by a batch that has left the queue."""
+        lane = self._lanes[batch.lane]
+        lane.slots.release(len(batch))
+        lane.byte_budget.release(batch.cost)
+        self._batched_cost -= batch.cost
+        self._notify_space()
+
+    def _notify_space(self) -> None:
+        """Wake pushes blocked waiting for room in the queue."""
+        with self._space:
+            self._space.notify_all()
+
+    def _claim(self, lane: Lane, line: bytes) -> bool:
+        if not lane.slots.claim():
+            return False
+        if not lane.byte_budget.claim(byte_cost(line)):
+            lane.slots.release(1)
+            return False
+        return True
+
+    def _evict_oldest(self, lane: Lane, line: bytes) -> bool:
+        """Drop the lane's longest-queued events until the new one fits."""
+        claimed = False
+        with lane.lock:
+            while lane.queue and not claimed:
+                _, old_line, _ = lane.queue.popleft()
+                lane.slots.release(1)
+                lane.byte_budget.release(byte_cost(old_line))
+                self._drop(lane, DROP_OLDEST)
+                claimed = self._claim(lane, line)
+        self._notify_space()
+        return claimed
+
+    def _wait_for_space(self, lane: Lane, line: bytes) -> bool:
+        """Wait up to events_block_timeout for batches to go out."""
+        if threading.current_thread() is self._thread:
+            return False
+        self._blocked += 1
+        deadline = time.monotonic() + float(self.config.events_block_timeout)
+        self._batch_ready_event.set()
+        with self._space:
+            while not self._claim(lane, line):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._space.wait(remaining)
+        return True
+
+    def _sample(self, lane: Lane, queued: Queued, seen: int) -> bool:
+        """
+        Reservoir sampling over the events offered since the lane's queue was
+        last drained: the seen-th event replaces a random queued one with
+        probability (queue length / seen).
+        """
+        _, line, _ = queued
+        with lane.lock:
+            index = random.randrange(max(seen, 1))
+            replaced = index < len(lane.queue) and lane.byte_budget.claim(
+                byte_cost(line)
+            )
+            if replaced:
+                _, old_line, _ = lane.queue[index]
+                lane.queue[index] = queued
+                lane.byte_budget.release(byte_cost(old_line))
+            self._drop(lane, RESERVOIR)
+        if replaced and len(old_line) > len(line):
+            self._notify_space()
+        return replaced
+
+    def _drain(self, lane: Lane) -> List[Queued]:
+        """Take everything queued in a lane, and start a new sampling window."""
+        drained = []
+        with lane.lock:
+            # popleft() rather than clear(), which could lose a concurrent push
+            while True:
+                try:
+                    drained.append(lane.queue.popleft())
+                except IndexError:
+                    break
+            lane.seen = count(1)
+        return drained
+
+    def _expired(self, pending: Batch, max_age: float, spool: Optional[Spool]) -> bool:
+        """Drop a batch that has waited longer than events_max_age."""
+        batch, _, record_id = pending
+        if not max_age or time.monotonic() - batch.queued_at <= max_age:
+            return False
+        self._release(batch)
+        self._lanes[batch.lane].dropped[EXPIRED] += len(batch)
+        if spool is not None:
+            spool.ack(record_id)
+        self.log.debug(f"Dropping batch of {len(batch)} events older than {max_age}s")
+        return True
+
+    def _queued_len(self) -> int:
+        return sum(len(lane.queue) for lane in self._lanes.values())
+
+    def _held_bytes(self) -> int:
+        return sum(len(lane.byte_budget) for lane in self._lanes.values())
+
+    def _lane_for(self, event: Event) -> Lane:
+        event_type = event.get("event_type") if isinstance(event, dict) else None
+        try:
+            lane = self._lane_cache.get(event_type)
+        except TypeError:  # unhashable
+            return self._lanes[DEFAULT]
+        if lane is None:
+            critical, bulk = self._lane_types
+            name = DEFAULT
+            if isinstance(event_type, str):
+                if any(fnmatchcase(event_type, p) for p in critical):
+                    name = CRITICAL
+                elif any(fnmatchcase(event_type, p) for p in bulk):
+                    name = BULK
+            lane = self._lanes[name]
+            if len(self._lane_cache) < self._LANE_CACHE_SIZE:
+                self._lane_cache[event_type] = lane
+        return lane
+
+    def _resize_lanes(self) -> None:
+        """
+        Follow changes to the lane config: declared lanes get their quota of
+        the queue limits, the default lane the rest.
+        """
+        critical = tuple(self.config.events_critical_types or ())
+        bulk = tuple(self.config.events_bulk_types or ())
+        if (critical, bulk) != self._lane_types:
+            self._lane_types = (critical, bulk)
+            self._lane_cache = {}
+
+        quotas = {
+            CRITICAL: float(self.config.events_critical_quota),
+            BULK: float(self.config.events_bulk_quota),
+        }
+        shares = {
+            CRITICAL: min(1.0, max(0.0, quotas[CRITICAL])) if critical else 0.0,
+            BULK: min(1.0, max(0.0, quotas[BULK])) if bulk else 0.0,
+        }
+        shares[BULK] = min(shares[BULK], 1.0 - shares[CRITICAL])
+
+        grown = False
+        for capacity, slots_of in (
+            (self._max_queue_size(), lambda lane: lane.slots),
+            (self._max_queue_bytes(), lambda lane: lane.byte_budget),
+        ):
+            left = capacity
+            for name in (CRITICAL, BULK):
+                share = int(capacity * shares[name])
+                grown = share > slots_of(self._lanes[name]).capacity or grown
+                slots_of(self._lanes[name]).resize(share)
+                left -= share
+            grown = left > slots_of(self._lanes[DEFAULT]).capacity or grown
+            slots_of(self._lanes[DEFAULT]).resize(left)
+        if grown:
+            self._notify_space()
+
+    def _interleave(self, batches: Deque[Batch]) -> Deque[Batch]:
+        """
+        Order pending batches in weighted turns across lanes, keeping each
+        lane's batches in FIFO order.
+        """
+        by_lane: Dict[str, Deque[Batch]] = {name: deque() for name in self._lanes}
+        for pending in batches:
+            by_lane[pending[0].lane].append(pending)
+        if sum(1 for queued in by_lane.values() if queued) <= 1:
+            return batches
+
+        ordered: Deque[Batch] = deque()
+        while len(ordered) < len(batches):
+            for name, lane in self._lanes.items():
+                queued = by_lane[name]
+                for _ in range(min(lane.weight, len(queued))):
+                    ordered.append(queued.popleft())
+        return ordered
+
+    def _max_queue_size(self) -> int:
+        return max(0, int(self.config.events_max_queue_size))
+
+    def _max_queue_bytes(self) -> int:
+        return max(0, int(self.config.events_max_queue_bytes))
+
+    def _max_age(self) -> float:
+        return float(self.config.events_max_age)
+
+    def _max_batch_bytes(self) -> int:
+        return int(self.config.events_max_batch_bytes)
@@ -1,5 +1,6 @@
 import logging
 from .types import EventsSendResult, EventsSendStatus
+from .utils import compress_body, encode_events
 
 logger = logging.getLogger(__name__)
 
@@ -20,4 +21,13 @@ def send_events(config, payload) -> EventsSendResult:
     logger.debug(
         "[send_events] config used is {} with payload {}".format(config, payload)
     )
+    body = getattr(payload, "body", None)
+    if body is None:
+        body = encode_events(payload)
+    data, content_encoding = compress_body(config, body)
+    logger.debug(
+        "[send_events] body is {} bytes (Content-Encoding: {})".format(
+            len(data), content_encoding or "identity"
+        )
+    )
     return EventsSendResult(EventsSendStatus.OK)
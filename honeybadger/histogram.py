@@ -0,0 +1,65 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence
+
+
+def exponential_bounds(start: float, factor: float, count: int) -> List[float]:
+    """Bucket upper bounds start, start * factor, ... count of them."""
+    return [start * factor**i for i in range(count)]
+
+
+class Histogram:
+    """
+    Counts recorded values in fixed buckets, so memory stays constant however
+    many values are recorded. Percentiles are reported as the upper bound of
+    the bucket they fall in, capped at the largest value seen; values above
+    the last bound share an overflow bucket.
+    """
+
+    _PERCENTILES = (50, 90, 99)
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self._bounds = list(bounds)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+
+    def record(self, value: float) -> None:
+        i = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            if not self._count or value < self._min:
+                self._min = value
+            if not self._count or value > self._max:
+                self._max = value
+            self._count += 1
+            self._sum += value
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = {
+                "count": self._count,
+                "sum": self._sum,
+                "min": self._min,
+                "max": self._max,
+                "mean": self._sum / self._count if self._count else 0.0,
+            }
+            for p in self._PERCENTILES:
+                stats[f"p{p}"] = self._percentile(p)
+            return stats
+
+    def _percentile(self, p: float) -> float:
+        if not self._count:
+            return 0.0
+        rank = p / 100 * self._count
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank and n:
+                if i == len(self._bounds):
+                    return self._max
+                return min(self._bounds[i], self._max)
+        return self._max
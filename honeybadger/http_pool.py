@@ -0,0 +1,244 @@
+import http.client
+import logging
+import ssl
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import SplitResult, urlsplit
+from urllib import request
+
+from .utils import reinit_after_fork
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, int]
+
+
+class PooledResponse:
+    """
+    A fully-read HTTP response. Mirrors the parts of urllib's response object
+    that the connection module relies on, so callers don't care whether the
+    request went through the pool or fell back to urllib.
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def getcode(self) -> int:
+        return self.status
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+    def read(self) -> bytes:
+        return self.body
+
+
+class HTTPConnectionPool:
+    """
+    Keeps idle keep-alive connections per (scheme, host, port) so notices and
+    event batches don't pay for a TCP and TLS handshake on every send.
+
+    A reused connection the server has since closed is detected when the
+    request fails, and the request is retried once on a fresh connection.
+    """
+
+    def __init__(self, maxsize: int = 4, idle_timeout: float = 50.0) -> None:
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolKey, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        reinit_after_fork(self)
+
+    def urlopen(
+        self,
+        req: request.Request,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+    ) -> PooledResponse:
+        """
+        Perform a urllib Request over a pooled connection. Unlike
+        request.urlopen, error statuses are returned rather than raised;
+        network failures are raised as URLError.
+
+        timeout bounds each socket read and write; connect_timeout (which
+        defaults to timeout) bounds opening a new connection.
+        """
+        if connect_timeout is None:
+            connect_timeout = timeout
+
+        parts = urlsplit(req.full_url)
+        if _uses_proxy(parts):
+            # http.client knows nothing about proxies; let urllib handle them.
+            return _urllib_open(req, timeout)
+
+        key = _pool_key(parts)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        method = req.get_method()
+        headers = dict(req.header_items())
+
+        conn, reused = self._checkout(key, timeout)
+        try:
+            self._open(conn, connect_timeout, timeout)
+            response = self._send(conn, method, path, req.data, headers)
+        except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine) as e:
+            conn.close()
+            if not reused:
+                raise URLError(e)
+            logger.debug(
+                "Pooled connection to %s:%s went stale; reconnecting", *key[1:]
+            )
+            conn = self._connect(key, timeout)
+            try:
+                self._open(conn, connect_timeout, timeout)
+                response = self._send(conn, method, path, req.data, headers)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise URLError(e)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise URLError(e)
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+        return PooledResponse(
+            response.status,
+            {k.lower(): v for k, v in response.getheaders()},
+            response.data,  # type: ignore[attr-defined]
+        )
+
+    def warm(self, url: str, timeout: Optional[float] = None) -> None:
+        """
+        Resolve, connect and handshake with the host of url ahead of time and
+        park the connection in the pool.
+        """
+        parts = urlsplit(url)
+        if _uses_proxy(parts):
+            return
+        key = _pool_key(parts)
+        conn = self._connect(key, timeout)
+        conn.connect()
+        self._checkin(key, conn)
+
+    def clear(self) -> None:
+        """Close and forget every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    def _after_fork(self) -> None:
+        """
+        A forked child must not talk on the parent's connections: the two
+        would interleave requests and read each other's responses. Closing
+        the child's copies leaves the parent's open.
+        """
+        self._lock = threading.Lock()
+        self.clear()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(conns) for conns in self._idle.values())
+
+    def _checkout(
+        self, key: PoolKey, timeout: Optional[float]
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            conns = self._idle.get(key, [])
+            while conns:
+                conn, last_used = conns.pop()
+                if now - last_used < self.idle_timeout:
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    conn.timeout = timeout
+                    return conn, True
+                conn.close()
+        return self._connect(key, timeout), False
+
+    def _checkin(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.maxsize:
+                conns.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _connect(
+        self, key: PoolKey, timeout: Optional[float]
+    ) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    @staticmethod
+    def _open(
+        conn: http.client.HTTPConnection,
+        connect_timeout: Optional[float],
+        timeout: Optional[float],
+    ) -> None:
+        """Connect a new connection under connect_timeout, then switch to timeout."""
+        if conn.sock is not None:
+            return
+        conn.timeout = connect_timeout
+        conn.connect()
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+    @staticmethod
+    def _send(conn, method, path, body, headers) -> http.client.HTTPResponse:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        # Drain the body so the connection can be reused.
+        response.data = response.read()  # type: ignore[attr-defined]
+        return response
+
+
+def _pool_key(parts: SplitResult) -> PoolKey:
+    scheme = parts.scheme.lower()
+    port = parts.port or (443 if scheme == "https" else 80)
+    return (scheme, parts.hostname or "", port)
+
+
+def _uses_proxy(parts: SplitResult) -> bool:
+    proxies = request.getproxies()
+    if parts.scheme not in proxies:
+        return False
+    return not request.proxy_bypass(parts.hostname or "")
+
+
+def _urllib_open(req: request.Request, timeout: Optional[float]) -> PooledResponse:
+    try:
+        try:
+            resp = request.urlopen(req, timeout=timeout)
+        except HTTPError as e:
+            resp = e
+        headers = (
+            {k.lower(): v for k, v in resp.headers.items()} if resp.headers else {}
+        )
+        return PooledResponse(resp.getcode(), headers, resp.read())
+    except URLError:
+        raise
+    except (OSError, http.client.HTTPException) as e:
+        # e.g. a timeout or disconnect while reading the body
+        raise URLError(e)
+
+
+default_pool = HTTPConnectionPool()
@@ -0,0 +1,343 @@
+import os
+import time
+import heapq
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .scheduler import NOTICE, DeliveryScheduler, backoff
+from .types import EventsSendResult, EventsSendStatus
+from .utils import reinit_after_fork
+
+DROP_NEWEST = "newest"
+DROP_OLDEST = "oldest"
+
+MAX_RETRY_BACKOFF = 300.0  # seconds
+
+
+@dataclass
+class _NoticeJob:
+    config: Any
+    send: Callable[[], EventsSendResult]
+    on_drop: Optional[Callable[[], None]] = None
+    attempts: int = 0
+
+    def dropped(self) -> None:
+        if self.on_drop is not None:
+            self.on_drop()
+
+
+@dataclass(order=True)
+class _Retry:
+    due: float
+    seq: int
+    job: _NoticeJob = field(compare=False)
+
+
+class NoticesWorker:
+    """
+    Delivers notices on a fixed pool of threads fed by a bounded queue, so an
+    error storm costs a constant number of threads and queued payloads instead
+    of one thread per notice.
+
+    Failed sends are retried with jittered exponential backoff up to
+    notices_max_retries times; a rejected notice (4xx) is not retried. A
+    429 pauses every sender for as long as Retry-After asks, or else for a
+    growing, jittered wait of up to notices_throttle_wait seconds. With a
+    scheduler, every send first takes a token from it.
+    While the circuit breaker is open, delivery pauses without using up any
+    notice's retries.
+
+    Threads are started on the first push. Pool size, queue size, drop policy
+    and retry settings are read from the config passed with each notice.
+    """
+
+    _DROP_LOG_INTERVAL = 60.0  # seconds
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        scheduler: Optional[DeliveryScheduler] = None,
+    ) -> None:
+        self.log = logger or logging.getLogger(__name__)
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+
+        self._queue: Deque[_NoticeJob] = deque()
+        self._retries: List[_Retry] = []
+        self._retry_seq = 0
+        self._threads: List[threading.Thread] = []
+        self._in_flight = 0
+        self._generation = 0
+        self._paused_until = 0.0
+
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._rejected = 0
+        self._dropped: Dict[str, int] = {DROP_NEWEST: 0, DROP_OLDEST: 0}
+        self._last_drop_log = 0.0
+        reinit_after_fork(self)
+
+    def push(
+        self,
+        config: Any,
+        send: Callable[[], EventsSendResult],
+        on_drop: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Queue a prepared send for delivery. Returns False if the notice was
+        dropped because the queue is full and the policy drops newest.
+        on_drop is called for a notice the full queue drops, under either
+        policy, with the worker's lock held.
+        """
+        job = _NoticeJob(config, send, on_drop)
+        with self._lock:
+            self._start_threads(config)
+
+            if self._pending() >= max(1, int(config.notices_max_queue_size)):
+                if config.notices_drop_policy == DROP_OLDEST and self._queue:
+                    self._queue.popleft().dropped()
+                    self._record_drop(DROP_OLDEST)
+                else:
+                    job.dropped()
+                    self._record_drop(DROP_NEWEST)
+                    return False
+
+            self._queue.append(job)
+            self._ready.notify()
+            return True
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """
+        Wait up to timeout for queued notices to go out, then stop. Returns
+        early if delivery is paused past the deadline or no threads are left
+        to deliver them, logging the notices it leaves behind.
+        """
+        self.flush(timeout)
+        with self._lock:
+            if self._pending():
+                self.log.warning(
+                    f"Shutting down with {len(self._queue)} notice(s) queued and "
+                    f"{len(self._retries)} awaiting retry; abandoning them"
+                )
+            self._generation += 1
+            self._ready.notify_all()
+            threads, self._threads = self._threads, []
+
+        for t in threads:
+            t.join(0.1)
+
+    def flush(self, timeout: float) -> Dict[str, int]:
+        """
+        Wait up to timeout for queued notices to go out, leaving the threads
+        running. Returns early on the same terms as shutdown(), with how many
+        notices were sent meanwhile and how many were still pending.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            sent = self._sent
+            self._idle.wait_for(
+                lambda: self._cannot_progress(deadline), timeout=timeout
+            )
+            return {
+                "sent_notices": self._sent - sent,
+                "pending_notices": self._pending() + self._in_flight,
+            }
+
+    def resume(self) -> None:
+        """Lift a throttling or circuit-breaker pause early."""
+        with self._lock:
+            self._paused_until = 0.0
+            self._ready.notify_all()
+
+    def _after_fork(self) -> None:
+        """
+        In a forked child: the sender threads are gone and any lock they held
+        stays held. Queued notices belong to the parent, which still sends
+        them; threads start again on the next push().
+        """
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._queue.clear()
+        self._retries = []
+        self._threads = []
+        self._in_flight = 0
+        self._generation += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_size": len(self._queue),
+                "retry_queue_size": len(self._retries),
+                "in_flight": self._in_flight,
+                "workers": len(self._threads),
+                "sent_notices": self._sent,
+                "retried_notices": self._retried,
+                "failed_notices": self._failed,
+                "rejected_notices": self._rejected,
+                "dropped_notices": sum(self._dropped.values()),
+                "dropped_by_policy": dict(self._dropped),
+                "throttling": self._paused_until > time.monotonic(),
+            }
+
+    def _cannot_progress(self, deadline: float) -> bool:
+        if self._in_flight:
+            return False
+        if not self._pending():
+            return True
+        if self._paused_until >= deadline:
+            return True
+        if (
+            self.scheduler is not None
+            and time.monotonic() + self.scheduler.blocked_for() >= deadline
+        ):
+            return True
+        return not any(t.is_alive() for t in self._threads)
+
+    def _pending(self) -> int:
+        return len(self._queue) + len(self._retries)
+
+    def _start_threads(self, config: Any) -> None:
+        self._threads = [t for t in self._threads if t.is_alive()]
+        wanted = max(1, int(config.notices_workers))
+        while len(self._threads) < wanted:
+            t = threading.Thread(
+                target=self._run,
+                args=(self._generation,),
+                name=f"honeybadger-notices-worker-{os.getpid()}-{len(self._threads)}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def _next_job(self, generation: int) -> Optional[_NoticeJob]:
+        """
+        Block until a notice may be sent and return it, or return None once
+        this thread's generation has been retired. Must hold the lock.
+        """
+        while generation == self._generation:
+            now = time.monotonic()
+            if self._paused_until > now:
+                self._ready.wait(self._paused_until - now)
+                continue
+            retry_due = bool(self._retries) and self._retries[0].due <= now
+            if not retry_due and not self._queue:
+                timeout = self._retries[0].due - now if self._retries else None
+                self._ready.wait(timeout)
+                continue
+
+            job = self._retries[0].job if retry_due else self._queue[0]
+            wait = self._pace(job)
+            if wait > 0:
+                self._ready.wait(wait)
+                continue
+            if retry_due:
+                heapq.heappop(self._retries)
+            else:
+                self._queue.popleft()
+            return job
+        return None
+
+    def _pace(self, job: _NoticeJob) -> float:
+        if self.scheduler is None:
+            return 0.0
+        return self.scheduler.reserve(job.config, NOTICE)
+
+    def _run(self, generation: int) -> None:
+        while True:
+            with self._lock:
+                job = self._next_job(generation)
+                if job is None:
+                    return
+                self._in_flight += 1
+
+            try:
+                result = job.send()
+            except Exception as err:
+                self.log.exception("Unexpected error delivering notice")
+                result = EventsSendResult(EventsSendStatus.ERROR, str(err))
+
+            with self._lock:
+                self._in_flight -= 1
+                self._handle_result(job, result)
+                self._idle.notify_all()
+
+    def _handle_result(self, job: _NoticeJob, result: EventsSendResult) -> None:
+        if result.status in (EventsSendStatus.OK, EventsSendStatus.REJECTED):
+            if self.scheduler is not None:
+                self.scheduler.delivered()
+
+        if result.status == EventsSendStatus.OK:
+            self._sent += 1
+            return
+
+        if result.status == EventsSendStatus.REJECTED:
+            self._rejected += 1
+            self.log.error(
+                "Honeybadger API rejected notice: %s", result.reason or "unknown"
+            )
+            return
+
+        if result.status == EventsSendStatus.CIRCUIT_OPEN:
+            # Not sent, so not an attempt: hold everything until it may be.
+            wait = result.retry_after or 1.0
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+            self._queue.appendleft(job)
+            return
+
+        config = job.config
+        job.attempts += 1
+        if result.status == EventsSendStatus.THROTTLING:
+            cap = float(config.notices_throttle_wait)
+            if self.scheduler is not None:
+                wait = self.scheduler.throttled(result.retry_after, cap)
+            elif result.retry_after is not None:
+                wait = result.retry_after
+            else:
+                wait = cap
+            self._paused_until = max(self._paused_until, time.monotonic() + wait)
+            self.log.warning(f"Rate limited – pausing notice delivery {wait:.1f}s")
+            delay = 0.0
+        else:
+            delay = backoff(
+                job.attempts, float(config.notices_retry_backoff), MAX_RETRY_BACKOFF
+            )
+            if result.retry_after is not None:
+                delay = max(delay, result.retry_after)
+            self.log.debug(
+                f"Notice delivery failed (attempt {job.attempts}): "
+                f"{result.reason or 'unknown'}"
+            )
+
+        if job.attempts > int(config.notices_max_retries):
+            self._failed += 1
+            self.log.error(
+                "Giving up on notice after %s attempts: %s",
+                job.attempts,
+                result.reason or result.status.value,
+            )
+            return
+
+        self._retried += 1
+        self._retry_seq += 1
+        heapq.heappush(
+            self._retries, _Retry(time.monotonic() + delay, self._retry_seq, job)
+        )
+        self._ready.notify()
+
+    def _record_drop(self, policy: str) -> None:
+        self._dropped[policy] += 1
+        now = time.monotonic()
+        if now - self._last_drop_log >= self._DROP_LOG_INTERVAL:
+            self.log.warning(
+                "Notice queue full: dropped %s notices so far (policy: drop %s)",
+                sum(self._dropped.values()),
+                policy,
+            )
+            self._last_drop_log = now
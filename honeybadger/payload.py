@@ -1,3 +1,4 @@
+import functools
 import sys
 import traceback
 import os
@@ -9,6 +10,7 @@ from six.moves import zip
 from io import open
 from datetime import datetime, timezone
 
+from . import serializer
 from .version import __version__
 from .plugins import default_plugin_manager
 from .utils import filter_dict
@@ -47,10 +49,21 @@ def error_payload(exception, exc_traceback, config, fingerprint=None, tags=None)
         # specific enough but this approach seems too specific and
         # would need to be updated if we re-factored the call stack
         # for building a payload.
+        if frame[2] == "__get__" and frame[0] == functools.__file__:
+            return False  # building the Notice.payload cached_property
         return not (
             "honeybadger" in frame[0]
             and frame[2]
-            in ["notify", "_send_notice", "create_payload", "error_payload"]
+            in [
+                "notify",
+                "notify_async",
+                "_send_notice",
+                "_deliver_notice",
+                "send_notice",
+                "payload",
+                "create_payload",
+                "error_payload",
+            ]
         )
 
     def prepare_exception_payload(exception, exclude=None):
@@ -214,3 +227,145 @@ def create_payload(
         payload["correlation_context"] = correlation_context
 
     return default_plugin_manager.generate_payload(payload, config, context)
+
+
+def truncate_payload(payload, max_bytes):
+    """
+    Shrink a notice payload until it encodes to at most max_bytes, trimming
+    long strings, then large collections, then backtrace source, then deep
+    backtraces and cause chains, each step more aggressively than the last.
+    Every trimmed value is replaced by a marker, and the steps taken are
+    listed in payload["notifier"]["truncated"]. The original payload is not
+    modified.
+
+    :return: a tuple of (payload, encoded payload)
+    """
+    body = serializer.dumps(payload)
+    if not max_bytes or len(body) <= max_bytes:
+        return payload, body
+
+    original_size = len(body)
+    applied = []
+    for name, step, limit in _TRUNCATION_STEPS:
+        payload = step(payload, limit)
+        if name not in applied:
+            applied.append(name)
+        payload["notifier"] = dict(payload.get("notifier") or {}, truncated=applied)
+        body = serializer.dumps(payload)
+        if len(body) <= max_bytes:
+            break
+
+    logger.warning(
+        "Notice payload was %s bytes, over the %s byte limit; truncated %s (now %s bytes)",
+        original_size,
+        max_bytes,
+        ", ".join(applied),
+        len(body),
+    )
+    return payload, body
+
+
+def _truncate_strings(value, limit):
+    if isinstance(value, dict):
+        return {k: _truncate_strings(v, limit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_truncate_strings(v, limit) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if not isinstance(value, str):
+        # Encoded as its repr() anyway, and a repr can be arbitrarily long.
+        value = serializer._repr(value)
+    if len(value) > limit:
+        return "{}...[truncated {} chars]".format(value[:limit], len(value) - limit)
+    return value
+
+
+def _truncate_collections(value, limit, key=None):
+    if key in ("backtrace", "causes"):
+        return value  # left to _truncate_frames, which keeps them well-formed
+    if isinstance(value, dict):
+        items = list(value.items())
+        truncated = {k: _truncate_collections(v, limit, k) for k, v in items[:limit]}
+        if len(items) > limit:
+            truncated["[truncated]"] = "{} more keys".format(len(items) - limit)
+        return truncated
+    if isinstance(value, (list, tuple)):
+        truncated_list = [_truncate_collections(v, limit) for v in value[:limit]]
+        if len(value) > limit:
+            truncated_list.append(
+                "[{} more items truncated]".format(len(value) - limit)
+            )
+        return truncated_list
+    return value
+
+
+def _map_errors(payload, fn):
+    """Apply fn to payload["error"] and to each of its causes."""
+    payload = dict(payload)
+    error = payload.get("error")
+    if isinstance(error, dict):
+        error = fn(dict(error))
+        causes = error.get("causes")
+        if isinstance(causes, list):
+            error["causes"] = [
+                fn(dict(cause)) if isinstance(cause, dict) else cause
+                for cause in causes
+            ]
+        payload["error"] = error
+    return payload
+
+
+def _drop_source(payload, _limit):
+    def drop(error):
+        if isinstance(error.get("backtrace"), list):
+            error["backtrace"] = [
+                dict(frame, source={}) if isinstance(frame, dict) else frame
+                for frame in error["backtrace"]
+            ]
+        return error
+
+    return _map_errors(payload, drop)
+
+
+def _truncate_frames(payload, limit):
+    def truncate(error):
+        backtrace = error.get("backtrace")
+        if isinstance(backtrace, list) and len(backtrace) > limit:
+            error["backtrace"] = backtrace[:limit] + [
+                {
+                    "number": "0",
+                    "file": "[TRUNCATED]",
+                    "method": "{} more frames".format(len(backtrace) - limit),
+                    "source": {},
+                }
+            ]
+        return error
+
+    payload = _map_errors(payload, truncate)
+    error = payload.get("error")
+    max_causes = max(1, limit // 10)
+    if isinstance(error, dict) and len(error.get("causes") or []) > max_causes:
+        causes = error["causes"]
+        error["causes"] = causes[:max_causes] + [
+            {
+                "token": str(uuid.uuid4()),
+                "class": "HoneybadgerWarning",
+                "type": "HoneybadgerWarning",
+                "message": "{} more exception causes truncated to fit the notice size limit.".format(
+                    len(causes) - max_causes
+                ),
+            }
+        ]
+    return payload
+
+
+# (marker, step, limit), applied in order until the payload fits.
+_TRUNCATION_STEPS = [
+    ("strings", _truncate_strings, 4096),
+    ("collections", _truncate_collections, 100),
+    ("source", _drop_source, 0),
+    ("frames", _truncate_frames, 50),
+    ("strings", _truncate_strings, 256),
+    ("collections", _truncate_collections, 10),
+    ("frames", _truncate_frames, 10),
+]
@@ -0,0 +1,209 @@
+"""
+A host-level relay. Processes configured with relay_socket hand their
+notices and event batches to it over a Unix domain socket; the relay merges
+the events into full batches and owns retries, compression, spooling and
+the upstream connections, using its own configuration.
+
+    honeybadger relay --socket /run/honeybadger.sock --api-key KEY
+"""
+
+import logging
+import os
+import selectors
+import socket
+import stat
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from . import connection
+from .config import Configuration
+from .events_worker import EventsWorker
+from .relay_connection import FRAME_HEADER
+from .spool import EVENTS, NOTICE
+from .utils import decode_events
+
+logger = logging.getLogger("honeybadger.relay")
+
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class _Client:
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.buffer = bytearray()
+
+
+class Relay:
+    """
+    Listens on `path` and forwards what clients send through `config`.
+    A stale socket file left by a relay that died is replaced; starting a
+    second relay on a live socket raises RuntimeError.
+    """
+
+    _DRAIN_TIMEOUT = 1.0  # seconds
+
+    def __init__(self, path: str, config: Configuration) -> None:
+        self.path = path
+        self.config = config
+        self.events_worker = EventsWorker(
+            connection, config, logger=logging.getLogger("honeybadger")
+        )
+        self._selector = selectors.DefaultSelector()
+        self._listener: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._stats = {
+            "clients": 0,
+            "frames": 0,
+            "notices": 0,
+            "events": 0,
+            "dropped_events": 0,
+            "bad_frames": 0,
+        }
+
+    def start(self) -> "Relay":
+        self._remove_stale_socket()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(128)
+        listener.setblocking(False)
+        self._listener = listener
+        self._selector.register(listener, selectors.EVENT_READ, None)
+
+        self._thread = threading.Thread(
+            target=self._run, name="honeybadger-relay", daemon=True
+        )
+        self._thread.start()
+        logger.info("Relay listening on %s", self.path)
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop listening, read what clients have already sent, then flush the
+        queued events upstream.
+        """
+        if self._listener is None:
+            return
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()  # type: ignore[union-attr]
+        self._selector.close()
+        self._listener = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        # Notices are left to the shared notices worker, flushed at exit.
+        self.events_worker.shutdown()
+
+    def __enter__(self) -> "Relay":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, events_worker=self.events_worker.get_stats())
+
+    def _remove_stale_socket(self) -> None:
+        try:
+            mode = os.stat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError("{} exists and is not a socket".format(self.path))
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except OSError:
+            os.unlink(self.path)
+        else:
+            raise RuntimeError("A relay is already listening on {}".format(self.path))
+        finally:
+            probe.close()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._poll(0.1)
+        # Take in what clients had already written, but not what a busy
+        # client keeps writing.
+        deadline = time.monotonic() + self._DRAIN_TIMEOUT
+        while self._poll(0) and time.monotonic() < deadline:
+            pass
+
+    def _poll(self, timeout: float) -> bool:
+        ready = self._selector.select(timeout=timeout)
+        for key, _ in ready:
+            try:
+                if key.data is None:
+                    self._accept()
+                else:
+                    self._read(key.data)
+            except Exception:
+                logger.exception("Unexpected error in relay")
+        return bool(ready)
+
+    def _accept(self) -> None:
+        assert self._listener is not None
+        try:
+            sock, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        self._selector.register(sock, selectors.EVENT_READ, _Client(sock))
+        self._stats["clients"] += 1
+
+    def _read(self, client: _Client) -> None:
+        try:
+            data = client.sock.recv(256 * 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # Anything left in the buffer is a frame cut off mid-write.
+            self._disconnect(client)
+            return
+
+        buffer = client.buffer
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            kind, length = FRAME_HEADER.unpack_from(buffer, offset)
+            if length > MAX_FRAME_BYTES or kind not in (EVENTS, NOTICE):
+                logger.warning("Disconnecting relay client that sent a bad frame")
+                self._stats["bad_frames"] += 1
+                self._disconnect(client)
+                return
+            end = offset + FRAME_HEADER.size + length
+            if len(buffer) < end:
+                break
+            self._dispatch(kind, bytes(buffer[offset + FRAME_HEADER.size : end]))
+            offset = end
+        del buffer[:offset]
+
+    def _disconnect(self, client: _Client) -> None:
+        self._selector.unregister(client.sock)
+        client.sock.close()
+        self._stats["clients"] -= 1
+
+    def _dispatch(self, kind: bytes, body: bytes) -> None:
+        self._stats["frames"] += 1
+        if kind == NOTICE:
+            self._stats["notices"] += 1
+            connection.send_notice_body(self.config, body)
+            return
+
+        try:
+            events = decode_events(body)
+        except ValueError:
+            self._stats["bad_frames"] += 1
+            return
+        for event in events:
+            self._stats["events"] += 1
+            if not self.events_worker.push(event):
+                self._stats["dropped_events"] += 1
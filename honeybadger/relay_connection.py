@@ -0,0 +1,120 @@
+"""
+Client side of the relay: sends notices and event batches to a local
+`honeybadger relay` over a Unix domain socket, which batches them with
+those of every other process on the host and delivers them upstream.
+
+Each frame is a kind byte (spool.EVENTS or spool.NOTICE), a 4-byte length,
+and the encoded notice or NDJSON batch. Nothing is read back: a frame is
+handed over once the relay's socket has accepted it.
+"""
+
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import Optional
+
+from . import connection
+from .spool import EVENTS, NOTICE
+from .types import EventsSendResult, EventsSendStatus
+from .utils import encode_events
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("<cI")
+
+_lock = threading.Lock()
+_sock: Optional[socket.socket] = None
+_sock_key = None  # (pid, path) _sock was opened for
+
+
+def _socket(config) -> Optional[socket.socket]:
+    global _sock, _sock_key
+
+    # After a fork the child must not write into the parent's stream.
+    key = (os.getpid(), config.relay_socket)
+    if _sock is not None and _sock_key == key:
+        return _sock
+    _close()
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(config.connect_timeout)
+    try:
+        sock.connect(config.relay_socket)
+    except OSError as e:
+        sock.close()
+        logger.debug("Could not connect to relay at %s: %s", config.relay_socket, e)
+        return None
+    sock.settimeout(config.read_timeout)
+    _sock, _sock_key = sock, key
+    return sock
+
+
+def _close() -> None:
+    global _sock, _sock_key
+    if _sock is not None:
+        try:
+            _sock.close()
+        except OSError:
+            pass
+    _sock, _sock_key = None, None
+
+
+def _after_fork_in_child() -> None:
+    """Drop the parent's relay connection and a lock a thread may have held."""
+    global _lock, _sock, _sock_key
+    _lock = threading.Lock()
+    if _sock is not None:
+        try:
+            _sock.close()  # only this process's copy
+        except OSError:
+            pass
+    _sock, _sock_key = None, None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def send_frame(config, kind: bytes, body) -> bool:
+    """Write one frame to the relay, reconnecting once if the socket broke."""
+    header = FRAME_HEADER.pack(kind, len(body))
+    with _lock:
+        for _ in range(2):
+            sock = _socket(config)
+            if sock is None:
+                return False
+            try:
+                sock.sendall(header)
+                sock.sendall(body)
+                return True
+            except OSError as e:
+                logger.debug("Lost connection to relay: %s", e)
+                _close()
+    return False
+
+
+def send_notice(config, notice):
+    payload = notice.payload
+    notice_id = payload.get("error", {}).get("token", None)
+    if not send_frame(config, NOTICE, connection._notice_body(config, payload)):
+        logger.warning(
+            "Honeybadger relay at %s is unavailable; sending notice directly",
+            config.relay_socket,
+        )
+        connection.send_notice(config, notice)
+    return notice_id
+
+
+def send_events(config, payload) -> EventsSendResult:
+    """
+    Hand an event batch to the relay. If the relay can't be reached the
+    batch fails with an error, and the events worker retries it as usual.
+    """
+    body = getattr(payload, "body", None)
+    if body is None:
+        body = encode_events(payload)
+    if send_frame(config, EVENTS, body):
+        return EventsSendResult(EventsSendStatus.OK)
+    return EventsSendResult(EventsSendStatus.ERROR, "relay unavailable")
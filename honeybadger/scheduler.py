@@ -0,0 +1,152 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from .utils import reinit_after_fork
+
+NOTICE = "notice"
+EVENTS = "events"
+
+# Retry-After is honored, plus up to this fraction more, so processes told
+# the same thing don't all come back in the same instant.
+RETRY_AFTER_JITTER = 0.1
+# First wait after a 429 without Retry-After; it doubles on each one after.
+THROTTLE_BACKOFF_BASE = 5.0  # seconds
+# How long a notice that was told to wait keeps its claim on the next token.
+_NOTICE_CLAIM_GRACE = 1.0  # seconds
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with jitter: base * 2**(attempt - 1), capped, then
+    scaled by a random factor between 0.5 and 1.
+    """
+    delay = min(float(base) * 2 ** max(attempt - 1, 0), float(cap))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class DeliveryScheduler:
+    """
+    Decides when notices and event batches may be sent to the API, which
+    counts them against the same quota.
+
+    Requests are paced by a token bucket refilled at config.delivery_rate
+    per second, holding up to config.delivery_burst (a rate of 0 means no
+    pacing). Notices have strict priority: once a notice has been told to
+    wait for a token, event batches get none until it has had one. A 429
+    holds everything for as long as Retry-After asks, or otherwise backs off
+    exponentially, with jitter, up to the caller's cap.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: Optional[float] = None  # full on first use
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._throttles = 0  # consecutive throttled responses
+        self._notice_claim_until = 0.0
+        self._paced = 0
+        self._times_throttled = 0
+        reinit_after_fork(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def reserve(self, config: Any, kind: str) -> float:
+        """
+        Take a token for one request of `kind` (NOTICE or EVENTS) and return
+        0, or return how many seconds to wait before asking again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if kind != NOTICE and self._notice_claim_until > now:
+                self._paced += 1
+                return min(self._notice_claim_until - now, _NOTICE_CLAIM_GRACE)
+
+            rate = float(getattr(config, "delivery_rate", 0.0))
+            if rate <= 0:
+                if kind == NOTICE:
+                    self._notice_claim_until = 0.0
+                return 0.0
+
+            burst = max(float(getattr(config, "delivery_burst", 1)), 1.0)
+            tokens = burst if self._tokens is None else self._tokens
+            tokens = min(burst, tokens + (now - self._refilled) * rate)
+            self._refilled = now
+            if tokens >= 1:
+                self._tokens = tokens - 1
+                if kind == NOTICE:
+                    self._notice_claim_until = 0.0
+                return 0.0
+
+            self._tokens = tokens
+            self._paced += 1
+            wait = (1 - tokens) / rate
+            if kind == NOTICE:
+                self._notice_claim_until = now + wait + _NOTICE_CLAIM_GRACE
+            return wait
+
+    def throttled(self, retry_after: Optional[float], cap: float) -> float:
+        """
+        Record a 429 and hold all deliveries. Returns the wait: Retry-After
+        plus a little jitter if the API sent one, else exponential backoff.
+        """
+        with self._lock:
+            self._throttles += 1
+            self._times_throttled += 1
+            if retry_after is not None:
+                wait = retry_after * (1 + random.uniform(0, RETRY_AFTER_JITTER))
+            else:
+                wait = backoff(self._throttles, THROTTLE_BACKOFF_BASE, cap)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+            return wait
+
+    def blocked_for(self) -> float:
+        """Seconds until deliveries may resume after a 429."""
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def delivered(self) -> None:
+        """Record a request the API didn't throttle, ending any backoff streak."""
+        with self._lock:
+            self._throttles = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens = None
+            self._blocked_until = 0.0
+            self._throttles = 0
+            self._notice_claim_until = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "tokens": self._tokens,
+                "blocked_for": max(0.0, self._blocked_until - now),
+                "consecutive_throttles": self._throttles,
+                "times_throttled": self._times_throttled,
+                "paced": self._paced,
+            }
@@ -0,0 +1,110 @@
+"""
+JSON encoding for notices and events.
+
+Uses orjson or ujson when one is installed, falling back to the standard
+library. Whatever the backend, values JSON can't represent are encoded as
+their repr(), like StringReprJSONEncoder. If a fast backend can't encode a
+payload at all (integers wider than 64 bits, for example) it is retried with
+the standard library, so nothing that encoded before fails to now.
+
+The fast backends write compact JSON with non-ASCII text as UTF-8 rather
+than \\u escapes, and orjson encodes UUIDs and enums by value rather than by
+repr().
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _repr(o: Any) -> str:
+    try:
+        return repr(o)
+    except Exception:
+        return "[unserializable]"
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_repr).encode("utf-8")
+
+
+def _orjson_dumps() -> Optional[Callable[[Any], bytes]]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    # Leave datetimes and dataclasses to _repr, as the stdlib encoder does.
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_repr, option=option)
+
+    return dumps
+
+
+def _ujson_dumps() -> Optional[Callable[[Any], bytes]]:
+    try:
+        import ujson  # type: ignore[import-untyped]
+    except ImportError:
+        return None
+
+    def dumps(obj: Any) -> bytes:
+        return ujson.dumps(
+            obj, default=_repr, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+    return dumps
+
+
+_BACKENDS: Dict[str, Callable[[], Optional[Callable[[Any], bytes]]]] = {
+    "orjson": _orjson_dumps,
+    "ujson": _ujson_dumps,
+    "json": lambda: _json_dumps,
+}
+
+backend = "json"
+_dumps: Callable[[Any], bytes] = _json_dumps
+
+
+def available_backends() -> List[str]:
+    """Names of the backends that can be used here, fastest first."""
+    return [name for name, load in _BACKENDS.items() if load() is not None]
+
+
+def use(name: str = "auto") -> str:
+    """
+    Switch to the named backend ("orjson", "ujson" or "json"), or to the
+    fastest one installed with "auto". Returns the backend now in use.
+    """
+    global backend, _dumps
+
+    names = list(_BACKENDS) if name == "auto" else [name]
+    for candidate in names:
+        if candidate not in _BACKENDS:
+            raise ValueError("Unknown JSON backend: {!r}".format(candidate))
+        fn = _BACKENDS[candidate]()
+        if fn is not None:
+            backend, _dumps = candidate, fn
+            return backend
+    raise ValueError("JSON backend {!r} is not installed".format(name))
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as UTF-8 JSON bytes."""
+    if _dumps is _json_dumps:
+        return _json_dumps(obj)
+    try:
+        return _dumps(obj)
+    except (TypeError, ValueError, OverflowError) as e:
+        logger.debug("%s could not encode payload (%s); using json", backend, e)
+        return _json_dumps(obj)
+
+
+use()
@@ -0,0 +1,207 @@
+"""
+Sinks are where notices and event batches go. Anything implementing the
+Connection protocol can be one; besides the Honeybadger API (the
+`connection` module), this module has NDJSON sinks that write to a file or
+to stdout, for a log shipper such as Fluent Bit or Vector to forward.
+
+Configure them with config.sinks, as sink objects or as names:
+
+    honeybadger.configure(sinks=["honeybadger", "stdout", "file:/var/log/hb-{pid}.ndjson"])
+
+Every sink gets its own events worker, so batching, retries and stats are
+per sink. A sink may set `batch_size` and `flush_interval` to override
+events_batch_size and events_timeout for its worker, and `spool = False` to
+keep its batches out of the spool.
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from . import serializer
+from .types import EventsSendResult, EventsSendStatus
+from .utils import encode_events, reinit_after_fork
+
+logger = logging.getLogger(__name__)
+
+HONEYBADGER = "honeybadger"
+
+
+class NDJSONSink(ABC):
+    """Writes each notice and each event as one line of JSON."""
+
+    name = "ndjson"
+    batch_size: Optional[int] = None
+    flush_interval: Optional[float] = None
+    spool = False  # a local write can't be lost in transit
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = {"notices": 0, "events": 0, "bytes": 0, "errors": 0}
+        reinit_after_fork(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def send_notice(self, config: Any, notice: Any) -> Optional[str]:
+        payload = notice.payload
+        self._write(serializer.dumps(payload), "notices", 1)
+        return payload.get("error", {}).get("token", None)
+
+    def send_events(self, config: Any, payload: List[Any]) -> EventsSendResult:
+        body = getattr(payload, "body", None)
+        if body is None:
+            body = encode_events(payload)
+        if not self._write(body, "events", len(payload)):
+            return EventsSendResult(EventsSendStatus.ERROR, "write failed")
+        return EventsSendResult(EventsSendStatus.OK)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        pass
+
+    def _write(self, body, kind: str, count: int) -> bool:
+        data = bytes(body) + b"\n"
+        with self._lock:
+            try:
+                self._write_locked(data)
+            except (OSError, ValueError) as e:
+                self._stats["errors"] += 1
+                logger.error("Could not write to %s sink: %s", self.name, e)
+                return False
+            self._stats[kind] += count
+            self._stats["bytes"] += len(data)
+            return True
+
+    @abstractmethod
+    def _write_locked(self, data: bytes) -> None:
+        """Write data, with self._lock held."""
+
+
+class StdoutSink(NDJSONSink):
+    """NDJSON on stdout (or another binary stream)."""
+
+    name = "stdout"
+
+    def __init__(self, stream: Optional[BinaryIO] = None) -> None:
+        super().__init__()
+        self._stream = stream
+
+    def _write_locked(self, data: bytes) -> None:
+        stream = self._stream or sys.stdout.buffer
+        stream.write(data)
+        stream.flush()
+
+
+class FileSink(NDJSONSink):
+    """
+    NDJSON appended to a file, rotated when it reaches max_bytes: path is
+    renamed to path.1, path.1 to path.2 and so on, keeping `backups` old
+    files. "{pid}" in the path is replaced with the process ID, so that
+    processes sharing a config don't rotate each other's files.
+    """
+
+    name = "file"
+
+    def __init__(
+        self, path: str, max_bytes: int = 100 * 1024 * 1024, backups: int = 5
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file: Optional[BinaryIO] = None
+        self._file_path: Optional[str] = None
+        self._stats["rotations"] = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _write_locked(self, data: bytes) -> None:
+        path = self.path.replace("{pid}", str(os.getpid()))
+        if self._file is None or self._file_path != path:
+            self._close()
+            self._file = open(path, "ab")
+            self._file_path = path
+
+        size = self._file.tell()
+        if size and self.max_bytes and size + len(data) > self.max_bytes:
+            self._rotate(path)
+        self._file.write(data)
+        self._file.flush()
+
+    def _rotate(self, path: str) -> None:
+        self._close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = "{}.{}".format(path, i)
+                if os.path.exists(src):
+                    os.replace(src, "{}.{}".format(path, i + 1))
+            os.replace(path, path + ".1")
+        else:
+            os.remove(path)
+        self._file = open(path, "ab")
+        self._file_path = path
+        self._stats["rotations"] += 1
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+
+
+def resolve(spec: Any, api: Any) -> Any:
+    """
+    Turn a config.sinks entry into a sink: "honeybadger" is `api`, the
+    connection the client would use without sinks configured; "stdout" and
+    "file:PATH" are NDJSON sinks. Anything else is taken to be a sink already.
+    """
+    if not isinstance(spec, str):
+        return spec
+    name, _, arg = spec.strip().partition(":")
+    if name == HONEYBADGER:
+        return api
+    if name == StdoutSink.name:
+        return StdoutSink()
+    if name == FileSink.name and arg:
+        return FileSink(arg)
+    raise ValueError("Unknown sink: {!r}".format(spec))
+
+
+def sink_name(sink: Any) -> str:
+    name = getattr(sink, "name", None)
+    if isinstance(name, str):
+        return name
+    return HONEYBADGER  # the connection modules
+
+
+class _SinkConfig:
+    """The client's config, with a sink's overrides on top."""
+
+    def __init__(self, config: Any, overrides: Dict[str, Any]) -> None:
+        self._config = config
+        self._overrides = overrides
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._overrides:
+            return self._overrides[name]
+        return getattr(self._config, name)
+
+
+def worker_config(config: Any, sink: Any) -> Any:
+    """The config for a sink's events worker."""
+    overrides: Dict[str, Any] = {}
+    if getattr(sink, "batch_size", None) is not None:
+        overrides["events_batch_size"] = sink.batch_size
+    if getattr(sink, "flush_interval", None) is not None:
+        overrides["events_timeout"] = sink.flush_interval
+    if not getattr(sink, "spool", True):
+        overrides["spool_dir"] = ""
+    return _SinkConfig(config, overrides) if overrides else config
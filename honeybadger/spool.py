@@ -0,0 +1,316 @@
+"""
+Append-only, size-capped on-disk spool for event batches and notices.
+
+Each record is written to the active segment file before it is sent and
+acknowledged once it has been delivered (or permanently rejected). A segment
+is deleted when it has been rotated out and every record in it has been
+acknowledged, so whatever is still on disk after a crash or an extended
+outage is exactly what may not have been delivered. Delivery is therefore
+at-least-once: a record sent just before a crash can be replayed again.
+
+Records are flushed to the OS as they are written, which survives the
+process being killed but not the host losing power.
+
+Record layout: 1-byte kind, 4-byte little-endian length, 4-byte CRC32 of the
+body, then the body. A torn final record is ignored on read.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Generator, IO, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+EVENTS = b"E"
+NOTICE = b"N"
+
+SEGMENT_SUFFIX = ".seg"
+
+_HEADER = struct.Struct("<cII")
+
+
+class _Segment:
+    def __init__(self, path: str, handle: IO[bytes]) -> None:
+        self.path = path
+        self.handle = handle
+        self.size = os.fstat(handle.fileno()).st_size
+        self.outstanding = 0
+        self.sealed = False
+
+
+class Spool:
+    """
+    A directory of segment files owned by this process.
+
+    Segments are locked with flock() while this process owns them, so several
+    processes can share a directory: claim_orphans() only picks up segments
+    whose owner has gone away.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        segment_bytes: int = 4 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+
+        self._lock = threading.Lock()
+        self._segments: Dict[str, _Segment] = {}
+        self._active: Optional[_Segment] = None
+        self._appended = 0
+        self._acked = 0
+        self._evicted = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, kind: bytes, body: Union[bytes, bytearray]) -> Optional[str]:
+        """
+        Write a record and return the id to acknowledge it with, or None if
+        it could not be written.
+        """
+        header = _HEADER.pack(kind, len(body), zlib.crc32(body))
+        size = len(header) + len(body)
+        with self._lock:
+            try:
+                segment = self._writable_segment(size)
+                segment.handle.write(header)
+                segment.handle.write(body)
+                segment.handle.flush()
+            except OSError as e:
+                logger.warning("Could not write to spool %s: %s", self.directory, e)
+                return None
+            segment.size += size
+            segment.outstanding += 1
+            self._appended += 1
+            self._enforce_max_bytes()
+            return segment.path
+
+    def ack(self, record_id: Optional[str]) -> None:
+        """Mark a record as delivered."""
+        if record_id is None:
+            return
+        with self._lock:
+            segment = self._segments.get(record_id)
+            if segment is None:
+                return  # already evicted
+            segment.outstanding -= 1
+            self._acked += 1
+            if segment.outstanding > 0:
+                return
+            if segment.sealed:
+                self._remove(segment)
+            else:
+                # Everything written so far is delivered: start the active
+                # segment over rather than leave records to be replayed.
+                segment.handle.truncate(0)
+                segment.size = 0
+
+    def claim_orphans(self) -> List[str]:
+        """
+        Take ownership of segments left behind by processes that have exited,
+        oldest first. The caller replays them with read_segment() and then
+        calls release().
+        """
+        claimed = []
+        for path in list_segments(self.directory):
+            name = os.path.basename(path)
+            with self._lock:
+                if path in self._segments:
+                    continue
+                try:
+                    handle = open(path, "rb+")
+                except OSError:
+                    continue
+                if not _try_lock(handle, name):
+                    handle.close()
+                    continue
+                segment = _Segment(path, handle)
+                segment.sealed = True
+                self._segments[path] = segment
+            claimed.append(path)
+        return claimed
+
+    def release(self, path: str) -> None:
+        """Delete a claimed segment once its records have been re-queued."""
+        with self._lock:
+            segment = self._segments.get(path)
+            if segment is not None:
+                self._remove(segment)
+
+    def release_claim(self, path: str) -> None:
+        """Give up a claimed segment without deleting it."""
+        with self._lock:
+            segment = self._segments.pop(path, None)
+            if segment is not None:
+                segment.handle.close()
+
+    def close(self) -> None:
+        """Release every file handle, leaving unacknowledged records on disk."""
+        with self._lock:
+            for segment in list(self._segments.values()):
+                if segment.size == 0:
+                    self._remove(segment)
+                else:
+                    segment.handle.close()
+            self._segments = {}
+            self._active = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "bytes": sum(s.size for s in self._segments.values()),
+                "appended_records": self._appended,
+                "acked_records": self._acked,
+                "evicted_records": self._evicted,
+            }
+
+    def _writable_segment(self, record_size: int) -> _Segment:
+        active = self._active
+        if active is not None and active.size + record_size <= self.segment_bytes:
+            return active
+        if active is not None:
+            active.sealed = True
+            if active.outstanding <= 0:
+                self._remove(active)
+
+        name = "{}-{}{}".format(time.time_ns(), os.getpid(), SEGMENT_SUFFIX)
+        path = os.path.join(self.directory, name)
+        handle = open(path, "ab")
+        _try_lock(handle, name)
+        self._active = self._segments[path] = _Segment(path, handle)
+        return self._active
+
+    def _enforce_max_bytes(self) -> None:
+        total = sum(s.size for s in self._segments.values())
+        for segment in sorted(self._segments.values(), key=lambda s: s.path):
+            if total <= self.max_bytes or segment is self._active:
+                break
+            logger.warning(
+                "Spool %s is over %s bytes; discarding %s",
+                self.directory,
+                self.max_bytes,
+                os.path.basename(segment.path),
+            )
+            self._evicted += max(segment.outstanding, 0)
+            total -= segment.size
+            self._remove(segment)
+
+    def _remove(self, segment: _Segment) -> None:
+        self._segments.pop(segment.path, None)
+        if segment is self._active:
+            self._active = None
+        segment.handle.close()
+        try:
+            os.remove(segment.path)
+        except OSError:
+            pass
+
+
+def read_segment(path: str) -> Generator[Tuple[bytes, bytes], None, None]:
+    """Yield (kind, body) for every intact record in a segment file."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                kind, length, crc = _HEADER.unpack_from(mm, offset)
+                start = offset + _HEADER.size
+                end = start + length
+                if end > size:
+                    break  # torn write at the tail
+                body = mm[start:end]
+                if zlib.crc32(body) != crc:
+                    logger.warning("Corrupt record in %s at offset %s", path, offset)
+                    break
+                yield kind, body
+                offset = end
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment files in a spool directory, oldest first."""
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.endswith(SEGMENT_SUFFIX)
+    ]
+
+
+def segment_in_use(path: str) -> Optional[bool]:
+    """Whether a live process owns a segment, or None if that can't be told."""
+    if fcntl is None:
+        return None
+    with open(path, "rb") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    return False
+
+
+def _try_lock(handle: IO[bytes], name: str) -> bool:
+    """
+    Lock a segment for this process. Without flock(), fall back to treating
+    segments written under another PID as orphaned.
+    """
+    if fcntl is None:
+        return not name.endswith("-{}{}".format(os.getpid(), SEGMENT_SUFFIX))
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+_spools: Dict[Tuple[int, str], Spool] = {}
+_spools_lock = threading.Lock()
+
+
+def _after_fork_in_child() -> None:
+    global _spools_lock
+    _spools_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_spool(config: Any) -> Optional[Spool]:
+    """
+    Return this process's spool for config.spool_dir, if one is configured.
+    A forked child gets its own spool rather than sharing the parent's files.
+    """
+    directory = getattr(config, "spool_dir", None)
+    if not directory:
+        return None
+    key = (os.getpid(), directory)
+    with _spools_lock:
+        spool = _spools.get(key)
+        if spool is None:
+            try:
+                spool = Spool(
+                    directory,
+                    max_bytes=int(config.spool_max_bytes),
+                    segment_bytes=int(config.spool_segment_bytes),
+                )
+            except OSError as e:
+                logger.warning("Could not open spool %s: %s", directory, e)
+                return None
+            _spools[key] = spool
+        return spool
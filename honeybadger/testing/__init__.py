@@ -0,0 +1,12 @@
+"""
+Tools for testing code that reports to Honeybadger without the real
+service: a local stand-in for the API and a load generator.
+
+    python -m honeybadger.testing serve --port 8080 --error-rate 0.05
+    python -m honeybadger.testing load --threads 8 --duration 30
+"""
+
+from .load import LoadReport, run_load
+from .server import FakeAPIServer
+
+__all__ = ["FakeAPIServer", "LoadReport", "run_load"]
@@ -0,0 +1,76 @@
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from .load import run_load
+from .server import FakeAPIServer
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m honeybadger.testing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run a stand-in Honeybadger API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds")
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--throttle-rate", type=float, default=0.0)
+    serve.add_argument(
+        "--retry-after", type=float, help="Retry-After for 429s and 503s"
+    )
+    serve.add_argument(
+        "--interval", type=float, default=5.0, help="seconds between stats lines"
+    )
+
+    load = commands.add_parser("load", help="drive notify() and event()")
+    load.add_argument("--endpoint", help="default: start a local stand-in API")
+    load.add_argument("--threads", type=int, default=4)
+    load.add_argument("--processes", type=int, default=0)
+    load.add_argument("--duration", type=float, default=10.0)
+    load.add_argument("--notice-ratio", type=float, default=0.1)
+    load.add_argument("--rate", type=float, help="calls per second per thread")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "load":
+        report = run_load(
+            endpoint=args.endpoint,
+            threads=args.threads,
+            processes=args.processes,
+            duration=args.duration,
+            notice_ratio=args.notice_ratio,
+            rate=args.rate,
+        )
+        print(report.format())
+        return 0
+
+    server = FakeAPIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        record=False,
+    ).start()
+    print("Listening on {}".format(server.url))
+    try:
+        while True:
+            time.sleep(args.interval)
+            stats = server.stats()
+            server.reset()
+            print(
+                "{requests_per_sec:,.0f} req/s, {events_per_sec:,.0f} events/s, "
+                "{bytes_per_sec:,.0f} bytes/s, statuses {statuses}".format(**stats)
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import multiprocessing
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .server import FakeAPIServer
+
+
+@dataclass
+class LoadReport:
+    duration: float
+    workers: int
+    notices_attempted: int = 0
+    notices_dropped: int = 0
+    events_attempted: int = 0
+    events_dropped: int = 0
+    # FakeAPIServer.stats() when run_load started its own server
+    server: Optional[Dict[str, Any]] = None
+
+    @property
+    def notices_per_sec(self) -> float:
+        return self.notices_attempted / self.duration
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events_attempted / self.duration
+
+    @property
+    def notice_drop_rate(self) -> float:
+        return _rate(self.notices_dropped, self.notices_attempted)
+
+    @property
+    def event_drop_rate(self) -> float:
+        return _rate(self.events_dropped, self.events_attempted)
+
+    def format(self) -> str:
+        lines = [
+            "{} workers for {:.1f}s".format(self.workers, self.duration),
+            "notices: {:,} attempted ({:,.0f}/s), {:.2%} dropped".format(
+                self.notices_attempted, self.notices_per_sec, self.notice_drop_rate
+            ),
+            "events:  {:,} attempted ({:,.0f}/s), {:.2%} dropped".format(
+                self.events_attempted, self.events_per_sec, self.event_drop_rate
+            ),
+        ]
+        if self.server is not None:
+            lines.append(
+                "server:  {:,} notices, {:,} events received; "
+                "{:,.0f} req/s, {:,.0f} events/s, {:,.0f} bytes/s; statuses {}".format(
+                    self.server["notices"],
+                    self.server["events"],
+                    self.server["requests_per_sec"],
+                    self.server["events_per_sec"],
+                    self.server["bytes_per_sec"],
+                    self.server["statuses"],
+                )
+            )
+        return "\n".join(lines)
+
+
+@dataclass
+class _Counts:
+    notices_attempted: int = 0
+    notices_dropped: int = 0
+    events_attempted: int = 0
+    events_dropped: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, other: "_Counts") -> None:
+        with self.lock:
+            self.notices_attempted += other.notices_attempted
+            self.notices_dropped += other.notices_dropped
+            self.events_attempted += other.events_attempted
+            self.events_dropped += other.events_dropped
+
+    def as_tuple(self):
+        return (
+            self.notices_attempted,
+            self.notices_dropped,
+            self.events_attempted,
+            self.events_dropped,
+        )
+
+
+def run_load(
+    endpoint: Optional[str] = None,
+    threads: int = 4,
+    processes: int = 0,
+    duration: float = 10.0,
+    notice_ratio: float = 0.1,
+    rate: Optional[float] = None,
+    api_key: str = "load-test",
+    **config: Any,
+) -> LoadReport:
+    """
+    Call honeybadger.notify() and honeybadger.event() as fast as possible
+    (or at `rate` calls per second per thread) from `threads` threads, in
+    each of `processes` processes if given, else in this process, for
+    `duration` seconds. About `notice_ratio` of the calls are notices.
+
+    Without an endpoint a FakeAPIServer is started for the run, and its
+    stats are included in the report. Extra keyword arguments are passed to
+    configure() on the Honeybadger instance the run uses. Its workers are
+    flushed when the run ends, so notices queued by the rest of the process
+    are sent then too.
+    """
+    server = None
+    if endpoint is None:
+        server = FakeAPIServer(record=False).start()
+        endpoint = server.url
+
+    options = dict(config, api_key=api_key, endpoint=endpoint, force_report_data=True)
+    start = time.monotonic()
+    try:
+        if processes > 0:
+            counts = _run_processes(
+                options, processes, threads, duration, notice_ratio, rate
+            )
+        else:
+            counts = _run_threads(options, threads, duration, notice_ratio, rate)
+        elapsed = time.monotonic() - start
+        report = LoadReport(
+            duration=elapsed,
+            workers=threads * max(processes, 1),
+            notices_attempted=counts.notices_attempted,
+            notices_dropped=counts.notices_dropped,
+            events_attempted=counts.events_attempted,
+            events_dropped=counts.events_dropped,
+        )
+        if server is not None:
+            report.server = server.stats()
+        return report
+    finally:
+        if server is not None:
+            server.stop()
+
+
+def _run_threads(options, threads, duration, notice_ratio, rate) -> _Counts:
+    from honeybadger import Honeybadger
+
+    honeybadger = Honeybadger()
+    honeybadger.configure(**options)
+    dropped_before = honeybadger.notices_worker.get_stats()["dropped_notices"]
+
+    total = _Counts()
+    stop_at = time.monotonic() + duration
+    workers = [
+        threading.Thread(
+            target=_drive,
+            args=(honeybadger, i, stop_at, notice_ratio, rate, total),
+            name="honeybadger-load-{}".format(i),
+        )
+        for i in range(threads)
+    ]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    # Flush what's still queued so the server sees the whole run.
+    honeybadger.shutdown()
+
+    total.notices_dropped = (
+        honeybadger.notices_worker.get_stats()["dropped_notices"] - dropped_before
+    )
+    return total
+
+
+def _drive(hb, worker, stop_at, notice_ratio, rate, total: _Counts) -> None:
+    counts = _Counts()
+    rng = random.Random(worker)
+    interval = 1.0 / rate if rate else 0.0
+    next_call = time.monotonic()
+    n = 0
+    while time.monotonic() < stop_at:
+        n += 1
+        if rng.random() < notice_ratio:
+            hb.notify(
+                error_class="LoadTestError",
+                error_message="load test notice {}".format(n),
+                context={"worker": worker, "n": n},
+            )
+            counts.notices_attempted += 1
+        else:
+            if hb.event("load_test", {"worker": worker, "n": n}) is False:
+                counts.events_dropped += 1
+            counts.events_attempted += 1
+
+        if interval:
+            next_call += interval
+            delay = next_call - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    total.add(counts)
+
+
+def _run_processes(
+    options, processes, threads, duration, notice_ratio, rate
+) -> _Counts:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_process_main,
+            args=(options, threads, duration, notice_ratio, rate, results),
+        )
+        for _ in range(processes)
+    ]
+    for p in procs:
+        p.start()
+
+    total = _Counts()
+    for _ in procs:
+        counts = _Counts(*results.get())
+        total.add(counts)
+    for p in procs:
+        p.join()
+    return total
+
+
+def _process_main(options, threads, duration, notice_ratio, rate, results) -> None:
+    counts = _run_threads(options, threads, duration, notice_ratio, rate)
+    results.put(counts.as_tuple())
+
+
+def _rate(part: int, whole: int) -> float:
+    return part / whole if whole else 0.0
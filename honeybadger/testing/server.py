@@ -0,0 +1,207 @@
+import gzip
+import json
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one write; in two, Nagle's algorithm and the
+    # client's delayed ACK stall every keep-alive response by ~40ms
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    server: "_HTTPServer"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        status, response = self.server.api.handle(
+            self.path, self.headers, body, len(body)
+        )
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        retry_after = self.server.api.retry_after
+        if status in (429, 503) and retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    api: "FakeAPIServer"
+
+
+class FakeAPIServer:
+    """
+    A stand-in for the Honeybadger API, for load tests and integration tests.
+
+    Implements POST /v1/notices/ and /v1/events/ and keeps counters of what
+    it received. Faults can be injected: every response is delayed by
+    `latency` seconds, and a `throttle_rate` / `error_rate` fraction of
+    requests get a 429 / 503, with a Retry-After header if `retry_after` is
+    set. Each of these can be changed while the server runs. With
+    record=True, received notices and events are kept in `notices` and
+    `events`.
+
+        with FakeAPIServer(error_rate=0.1) as server:
+            honeybadger.configure(api_key="test", endpoint=server.url)
+            ...
+            print(server.stats())
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        record: bool = True,
+        api_key: Optional[str] = None,
+        seed: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.record = record
+        self.api_key = api_key
+
+        self.notices: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []
+        # Statuses to return for the next requests, ahead of random faults.
+        self.scripted_statuses: Deque[int] = deque()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.api = self
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return "http://{}:{}".format(str(host), port)
+
+    def start(self) -> "FakeAPIServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="honeybadger-fake-api",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def __enter__(self) -> "FakeAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """Clear counters and recorded payloads."""
+        with self._lock:
+            self._started = time.monotonic()
+            self._counts: Counter = Counter()
+            self._statuses: Counter = Counter()
+            self.notices.clear()
+            self.events.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals since the last reset, and per-second rates over that time."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            counts = dict(self._counts)
+            statuses = dict(self._statuses)
+        return {
+            "elapsed": elapsed,
+            "requests": counts.get("requests", 0),
+            "notices": counts.get("notices", 0),
+            "events": counts.get("events", 0),
+            "bytes": counts.get("bytes", 0),
+            "statuses": statuses,
+            "requests_per_sec": counts.get("requests", 0) / elapsed,
+            "events_per_sec": counts.get("events", 0) / elapsed,
+            "bytes_per_sec": counts.get("bytes", 0) / elapsed,
+        }
+
+    def handle(self, path, headers, body, wire_bytes):
+        if self.latency:
+            time.sleep(self.latency)
+
+        status = self._choose_status(headers)
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts["bytes"] += wire_bytes
+            self._statuses[status] += 1
+
+        if status != 201:
+            return status, {"error": "injected fault" if status != 403 else "bad key"}
+
+        try:
+            body = _decode(headers.get("Content-Encoding"), body)
+            if path.startswith("/v1/notices"):
+                return 201, self._accept_notice(json.loads(body))
+            if path.startswith("/v1/events"):
+                return 201, self._accept_events(body)
+        except (ValueError, OSError, zlib.error) as e:
+            return 400, {"error": str(e)}
+        return 404, {"error": "not found"}
+
+    def _choose_status(self, headers) -> int:
+        if self.api_key is not None and headers.get("X-Api-Key") != self.api_key:
+            return 403
+        with self._lock:
+            if self.scripted_statuses:
+                return self.scripted_statuses.popleft()
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return 201
+
+    def _accept_notice(self, notice):
+        with self._lock:
+            self._counts["notices"] += 1
+            if self.record:
+                self.notices.append(notice)
+        return {"id": str(uuid.uuid4())}
+
+    def _accept_events(self, body):
+        events = [json.loads(line) for line in body.splitlines() if line.strip()]
+        with self._lock:
+            self._counts["events"] += len(events)
+            if self.record:
+                self.events.extend(events)
+        return {}
+
+
+def _decode(content_encoding, body):
+    if content_encoding == "gzip":
+        return gzip.decompress(body)
+    if content_encoding == "deflate":
+        return zlib.decompress(body)
+    return body
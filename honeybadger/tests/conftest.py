@@ -0,0 +1,15 @@
+import pytest
+
+from honeybadger import connection
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_delivery_state():
+    """
+    Failed or throttled sends in one test mustn't trip the shared breaker or
+    hold up the scheduler for the next.
+    """
+    yield
+    connection.circuit_breaker.reset()
+    connection.scheduler.reset()
+    connection.notices_worker.resume()
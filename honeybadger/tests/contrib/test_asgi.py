@@ -34,7 +34,10 @@ class ASGIPluginTestCase(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(contrib.ASGIHoneybadger(asgi_app(), api_key="abcd"))
 
-    @mock.patch("honeybadger.contrib.asgi.honeybadger")
+    @mock.patch(
+        "honeybadger.contrib.asgi.honeybadger",
+        new_callable=lambda: mock.MagicMock(notify_async=mock.AsyncMock()),
+    )
     def test_should_support_asgi(self, hb):
         asgi_context = {"asgi": {"version": "3.0"}}
         non_asgi_context = {}
@@ -42,18 +45,24 @@ class ASGIPluginTestCase(unittest.TestCase):
         self.assertFalse(self.client.application.supports(hb.config, non_asgi_context))
 
     @aiounittest.async_test
-    @mock.patch("honeybadger.contrib.asgi.honeybadger")
+    @mock.patch(
+        "honeybadger.contrib.asgi.honeybadger",
+        new_callable=lambda: mock.MagicMock(notify_async=mock.AsyncMock()),
+    )
     async def test_should_notify_exception(self, hb):
         with self.assertRaises(SomeError):
             await self.client.get("/error")
-        hb.notify.assert_called_once()
-        self.assertEqual(type(hb.notify.call_args.kwargs["exception"]), SomeError)
+        hb.notify_async.assert_called_once()
+        self.assertEqual(type(hb.notify_async.call_args.kwargs["exception"]), SomeError)
 
     @aiounittest.async_test
-    @mock.patch("honeybadger.contrib.asgi.honeybadger")
+    @mock.patch(
+        "honeybadger.contrib.asgi.honeybadger",
+        new_callable=lambda: mock.MagicMock(notify_async=mock.AsyncMock()),
+    )
     async def test_should_not_notify_exception(self, hb):
         response = await self.client.get("/")
-        hb.notify.assert_not_called()
+        hb.notify_async.assert_not_called()
 
 
 class ASGIEventPayloadTestCase(unittest.TestCase):
@@ -21,17 +21,23 @@ class FastAPITestCase(unittest.TestCase):
 
         self.client = TestClient(app, raise_server_exceptions=False)
 
-    @mock.patch("honeybadger.contrib.fastapi.honeybadger")
+    @mock.patch(
+        "honeybadger.contrib.fastapi.honeybadger",
+        new_callable=lambda: mock.MagicMock(notify_async=mock.AsyncMock()),
+    )
     def test_should_not_notify_on_ok_route(self, hb):
         response = self.client.get("/ok")
         self.assertEqual(response.status_code, 200)
-        hb.notify.assert_not_called()
+        hb.notify_async.assert_not_called()
 
-    @mock.patch("honeybadger.contrib.fastapi.honeybadger")
+    @mock.patch(
+        "honeybadger.contrib.fastapi.honeybadger",
+        new_callable=lambda: mock.MagicMock(notify_async=mock.AsyncMock()),
+    )
     def test_should_notify_on_ko_route(self, hb):
         response = self.client.get("/ko")
         self.assertEqual(response.status_code, 500)
-        hb.notify.assert_called_once()
+        hb.notify_async.assert_called_once()
         self.assertEqual(
-            type(hb.notify.call_args.kwargs["exception"]), ZeroDivisionError
+            type(hb.notify_async.call_args.kwargs["exception"]), ZeroDivisionError
         )
@@ -441,7 +441,7 @@ async def test_wrap_result_reports_exception_for_worker_class(reset_oban_registr
         # can actually import this class instead of failing with
         # ValueError("Empty module name") on a bare label.
         job = Job(worker_name(FailW), args={}, id=1, attempt=1)
-        with patch("honeybadger.contrib.oban.honeybadger.notify") as notify:
+        with patch("honeybadger.contrib.oban.honeybadger.notify_async") as notify:
             await Executor(job).execute()
         assert notify.call_count == 1
         assert isinstance(notify.call_args[1]["exception"], ValueError)
@@ -469,7 +469,7 @@ async def test_wrap_result_reports_exception_for_job_function(reset_oban_registr
 
         worker_name = next(iter(_registry))
         job_inst = Job(worker_name, args={"to": "x@example.com"}, id=2, attempt=1)
-        with patch("honeybadger.contrib.oban.honeybadger.notify") as notify:
+        with patch("honeybadger.contrib.oban.honeybadger.notify_async") as notify:
             await Executor(job_inst).execute()
         assert notify.call_count == 1
         assert isinstance(notify.call_args[1]["exception"], RuntimeError)
@@ -494,7 +494,7 @@ async def test_no_notify_when_report_exceptions_false(reset_oban_registry):
     hb.init()
     try:
         job = Job(worker_name(FailW2), args={}, id=3, attempt=1)
-        with patch("honeybadger.contrib.oban.honeybadger.notify") as notify:
+        with patch("honeybadger.contrib.oban.honeybadger.notify_async") as notify:
             await Executor(job).execute()
         assert notify.call_count == 0
     finally:
@@ -527,7 +527,7 @@ async def test_wrap_result_chains_prior_extension(reset_oban_registry):
     hb.init()
     try:
         job = Job(worker_name(FailW3), args={}, id=4, attempt=1)
-        with patch("honeybadger.contrib.oban.honeybadger.notify"):
+        with patch("honeybadger.contrib.oban.honeybadger.notify_async"):
             await Executor(job).execute()
         assert prior_calls == [(4, "ValueError")]
     finally:
@@ -557,7 +557,7 @@ async def test_exclude_workers_does_not_filter_errors(reset_oban_registry):
     hb.init()
     try:
         job = Job(worker_name(ExcludedW), args={}, id=5, attempt=1)
-        with patch("honeybadger.contrib.oban.honeybadger.notify") as notify:
+        with patch("honeybadger.contrib.oban.honeybadger.notify_async") as notify:
             await Executor(job).execute()
         # Error path is unaffected by exclude_workers.
         assert notify.call_count == 1
@@ -1236,11 +1236,11 @@ async def test_wrap_result_inert_after_teardown_via_chained_extension(
     hb.tearDown()
 
     # Run a failing job. Our extension's closure will still be called via the chain,
-    # but it must NOT call honeybadger.notify.
+    # but it must NOT call honeybadger.notify_async.
     from oban.worker import worker_name
 
     job = Job(worker_name(InertW), args={}, id=1, attempt=1)
-    with patch("honeybadger.contrib.oban.honeybadger.notify") as notify:
+    with patch("honeybadger.contrib.oban.honeybadger.notify_async") as notify:
         await Executor(job).execute()
     assert notify.call_count == 0
 
@@ -0,0 +1,252 @@
+import asyncio
+import gzip
+import json
+import threading
+from urllib.error import URLError
+
+import pytest
+from six.moves.urllib import request
+
+from honeybadger import Honeybadger, connection
+from honeybadger.async_connection import (
+    AsyncHTTPConnectionPool,
+    send_events,
+    send_notice,
+)
+from honeybadger.config import Configuration
+from honeybadger.notice import Notice
+from honeybadger.notices_worker import NoticesWorker
+from honeybadger.types import EventsSendStatus
+from .utils import recording_server
+
+
+@pytest.fixture
+def server():
+    with recording_server() as srv:
+        yield srv
+
+
+def _endpoint(srv):
+    return "http://127.0.0.1:{}".format(srv.server_address[1])
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_stream(server):
+    pool = AsyncHTTPConnectionPool()
+    for _ in range(3):
+        req = request.Request(url=_endpoint(server) + "/v1/events/", data=b"{}")
+        response = await pool.urlopen(req, timeout=5)
+        assert response.getcode() == 201
+
+    assert len(server.requests) == 3
+    assert len({addr for _, addr, _ in server.requests}) == 1
+    pool.clear()
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_when_stream_is_stale(server):
+    server.silently_close = True
+    pool = AsyncHTTPConnectionPool()
+    for _ in range(2):
+        req = request.Request(url=_endpoint(server) + "/v1/events/", data=b"{}")
+        assert (await pool.urlopen(req, timeout=5)).getcode() == 201
+    assert len(server.requests) == 2
+    pool.clear()
+
+
+@pytest.mark.asyncio
+async def test_pool_raises_url_error_when_unreachable():
+    with recording_server() as srv:
+        endpoint = _endpoint(srv)
+    req = request.Request(url=endpoint + "/v1/events/", data=b"{}")
+    with pytest.raises(URLError):
+        await AsyncHTTPConnectionPool().urlopen(req, timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_send_notice(server):
+    config = Configuration(
+        api_key="aaa",
+        endpoint=_endpoint(server),
+        compression="gzip",
+        compression_threshold=0,
+    )
+    notice = Notice(error_class="TestError", error_message="Test", config=config)
+
+    notice_id = await send_notice(config, notice)
+
+    assert notice_id == notice.payload["error"]["token"]
+    path, _, body = server.requests[0]
+    assert path == "/v1/notices/"
+    assert json.loads(gzip.decompress(body))["error"]["class"] == "TestError"
+
+
+@pytest.mark.asyncio
+async def test_send_notice_hands_failures_to_the_notices_worker(server):
+    server.status = 500
+    config = Configuration(
+        api_key="aaa", endpoint=_endpoint(server), notices_retry_backoff=0.01
+    )
+    notice = Notice(error_class="TestError", error_message="Test", config=config)
+
+    await send_notice(config, notice)
+    server.status = 201
+
+    assert connection.notices_worker.flush(5)["pending_notices"] == 0
+    assert len(server.requests) == 2
+    assert server.requests[0][2] == server.requests[1][2]
+
+
+@pytest.mark.asyncio
+async def test_send_notice_force_sync_makes_one_attempt(server):
+    server.status = 500
+    config = Configuration(api_key="aaa", endpoint=_endpoint(server), force_sync=True)
+    notice = Notice(error_class="TestError", error_message="Test", config=config)
+
+    await send_notice(config, notice)
+
+    assert connection.notices_worker.flush(5)["pending_notices"] == 0
+    assert len(server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_events(server):
+    config = Configuration(api_key="aaa", endpoint=_endpoint(server))
+    result = await send_events(config, [{"event_type": "a"}, {"event_type": "b"}])
+    assert result.status == EventsSendStatus.OK
+    lines = server.requests[0][2].split(b"\n")
+    assert [json.loads(line) for line in lines] == [
+        {"event_type": "a"},
+        {"event_type": "b"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_events_throttled(server):
+    server.status = 429
+    config = Configuration(api_key="aaa", endpoint=_endpoint(server))
+    result = await send_events(config, [{"event_type": "a"}])
+    assert result.status == EventsSendStatus.THROTTLING
+
+
+@pytest.mark.asyncio
+async def test_notify_async_delivers_in_background(server):
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", endpoint=_endpoint(server), force_report_data=True)
+
+    notice_id = await hb.notify_async(error_class="Exception", error_message="boom")
+
+    assert notice_id is not None
+    for task in list(hb._async_deliveries):
+        await task
+    payload = json.loads(server.requests[0][2])
+    assert payload["error"]["token"] == notice_id
+    assert payload["error"]["message"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_notify_async_bounds_background_sends(server):
+    hb = Honeybadger()
+    hb.configure(
+        api_key="aaa",
+        endpoint=_endpoint(server),
+        force_report_data=True,
+        notices_max_queue_size=1,
+    )
+
+    await hb.notify_async(error_class="Exception", error_message="one")
+    await hb.notify_async(error_class="Exception", error_message="two")
+
+    assert len(hb._async_deliveries) == 1
+    for task in list(hb._async_deliveries):
+        await task
+    assert connection.notices_worker.flush(5)["pending_notices"] == 0
+    messages = {json.loads(body)["error"]["message"] for _, _, body in server.requests}
+    assert messages == {"one", "two"}
+
+
+def test_flush_waits_for_async_notices_on_another_loop(server):
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", endpoint=_endpoint(server), force_report_data=True)
+    hb.notices_worker = NoticesWorker()  # not the one other tests share
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(
+            hb.notify_async(error_class="Exception", error_message="boom"), loop
+        ).result(5)
+
+        summary = hb.flush(timeout=5)
+
+        assert summary["pending_notices"] == 0
+        assert len(server.requests) == 1
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_flush_counts_async_notices_it_cannot_wait_for(server):
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", endpoint=_endpoint(server), force_report_data=True)
+    hb.notices_worker = NoticesWorker()  # not the one other tests share
+
+    await hb.notify_async(error_class="Exception", error_message="boom")
+
+    # Called on the loop the send runs on, so it can't make progress
+    assert hb.flush(timeout=0.1)["pending_notices"] == 1
+    for task in list(hb._async_deliveries):
+        await task
+    assert hb.flush(timeout=0.1)["pending_notices"] == 0
+
+
+def test_notify_async_survives_the_loop_closing(server):
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", endpoint=_endpoint(server), force_report_data=True)
+
+    async def main():
+        return await hb.notify_async(error_class="Exception", error_message="boom")
+
+    notice_id = asyncio.run(main())
+
+    assert connection.notices_worker.flush(5)["pending_notices"] == 0
+    tokens = {json.loads(body)["error"]["token"] for _, _, body in server.requests}
+    assert tokens == {notice_id}
+
+
+@pytest.mark.asyncio
+async def test_notify_async_force_sync_waits_for_delivery(server):
+    hb = Honeybadger()
+    hb.configure(
+        api_key="aaa",
+        endpoint=_endpoint(server),
+        force_report_data=True,
+        force_sync=True,
+    )
+
+    await hb.notify_async(ValueError("boom"))
+
+    assert len(server.requests) == 1
+    assert not hb._async_deliveries
+
+
+@pytest.mark.asyncio
+async def test_notify_async_respects_before_notify(server):
+    hb = Honeybadger()
+    hb.configure(
+        api_key="aaa",
+        endpoint=_endpoint(server),
+        force_report_data=True,
+        before_notify=lambda notice: None,
+    )
+    assert await hb.notify_async(ValueError("boom")) is None
+    assert not hb._async_deliveries
+
+
+@pytest.mark.asyncio
+async def test_event_async_queues_event():
+    hb = Honeybadger()
+    await hb.event_async("user.signup", {"email": "a@example.com"})
+    assert hb.events_worker.get_stats()["queue_size"] == 1
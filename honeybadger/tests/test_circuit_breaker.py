@@ -0,0 +1,64 @@
+import time
+
+from honeybadger.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def trip(breaker, threshold=3, cooldown=0.1):
+    for _ in range(threshold):
+        assert breaker.before_send(threshold, cooldown) is None
+        breaker.record_failure(threshold, cooldown)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker()
+    trip(breaker)
+
+    wait = breaker.before_send(3, 0.1)
+    assert wait is not None and 0 < wait <= 0.1
+    assert breaker.get_stats() == {
+        "state": OPEN,
+        "consecutive_failures": 3,
+        "times_opened": 1,
+    }
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker()
+    breaker.record_failure(3, 0.1)
+    breaker.record_failure(3, 0.1)
+    breaker.record_success()
+    breaker.record_failure(3, 0.1)
+    assert breaker.before_send(3, 0.1) is None
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker()
+    trip(breaker)
+    time.sleep(0.12)
+
+    assert breaker.before_send(3, 0.1) is None
+    assert breaker.get_stats()["state"] == HALF_OPEN
+    assert breaker.before_send(3, 0.1) == CircuitBreaker._TRIAL_WAIT
+
+    breaker.record_success()
+    assert breaker.get_stats()["state"] == CLOSED
+    assert breaker.before_send(3, 0.1) is None
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker()
+    trip(breaker)
+    time.sleep(0.12)
+
+    assert breaker.before_send(3, 0.1) is None
+    breaker.record_failure(3, 0.1)
+    assert breaker.get_stats()["state"] == OPEN
+    assert breaker.get_stats()["times_opened"] == 2
+    assert breaker.before_send(3, 0.1) is not None
+
+
+def test_zero_threshold_disables():
+    breaker = CircuitBreaker()
+    for _ in range(10):
+        breaker.record_failure(0, 0.1)
+        assert breaker.before_send(0, 0.1) is None
@@ -1,12 +1,25 @@
+import gzip
 import json
 import logging
+import zlib
 import pytest
-from six import b
 from .utils import mock_urlopen
 
-from honeybadger.connection import send_notice
+from urllib.error import URLError
+from mock import patch
+
+from honeybadger.connection import (
+    circuit_breaker,
+    send_notice,
+    send_events,
+    _notice_result,
+    _events_result,
+)
+from honeybadger.types import EventsSendStatus
 from honeybadger.config import Configuration
+from honeybadger.events_worker import EventBatch
 from honeybadger.notice import Notice
+from honeybadger.testing import FakeAPIServer
 import uuid
 
 
@@ -20,7 +33,7 @@ def test_connection_success():
     def test_request(request_object):
         assert request_object.get_header("X-api-key") == api_key
         assert request_object.get_full_url() == "{}/v1/notices/".format(config.endpoint)
-        assert request_object.data == b(json.dumps(notice.payload))
+        assert json.loads(request_object.data) == json.loads(json.dumps(notice.payload))
 
     with mock_urlopen(test_request) as request_mock:
         send_notice(config, notice)
@@ -34,7 +47,7 @@ def test_connection_returns_notice_id():
     )
 
     def test_payload(request_object):
-        assert request_object.data == b(json.dumps(notice.payload))
+        assert json.loads(request_object.data) == json.loads(json.dumps(notice.payload))
 
     with mock_urlopen(test_payload) as request_mock:
         assert send_notice(config, notice) == notice.payload.get("error", {}).get(
@@ -42,4 +55,171 @@ def test_connection_returns_notice_id():
         )
 
 
+def test_connection_compresses_notice():
+    config = Configuration(
+        api_key="badgerbadgermushroom", compression="gzip", compression_threshold=0
+    )
+    notice = Notice(
+        error_class="TestError", error_message="Test message", config=config
+    )
+
+    def test_payload(request_object):
+        assert request_object.get_header("Content-encoding") == "gzip"
+        assert json.loads(gzip.decompress(request_object.data)) == json.loads(
+            json.dumps(notice.payload)
+        )
+
+    with mock_urlopen(test_payload):
+        send_notice(config, notice)
+
+
+def test_connection_truncates_oversized_notice():
+    config = Configuration(
+        api_key="badgerbadgermushroom", notices_max_payload_bytes=8000
+    )
+    notice = Notice(
+        error_class="TestError",
+        error_message="Test message",
+        context={"blob": "x" * 50_000},
+        config=config,
+    )
+
+    def test_payload(request_object):
+        assert len(request_object.data) <= 8000
+        sent = json.loads(request_object.data)
+        assert "strings" in sent["notifier"]["truncated"]
+        assert len(notice.payload["request"]["context"]["blob"]) == 50_000
+
+    with mock_urlopen(test_payload):
+        send_notice(config, notice)
+
+
+def test_send_events_compresses_batch():
+    config = Configuration(
+        api_key="badgerbadgermushroom", compression="deflate", compression_threshold=0
+    )
+    events = [{"event_type": "db.query", "query": "SELECT 1"}] * 3
+
+    def test_payload(request_object):
+        assert request_object.get_header("Content-encoding") == "deflate"
+        lines = zlib.decompress(request_object.data).decode("utf-8").split("\n")
+        assert [json.loads(line) for line in lines] == events
+
+    with mock_urlopen(test_payload):
+        send_events(config, events)
+
+
+def test_send_events_uses_cached_batch_body():
+    config = Configuration(api_key="badgerbadgermushroom")
+    batch = EventBatch()
+    batch.add({"event_type": "db.query"})
+
+    def test_payload(request_object):
+        assert request_object.data is batch.body
+
+    with mock_urlopen(test_payload):
+        send_events(config, batch)
+
+
+def test_send_events_passes_timeouts():
+    config = Configuration(api_key="aaa", connect_timeout=1.5, read_timeout=4.0)
+
+    with mock_urlopen(lambda request_object: None) as request_mock:
+        send_events(config, [{"event_type": "a"}])
+
+    assert request_mock.call_args[1] == {"timeout": 4.0, "connect_timeout": 1.5}
+
+
+def test_circuit_breaker_short_circuits_after_failures():
+    config = Configuration(
+        api_key="aaa", circuit_breaker_threshold=2, circuit_breaker_cooldown=30.0
+    )
+    with patch(
+        "honeybadger.http_pool.HTTPConnectionPool.urlopen",
+        side_effect=URLError("timed out"),
+    ) as urlopen:
+        for _ in range(2):
+            assert send_events(config, [{}]).status == EventsSendStatus.ERROR
+        result = send_events(config, [{}])
+
+    assert result.status == EventsSendStatus.CIRCUIT_OPEN
+    assert 29 < result.retry_after <= 30
+    assert urlopen.call_count == 2
+    assert circuit_breaker.get_stats()["state"] == "open"
+
+
+def test_unexpected_error_in_trial_send_reopens_the_circuit():
+    config = Configuration(
+        api_key="aaa", circuit_breaker_threshold=1, circuit_breaker_cooldown=0.0
+    )
+    with patch(
+        "honeybadger.http_pool.HTTPConnectionPool.urlopen",
+        side_effect=URLError("down"),
+    ):
+        send_events(config, [{}])
+    with patch(
+        "honeybadger.http_pool.HTTPConnectionPool.urlopen",
+        side_effect=ValueError("bad status line"),
+    ):
+        with pytest.raises(ValueError):
+            send_events(config, [{}])  # the half-open trial
+
+    with FakeAPIServer() as server:
+        config.endpoint = server.url
+        assert send_events(config, [{}]).status == EventsSendStatus.OK
+    assert circuit_breaker.get_stats()["state"] == "closed"
+
+
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        (201, EventsSendStatus.OK),
+        (429, EventsSendStatus.THROTTLING),
+        (413, EventsSendStatus.REJECTED),
+        (408, EventsSendStatus.ERROR),
+        (503, EventsSendStatus.ERROR),
+    ],
+)
+def test_notice_result_classifies_status(status, expected):
+    assert _notice_result(status).status == expected
+
+
+@pytest.mark.parametrize(
+    "status,expected",
+    [
+        (201, EventsSendStatus.OK),
+        (429, EventsSendStatus.THROTTLING),
+        (400, EventsSendStatus.REJECTED),
+        (413, EventsSendStatus.REJECTED),
+        (422, EventsSendStatus.REJECTED),
+        (401, EventsSendStatus.ERROR),
+        (402, EventsSendStatus.ERROR),
+        (403, EventsSendStatus.ERROR),
+        (404, EventsSendStatus.ERROR),
+        (408, EventsSendStatus.ERROR),
+        (503, EventsSendStatus.ERROR),
+    ],
+)
+def test_events_result_classifies_status(status, expected):
+    assert _events_result(status, 1).status == expected
+
+
 # TODO: figure out how to test logging output
+
+
+def test_bad_api_key_is_an_error_not_a_rejection():
+    with FakeAPIServer(api_key="right") as server:
+        config = Configuration(api_key="wrong", endpoint=server.url)
+        result = send_events(config, [{"event_type": "x"}, {"event_type": "y"}])
+
+    assert result.status == EventsSendStatus.ERROR
+    assert result.reason == "got HTTP 403"
+
+
+def test_throttled_result_carries_retry_after():
+    with FakeAPIServer(throttle_rate=1.0, retry_after=7) as server:
+        config = Configuration(api_key="abc", endpoint=server.url)
+        result = send_events(config, [{"event_type": "x"}])
+
+    assert result.status == EventsSendStatus.THROTTLING
+    assert result.retry_after == 7.0
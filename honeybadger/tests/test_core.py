@@ -1,3 +1,4 @@
+import io
 import json
 import threading
 
@@ -8,6 +9,8 @@ from .utils import mock_urlopen
 from honeybadger import Honeybadger
 from mock import MagicMock, patch
 from honeybadger.config import Configuration
+from honeybadger.notices_worker import NoticesWorker
+from honeybadger.sinks import StdoutSink
 
 
 def test_set_and_get_context_merges_values():
@@ -179,6 +182,60 @@ def test_threading():
         assert connection.call_count == 0
 
 
+def test_events_worker_thread_waits_for_first_event():
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", environment="development")
+    assert hb.events_worker._thread is None
+
+    hb.event("started", {})
+    assert hb.events_worker._thread.is_alive()
+    hb.events_worker.shutdown()
+
+
+def test_configuring_a_spool_starts_events_worker(tmp_path):
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", spool_dir=str(tmp_path))
+    assert hb.events_worker._thread.is_alive()
+    hb.events_worker.shutdown()
+
+
+def test_configure_applies_lane_settings_straight_away():
+    hb = Honeybadger()
+    hb.configure(
+        api_key="aaa",
+        environment="development",
+        events_timeout=60,
+        events_max_queue_size=10,
+        events_critical_types=["django.request"],
+    )
+
+    hb.event("django.request", {})
+
+    lanes = hb.events_worker.get_stats()["lanes"]
+    assert lanes["critical"]["max_queue_size"] == 2
+    assert lanes["critical"]["total_events"] == 1
+    assert lanes["default"]["total_events"] == 0
+    hb.events_worker.shutdown()
+
+
+def test_flushing_sends_events_and_fills_in_summary():
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", environment="development", events_timeout=60)
+    hb.notices_worker = NoticesWorker()  # not the one other tests share
+
+    with hb.flushing(timeout=1.0) as summary:
+        hb.event("started", {})
+        hb.event("finished", {})
+    assert summary == {
+        "sent_events": 2,
+        "pending_events": 0,
+        "sent_notices": 0,
+        "pending_notices": 0,
+    }
+    assert hb.events_worker._thread.is_alive()
+    hb.events_worker.shutdown()
+
+
 def test_notify_fake_connection_dev_environment():
     hb = Honeybadger()
     hb.configure(api_key="aaa", environment="development")
@@ -278,6 +335,34 @@ def test_notify_with_custom_params():
         )
 
 
+def test_notify_without_exception_starts_backtrace_at_caller():
+    def test_payload(request):
+        payload = json.loads(request.data.decode("utf-8"))
+        assert payload["error"]["backtrace"][0]["method"] == "report"
+
+    hb = Honeybadger()
+
+    def report():
+        hb.notify(error_class="Exception", error_message="Test message.")
+
+    with mock_urlopen(test_payload):
+        hb.configure(api_key="aaa", force_report_data=True, force_sync=True)
+        report()
+
+
+def test_notify_through_sink_starts_backtrace_at_caller():
+    stream = io.BytesIO()
+    hb = Honeybadger()
+    hb.configure(api_key="aaa", force_report_data=True, sinks=[StdoutSink(stream)])
+
+    def report():
+        hb.notify(error_class="Exception", error_message="Test message.")
+
+    report()
+    payload = json.loads(stream.getvalue().splitlines()[0])
+    assert payload["error"]["backtrace"][0]["method"] == "report"
+
+
 def test_notify_with_fingerprint():
     def test_payload(request):
         payload = json.loads(request.data.decode("utf-8"))
@@ -1,8 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+import threading
 import time
 from types import SimpleNamespace
+from unittest.mock import patch
 import pytest
-from honeybadger.events_worker import EventsWorker, EventsSendResult, Event
+from honeybadger.events_worker import (
+    ByteBudget,
+    EventsWorker,
+    EventsSendResult,
+    Event,
+    byte_cost,
+)
 from honeybadger.types import EventsSendStatus
+from honeybadger import serializer
+from honeybadger.circuit_breaker import CircuitBreaker
+from honeybadger.scheduler import DeliveryScheduler
+from honeybadger.utils import encode_events
+from .utils import events_config, recording_server
 
 
 class DummyConnection:
@@ -25,7 +42,7 @@ class DummyConnection:
 
 @pytest.fixture
 def base_config():
-    return SimpleNamespace(
+    return events_config(
         api_key="key",
         endpoint="url",
         environment="env",
@@ -63,6 +80,106 @@ def test_batch_send_on_batch_size(worker):
     assert conn.batches == [events]
 
 
+def test_thread_starts_on_first_push(base_config):
+    def worker_threads():
+        return [t for t in threading.enumerate() if t.name.startswith("honeybadger-")]
+
+    before = worker_threads()
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=base_config)
+    assert w._thread is None
+    assert worker_threads() == before
+
+    w.push({"id": 1})
+    assert w._thread.is_alive()
+    w.shutdown()
+    assert conn.batches == [[{"id": 1}]]
+
+
+def test_flush_sends_partial_batch_and_keeps_running(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_timeout = 60  # only flush() or a full batch sends
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+    w.push({"id": 2})
+
+    assert w.flush(1.0) == {"sent_events": 2, "pending_events": 0}
+    assert conn.batches == [[{"id": 1}, {"id": 2}]]
+
+    for i in range(3, 6):
+        w.push({"id": i})
+    assert wait_for(lambda: len(conn.batches) == 2, 1.0)
+    w.shutdown()
+
+
+def test_flush_reports_pending_at_deadline(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_throttle_wait = 60
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING, retry_after=60)
+    conn = DummyConnection(behaviors=[throttled])
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+
+    start = time.monotonic()
+    assert w.flush(0.2) == {"sent_events": 0, "pending_events": 1}
+    assert time.monotonic() - start < 0.5
+    assert w._thread.is_alive()
+
+
+def test_stats_histograms_and_drop_reasons(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_max_batch_retries = 1
+    failed = EventsSendResult(EventsSendStatus.ERROR, "fail")
+    conn = DummyConnection(behaviors=[EventsSendResult(EventsSendStatus.OK), failed])
+    w = EventsWorker(connection=conn, config=cfg)
+    for i in range(5):
+        w.push({"id": i})
+    w.flush(1.0)
+    w.shutdown()
+
+    stats = w.get_stats()
+    histograms = stats["histograms"]
+    assert histograms["batch_events"]["count"] == 2
+    assert histograms["batch_events"]["max"] == 3
+    assert histograms["batch_bytes"]["count"] == 2
+    assert histograms["send_latency_ms"]["count"] == 2
+    assert histograms["batch_retries"]["count"] == 2
+    assert histograms["batch_retries"]["max"] == 1
+    assert histograms["serialize_us"]["count"] == 1  # one push in 16
+    assert stats["sent_events"] == 3
+    assert stats["dropped_by_reason"]["retries"] == 2
+
+
+def test_emits_client_stats_event(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_client_stats_interval = 0.05
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+
+    def stats_events():
+        return [
+            e
+            for batch in conn.batches
+            for e in batch
+            if e.get("event_type") == "honeybadger.client_stats"
+        ]
+
+    assert wait_for(stats_events, 2.0)
+    w.shutdown()
+    event = stats_events()[0]
+    assert event["pid"] == os.getpid()
+    assert "send_latency_ms" in event["histograms"]
+    assert "retries" in event["dropped_by_reason"]
+
+
+def test_shutdown_before_any_push(base_config):
+    w = EventsWorker(connection=DummyConnection(), config=base_config)
+    w.shutdown()
+    assert w._thread is None
+
+
 def test_no_send_under_batch_size(worker):
     w, conn = worker
     for e in ({"id": 1}, {"id": 2}):
@@ -87,6 +204,166 @@ def test_drop_events_when_queue_full(base_config):
     w.shutdown()
 
 
+def test_queue_limit_is_exact_under_concurrent_pushes(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1000
+    cfg.events_max_queue_size = 500
+    cfg.events_timeout = 60
+    w = EventsWorker(connection=DummyConnection(), config=cfg)
+    accepted = []
+    start = threading.Barrier(16)
+
+    def push_many():
+        start.wait()
+        accepted.append(sum(w.push({"id": i}) for i in range(100)))
+
+    threads = [threading.Thread(target=push_many) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(accepted) == 500
+    assert w.get_stats()["queue_size"] == 500
+    assert w.get_stats()["total_events"] == 500
+    w.shutdown()
+
+
+def test_queue_space_counts_pending_retries(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 2
+    cfg.events_max_queue_size = 4
+    cfg.events_timeout = 0.05
+    cfg.events_max_batch_retries = 2
+    conn = DummyConnection(
+        behaviors=[EventsSendResult(EventsSendStatus.ERROR, "fail")] * 2
+    )
+    w = EventsWorker(connection=conn, config=cfg)
+    for e in ({"id": 1}, {"id": 2}):
+        assert w.push(e)
+    assert wait_for(lambda: conn.call_count == 1, 1.0)
+    assert w.get_stats()["total_events"] == 2
+    assert [w.push({"id": i}) for i in (3, 4, 5)] == [True, True, False]
+
+    # Given up on after two attempts, the first batch frees its places
+    assert wait_for(lambda: w.get_stats()["total_events"] == 0, 2.0)
+    assert w.push({"id": 6})
+    w.shutdown()
+
+
+def test_queue_limit_follows_config_changes(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_max_queue_size = 4
+    cfg.events_timeout = 0.02
+    w = EventsWorker(connection=DummyConnection(), config=cfg)
+    cfg.events_max_queue_size = 2
+    assert wait_for(lambda: not w.push({"id": 0}), 1.0)
+    cfg.events_max_queue_size = 3
+    assert wait_for(lambda: w.push({"id": 1}), 1.0)
+    w.shutdown()
+
+
+def test_batches_are_cut_at_max_batch_bytes(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_timeout = 0.05
+    line = len(serializer.dumps({"id": 0, "pad": "x" * 100}))
+    cfg.events_max_batch_bytes = 3 * line + 2  # three events and separators
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    for i in range(7):
+        w.push({"id": i, "pad": "x" * 100})
+    assert wait_for(lambda: sum(len(b) for b in conn.batches) == 7, 1.0)
+    assert [len(b) for b in conn.batches] == [3, 3, 1]
+    assert all(len(b.body) <= cfg.events_max_batch_bytes for b in conn.batches)
+    w.shutdown()
+
+
+def test_oversized_event_is_sent_alone(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_max_batch_bytes = 1000
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+    w.push({"id": 2, "pad": "x" * 2000})  # fills a batch, so sends at once
+    w.push({"id": 3})
+    assert wait_for(lambda: len(conn.batches) == 3, 1.0)
+    assert [[e["id"] for e in b] for b in conn.batches] == [[1], [2], [3]]
+    w.shutdown()
+
+
+def test_drop_events_when_queue_bytes_full(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_timeout = 60
+    big = {"pad": "x" * 1500}
+    cost = byte_cost(serializer.dumps(big))
+    cfg.events_max_queue_bytes = 2 * cost
+    w = EventsWorker(connection=DummyConnection(), config=cfg)
+    assert [w.push(big), w.push(big), w.push(big)] == [True, True, False]
+    assert not w.push({"id": 1})
+    stats = w.get_stats()
+    assert stats["dropped_events"] == 2
+    assert stats["total_bytes"] == 2 * cost
+    w.shutdown()
+
+
+def test_queue_bytes_count_small_events_exactly(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 10_000
+    cfg.events_timeout = 60
+    cfg.events_max_queue_size = 10_000
+    event = {"event_type": "db.query", "ms": 1.5}
+    cost = byte_cost(serializer.dumps(event))
+    cfg.events_max_queue_bytes = 1000 * cost
+    w = EventsWorker(connection=DummyConnection(), config=cfg)
+    assert sum(w.push(event) for _ in range(1200)) == 1000
+    assert w.get_stats()["total_bytes"] == 1000 * cost
+    w.shutdown()
+
+
+def test_byte_budget_claims_exactly_and_repays_debt():
+    budget = ByteBudget(100)
+    assert budget.claim(60)
+    assert not budget.claim(41)
+    assert budget.claim(40)
+    assert len(budget) == 100
+
+    budget.take(30)  # held over capacity, owed
+    budget.release(50)
+    assert len(budget) == 80
+    assert not budget.claim(21)
+    assert budget.claim(20)
+
+    budget.release(100)
+    budget.resize(10)
+    assert len(budget) == 0
+    assert not budget.claim(11)
+    assert budget.claim(10)
+
+
+def test_byte_budget_never_overcommits_across_threads():
+    budget = ByteBudget(10_000)
+    claimed = []
+
+    def claim_many():
+        claimed.append(sum(n for n in (1, 7, 13, 50) * 200 if budget.claim(n)))
+
+    threads = [threading.Thread(target=claim_many) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(claimed) == len(budget) <= 10_000
+
+    for _ in range(2000):  # many small releases are merged back
+        budget.release(1)
+    assert len(budget._free) <= ByteBudget._MAX_CHUNKS + 1
+    assert len(budget) == sum(claimed) - 2000
+
+
 def test_flush_on_timeout(base_config):
     cfg = SimpleNamespace(**vars(base_config))
     cfg.events_batch_size = 10
@@ -138,6 +415,24 @@ def test_retry_and_drop_after_max_retries(base_config):
     w.shutdown()
 
 
+def test_batch_is_encoded_once_across_retries(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 2
+    cfg.events_timeout = 0.05
+    conn = DummyConnection(behaviors=[EventsSendResult(EventsSendStatus.ERROR, "x")])
+    w = EventsWorker(connection=conn, config=cfg)
+    with patch.object(serializer, "dumps", wraps=serializer.dumps) as dumps:
+        for e in ({"id": 1}, {"id": 2}):
+            w.push(e)
+        assert wait_for(lambda: conn.call_count == 2, 1.0)
+    w.shutdown()
+
+    first, retry = conn.batches
+    assert first is retry
+    assert bytes(first.body) == encode_events([{"id": 1}, {"id": 2}])
+    assert dumps.call_count == 2
+
+
 def test_queue_new_events_during_retries(base_config):
     cfg = SimpleNamespace(**vars(base_config))
     cfg.events_batch_size = 2
@@ -156,13 +451,45 @@ def test_queue_new_events_during_retries(base_config):
     second = [{"id": 3}, {"id": 4}]
     for e in second:
         w.push(e)
-    time.sleep(cfg.events_timeout * 2)
-    assert conn.batches[0] == first
-    assert conn.batches[1] == first
-    assert conn.batches[2] == second
+    # The new batch goes out at once; the failed one waits out its backoff
+    assert wait_for(lambda: len(conn.batches) >= 3, 1.0)
+    assert conn.batches == [first, second, first]
     w.shutdown()
 
 
+def test_wakeups_do_not_cut_retry_backoff_short(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_timeout = 5.0  # backoff of 2.5-5s before the first retry
+    cfg.events_throttle_wait = 5.0
+    conn = DummyConnection(behaviors=[EventsSendResult(EventsSendStatus.ERROR, "")])
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 0})
+    assert wait_for(lambda: conn.call_count == 1, 1.0)
+
+    for i in range(1, 4):  # each fills a batch and wakes the worker
+        w.push({"id": i})
+    w.flush(0.3)
+    assert conn.batches == [[{"id": i}] for i in range(4)]
+    assert w.get_stats()["batch_count"] == 1
+    w.shutdown(0)
+
+
+def test_wakeups_do_not_cut_a_throttling_pause_short(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING, retry_after=60)
+    conn = DummyConnection(behaviors=[throttled])
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 0})
+    assert wait_for(lambda: conn.call_count == 1, 1.0)
+
+    w.push({"id": 1})
+    assert w.flush(0.2)["pending_events"] == 2
+    assert conn.call_count == 1
+    w.shutdown(0)
+
+
 def test_does_not_reset_timer_on_subsequent_pushes(base_config):
     cfg = SimpleNamespace(**vars(base_config))
     cfg.events_batch_size = 100
@@ -217,10 +544,9 @@ def test_throttling_and_resume(base_config):
     second = [{"id": 3}, {"id": 4}]
     for e in second:
         w.push(e)
-    time.sleep(cfg.events_throttle_wait + cfg.events_timeout * 2)
-    assert conn.batches[0] == first
-    assert conn.batches[1] == first
-    assert conn.batches[2] == second
+    # The new batch goes out at once; the failed one waits out its backoff
+    assert wait_for(lambda: len(conn.batches) >= 3, 1.0)
+    assert conn.batches == [first, second, first]
     w.shutdown()
 
 
@@ -347,6 +673,7 @@ def test_shutdown_interrupts_error_backoff(base_config):
     cfg.events_timeout = "not-a-number"  # worker loop errors -> backoff path
     conn = DummyConnection()
     w = EventsWorker(connection=conn, config=cfg)
+    w.start()
     time.sleep(0.05)  # let the worker enter its error backoff
     cfg.events_timeout = 0.1  # sane join timeout for shutdown
 
@@ -358,6 +685,47 @@ def test_shutdown_interrupts_error_backoff(base_config):
     assert elapsed < 0.5, f"shutdown blocked {elapsed:.2f}s on error backoff"
 
 
+def test_shutdown_sends_critical_then_newest_first(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_max_queue_size = 100
+    cfg.events_critical_types = ["crit"]
+    cfg.events_bulk_types = ["bulk"]
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    with w._lock:  # hold off the worker until shutdown has begun
+        for event_type in ("bulk", "default-1", "crit", "default-2"):
+            w.push({"event_type": event_type})
+        w.shutdown(1.0, wait=False)
+    w.shutdown(1.0)
+
+    sent = [batch[0]["event_type"] for batch in conn.batches]
+    assert sent == ["crit", "default-2", "default-1", "bulk"]
+
+
+def test_shutdown_abandons_what_cannot_go_out_by_the_deadline(base_config, caplog):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_throttle_wait = 60
+    cfg.events_max_batch_retries = 100
+    cfg.events_bulk_types = ["bulk"]
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING, retry_after=60)
+    conn = DummyConnection(behaviors=[throttled] * 10)
+    w = EventsWorker(connection=conn, config=cfg)
+    for event_type in ("a", "b", "c", "bulk"):
+        w.push({"event_type": event_type})
+    assert wait_for(lambda: conn.call_count, 1.0)
+
+    start = time.monotonic()
+    w.shutdown(5.0)
+    assert time.monotonic() - start < 1.0, "waited out a throttle past the deadline"
+    assert not w._thread.is_alive()
+
+    stats = w.get_stats()
+    assert stats["total_events"] == 0
+    assert stats["dropped_by_reason"]["shutdown"] == 4
+    assert "abandoning 4 event(s) (critical: 0, default: 3, bulk: 1)" in caplog.text
+
+
 def test_shutdown_with_still_invalid_timeout_config(base_config):
     """shutdown() must not crash computing its join timeout when the config
     is still invalid at shutdown time."""
@@ -365,6 +733,7 @@ def test_shutdown_with_still_invalid_timeout_config(base_config):
     cfg.events_timeout = "not-a-number"
     conn = DummyConnection()
     w = EventsWorker(connection=conn, config=cfg)
+    w.start()
     time.sleep(0.05)  # let the worker enter its error backoff
     w.shutdown()  # must not raise
     assert not w._thread.is_alive()
@@ -378,6 +747,7 @@ def test_shutdown_with_both_timing_configs_invalid(base_config):
     cfg.events_throttle_wait = "also-bad"
     conn = DummyConnection()
     w = EventsWorker(connection=conn, config=cfg)
+    w.start()
     time.sleep(0.05)  # let the worker enter its error backoff
     w.shutdown()  # must not raise
     assert not w._thread.is_alive()
@@ -391,6 +761,7 @@ def test_worker_survives_bad_timeout_config(base_config):
     cfg.events_timeout = "not-a-number"  # e.g. an untypecast env var
     conn = DummyConnection()
     w = EventsWorker(connection=conn, config=cfg)
+    w.start()
     try:
         time.sleep(0.1)  # give the loop a chance to hit the bad timeout
         assert w._thread.is_alive(), "worker thread died on bad timeout config"
@@ -403,3 +774,366 @@ def test_worker_survives_bad_timeout_config(base_config):
     finally:
         cfg.events_timeout = 0.1
         w.shutdown()
+
+
+def test_open_circuit_does_not_use_up_retries(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_max_batch_retries = 1
+    circuit_open = EventsSendResult(
+        EventsSendStatus.CIRCUIT_OPEN, "circuit breaker open", retry_after=0.05
+    )
+    conn = DummyConnection(behaviors=[circuit_open] * 3)
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+    assert wait_for(lambda: conn.call_count == 4, 2.0)
+    assert w.get_stats()["batch_count"] == 0
+    w.shutdown()
+    assert conn.batches[-1] == [{"id": 1}]
+
+
+def test_stats_include_circuit_breaker(base_config):
+    conn = DummyConnection()
+    conn.circuit_breaker = CircuitBreaker()
+    w = EventsWorker(connection=conn, config=base_config)
+    assert w.get_stats()["circuit_breaker"]["state"] == "closed"
+    w.shutdown()
+
+
+def test_rejected_batch_is_split_to_isolate_bad_events(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 4
+    cfg.events_max_queue_size = 10
+
+    class RejectingConnection(DummyConnection):
+        def send_events(self, cfg, batch):
+            self.batches.append(list(batch))
+            if any(e.get("bad") for e in batch):
+                return EventsSendResult(EventsSendStatus.REJECTED, "got HTTP 413")
+            return EventsSendResult(EventsSendStatus.OK)
+
+    conn = RejectingConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    events = [{"id": 1}, {"id": 2, "bad": True}, {"id": 3}, {"id": 4}]
+    for e in events:
+        w.push(e)
+    assert wait_for(lambda: w.get_stats()["rejected_events"] == 1, 1.0)
+    w.shutdown()
+
+    sent = [b for b in conn.batches if not any(e.get("bad") for e in b)]
+    assert sorted(e["id"] for b in sent for e in b) == [1, 3, 4]
+    assert len(conn.batches) == 5  # 4, then 2 + 2, then 1 + 1
+    stats = w.get_stats()
+    assert stats["recent_rejected_events"] == [{"id": 2, "bad": True}]
+    assert stats["total_events"] == 0
+
+
+def test_split_reuses_encoded_body():
+    from honeybadger.events_worker import EventBatch
+
+    batch = EventBatch()
+    for i in range(5):
+        batch.add({"id": i, "text": "a\nb"})
+    with patch.object(serializer, "dumps") as dumps:
+        left, right = batch.split()
+    dumps.assert_not_called()
+    assert list(left) + list(right) == list(batch)
+    assert bytes(left.body) == encode_events(list(left))
+    assert bytes(right.body) == encode_events(list(right))
+
+
+def test_throttle_honors_retry_after(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 2
+    cfg.events_throttle_wait = 30.0
+    conn = DummyConnection(
+        behaviors=[EventsSendResult(EventsSendStatus.THROTTLING, retry_after=0.1)]
+    )
+    conn.scheduler = DeliveryScheduler()
+    w = EventsWorker(connection=conn, config=cfg)
+    for e in ({"id": 1}, {"id": 2}):
+        w.push(e)
+
+    assert wait_for(lambda: conn.call_count == 2, 1.0)
+    assert w.get_stats()["scheduler"]["times_throttled"] == 1
+    w.shutdown()
+
+
+def test_batches_wait_for_scheduler_tokens(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.delivery_rate = 10.0
+    cfg.delivery_burst = 1
+    conn = DummyConnection()
+    conn.scheduler = DeliveryScheduler()
+    w = EventsWorker(connection=conn, config=cfg)
+    start = time.monotonic()
+    for i in range(3):
+        w.push({"id": i})
+        time.sleep(0.01)
+
+    assert wait_for(lambda: conn.call_count == 3, 2.0)
+    assert time.monotonic() - start >= 0.2
+    assert w.get_stats()["scheduler"]["paced"] >= 1
+    w.shutdown()
+
+
+def test_concurrent_senders_overlap_sends(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_concurrency = 4
+
+    class SlowConnection(DummyConnection):
+        def __init__(self):
+            super().__init__()
+            self.lock = threading.Lock()
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        def send_events(self, cfg, batch):
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.2)
+            with self.lock:
+                self.in_flight -= 1
+            return super().send_events(cfg, batch)
+
+    conn = SlowConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    with w._lock:  # queue all four before the worker forms batches
+        for i in range(4):
+            w.push({"id": i})
+    start = time.monotonic()
+    assert wait_for(lambda: conn.call_count == 4, 1.0)
+    assert time.monotonic() - start < 0.6
+    assert conn.max_in_flight == 4
+    w.shutdown()
+
+
+EXIT_SCRIPT = """
+import sys
+from honeybadger import honeybadger
+honeybadger.configure(
+    api_key="key",
+    endpoint=sys.argv[1],
+    force_report_data=True,
+    events_batch_size=1,
+    events_timeout=60,
+    events_concurrency=4,
+)
+for i in range(20):
+    honeybadger.event("exit.test", {"i": i})
+"""
+
+
+def test_concurrent_senders_drain_at_exit():
+    with recording_server() as srv:
+        endpoint = "http://127.0.0.1:{}".format(srv.server_address[1])
+        subprocess.run(
+            [sys.executable, "-c", EXIT_SCRIPT, endpoint], check=True, timeout=30
+        )
+        sent = sorted(json.loads(body)["i"] for _, _, body in srv.requests)
+    assert sent == list(range(20))
+
+
+def test_concurrent_senders_keep_fifo_order_and_share_throttle(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_concurrency = 3
+
+    class ThrottlingConnection(DummyConnection):
+        def send_events(self, cfg, batch):
+            self.batches.append(batch)
+            if batch[0]["id"] in (0, 2):
+                return EventsSendResult(EventsSendStatus.THROTTLING, retry_after=30)
+            return EventsSendResult(EventsSendStatus.OK)
+
+    conn = ThrottlingConnection()
+    conn.scheduler = DeliveryScheduler()
+    w = EventsWorker(connection=conn, config=cfg)
+    with w._lock:
+        for i in range(4):
+            w.push({"id": i})
+    assert wait_for(lambda: len(conn.batches) == 3, 1.0)
+    assert wait_for(lambda: w.get_stats()["throttling"], 1.0)
+
+    # 3 never went out; 0 and 2 wait ahead of it, in their original order
+    assert [b[0]["id"] for b, _, _ in w._batches] == [0, 2, 3]
+    assert w.get_stats()["scheduler"]["times_throttled"] == 1
+    w._stop_event.set()
+
+
+def test_bulk_lane_flood_does_not_crowd_out_critical_events(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_timeout = 60
+    cfg.events_max_queue_size = 10
+    cfg.events_critical_types = ["django.*"]
+    cfg.events_bulk_types = ["db.query"]
+    w = EventsWorker(connection=DummyConnection(), config=cfg)
+
+    accepted = sum(w.push({"event_type": "db.query", "i": i}) for i in range(20))
+    assert accepted == 5  # the default bulk quota is half the queue
+    assert w.push({"event_type": "django.request"})
+    assert w.push({"event_type": "celery.task_finished"})
+
+    lanes = w.get_stats()["lanes"]
+    assert lanes["bulk"]["dropped_events"] == 15
+    assert lanes["critical"]["max_queue_size"] == 2
+    assert lanes["critical"]["total_events"] == 1
+    assert lanes["critical"]["total_bytes"] == byte_cost(
+        serializer.dumps({"event_type": "django.request"})
+    )
+    assert lanes["critical"]["dropped_events"] == 0
+    assert lanes["default"]["max_queue_size"] == 3
+    assert w.get_stats()["dropped_events"] == 15
+    w.shutdown()
+
+
+def test_lanes_are_sent_in_weighted_turns(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 1
+    cfg.events_max_queue_size = 100
+    cfg.events_critical_types = ["django.request"]
+    cfg.events_bulk_types = ["db.*"]
+    conn = DummyConnection()
+    w = EventsWorker(connection=conn, config=cfg)
+    with w._lock:
+        for i in range(3):
+            w.push({"event_type": "db.query", "i": i})
+        for i in range(3):
+            w.push({"event_type": "django.request", "i": i})
+    assert wait_for(lambda: conn.call_count == 6, 1.0)
+    assert [(b[0]["event_type"], b[0]["i"]) for b in conn.batches] == [
+        ("django.request", 0),
+        ("django.request", 1),
+        ("django.request", 2),
+        ("db.query", 0),
+        ("db.query", 1),
+        ("db.query", 2),
+    ]
+    w.shutdown()
+
+
+def full_worker(base_config, policy, **overrides):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_timeout = 60
+    cfg.events_max_queue_size = 3
+    cfg.events_drop_policy = policy
+    vars(cfg).update(overrides)
+    conn = DummyConnection()
+    return EventsWorker(connection=conn, config=cfg), conn
+
+
+def test_drop_oldest_policy_evicts_longest_queued(base_config):
+    w, _ = full_worker(base_config, "oldest")
+    assert all(w.push({"id": i}) for i in range(5))
+    stats = w.get_stats()
+    assert [e for e, _, _ in w._lanes["default"].queue] == [
+        {"id": 2},
+        {"id": 3},
+        {"id": 4},
+    ]
+    assert stats["dropped_by_policy"]["oldest"] == 2
+    assert stats["total_events"] == 3
+    w.shutdown()
+
+
+def test_block_policy_waits_for_space(base_config):
+    w, conn = full_worker(base_config, "block", events_block_timeout=2.0)
+    for i in range(3):
+        assert w.push({"id": i})
+    # The blocked push wakes the worker, whose send frees the queue
+    assert w.push({"id": 3})
+    assert wait_for(lambda: conn.call_count == 1, 1.0)
+    stats = w.get_stats()
+    assert stats["blocked_pushes"] == 1
+    assert stats["dropped_events"] == 0
+    w.shutdown()
+
+
+def test_block_policy_wakes_when_events_expire(base_config):
+    w, conn = full_worker(
+        base_config, "block", events_block_timeout=2.0, events_max_age=0.05
+    )
+    for i in range(3):
+        assert w.push({"id": i})
+    time.sleep(0.1)
+    start = time.monotonic()
+    assert w.push({"id": 3})
+    assert time.monotonic() - start < 1.0
+    assert w.get_stats()["dropped_by_policy"]["expired"] == 3
+    assert conn.call_count == 0
+    w.shutdown()
+
+
+def test_block_policy_wakes_when_the_queue_grows(base_config):
+    w, conn = full_worker(base_config, "block", events_block_timeout=2.0)
+    conn.behaviors = [EventsSendResult(EventsSendStatus.ERROR, "down")] * 10
+    for i in range(3):
+        assert w.push({"id": i})
+
+    def grow():
+        time.sleep(0.1)
+        w.config.events_max_queue_size = 10
+        w.apply_config()
+
+    threading.Thread(target=grow).start()
+    start = time.monotonic()
+    assert w.push({"id": 3})
+    assert time.monotonic() - start < 1.0
+    w._stop_event.set()
+
+
+def test_block_policy_gives_up_after_timeout(base_config):
+    w, conn = full_worker(base_config, "block", events_block_timeout=0.1)
+    conn.behaviors = [EventsSendResult(EventsSendStatus.ERROR, "down")] * 10
+    for i in range(3):
+        assert w.push({"id": i})
+    start = time.monotonic()
+    assert not w.push({"id": 3})
+    assert time.monotonic() - start >= 0.1
+    assert w.get_stats()["dropped_by_policy"]["block"] == 1
+    w._stop_event.set()
+
+
+def test_reservoir_policy_keeps_a_uniform_sample(base_config):
+    w, _ = full_worker(
+        base_config, "reservoir", events_max_queue_size=100, events_batch_size=10_000
+    )
+    kept_late = 0
+    for _ in range(20):
+        for i in range(1000):
+            w.push({"id": i})
+        queued = w._drain(w._lanes["default"])
+        kept_late += sum(1 for e, _, _ in queued if e["id"] >= 500)
+        w._lanes["default"].slots.release(len(queued))
+        w._lanes["default"].byte_budget.release(
+            sum(byte_cost(line) for _, line, _ in queued)
+        )
+    # Half the offered events came late; about half the sample should too
+    assert 800 < kept_late < 1200
+    stats = w.get_stats()
+    assert stats["dropped_by_policy"]["reservoir"] == 20 * 900
+    assert stats["dropped_events"] == 20 * 900
+    w.shutdown()
+
+
+def test_stale_events_and_batches_expire(base_config):
+    cfg = SimpleNamespace(**vars(base_config))
+    cfg.events_batch_size = 100
+    cfg.events_timeout = 0.05
+    cfg.events_max_age = 0.2
+    cfg.events_max_batch_retries = 100
+    conn = DummyConnection(
+        behaviors=[EventsSendResult(EventsSendStatus.ERROR, "down")] * 100
+    )
+    w = EventsWorker(connection=conn, config=cfg)
+    w.push({"id": 1})
+    assert wait_for(lambda: conn.call_count >= 1, 1.0)
+    assert wait_for(lambda: w.get_stats()["dropped_by_policy"]["expired"] == 1, 2.0)
+    assert w.get_stats()["total_events"] == 0
+    assert w.get_stats()["batch_count"] == 0
+    w.shutdown()
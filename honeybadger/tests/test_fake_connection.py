@@ -1,4 +1,4 @@
-from honeybadger.fake_connection import send_notice
+from honeybadger.fake_connection import send_notice, send_events
 from honeybadger.config import Configuration
 from honeybadger.notice import Notice
 
@@ -22,3 +22,12 @@ def test_send_notice_logging(l):
             "Development mode is enabled; this error will be reported if it occurs after you deploy your app.",
         ),
     )
+
+
+@log_capture("honeybadger.fake_connection", attributes=("levelname", "getMessage"))
+def test_send_events_reports_compressed_body_size(l):
+    config = Configuration(api_key="aaa", compression="gzip", compression_threshold=0)
+    send_events(config, [{"event_type": "db.query", "query": "SELECT 1"}] * 50)
+
+    messages = [msg for _, msg in l.actual()]
+    assert any("(Content-Encoding: gzip)" in msg for msg in messages)
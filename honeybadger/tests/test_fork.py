@@ -0,0 +1,141 @@
+import json
+import os
+import signal
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from honeybadger.events_worker import EventsWorker
+from honeybadger.notices_worker import NoticesWorker
+from honeybadger.types import EventsSendResult, EventsSendStatus
+from .utils import events_config
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+
+class FileConnection:
+    """Appends the ids of every event it sends, and the sending pid, to a file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send_events(self, cfg, batch):
+        lines = "".join(
+            json.dumps({"pid": os.getpid(), "id": e["id"]}) + "\n" for e in batch
+        )
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, lines.encode())
+        finally:
+            os.close(fd)
+        return EventsSendResult(EventsSendStatus.OK)
+
+
+def sent(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def fork(child):
+    """Run child() in a forked process and return its exit status."""
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm(10)  # a child stuck on an inherited lock fails the test
+        code = 1
+        try:
+            code = 0 if child() else 2
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def test_events_are_neither_lost_nor_duplicated_across_forks(tmp_path):
+    path = str(tmp_path / "sent.ndjson")
+    cfg = events_config(
+        api_key="key",
+        endpoint="url",
+        environment="env",
+        events_batch_size=1000,
+        events_max_queue_size=1000,
+        events_timeout=60,
+        events_max_batch_retries=3,
+        events_throttle_wait=1,
+    )
+    w = EventsWorker(connection=FileConnection(path), config=cfg)
+    for i in range(10):
+        assert w.push({"id": i})
+
+    # Another thread holds the worker's lock across the forks, as the worker
+    # thread does while it sends.
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with w._lock:
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+
+    def child(first_id):
+        def run():
+            for i in range(first_id, first_id + 10):
+                if not w.push({"id": i}):
+                    return False
+            w.shutdown()
+            return w.get_stats()["total_events"] == 0
+
+        return run
+
+    try:
+        assert fork(child(100)) == 0
+        assert fork(child(200)) == 0
+    finally:
+        release.set()
+        holder.join()
+    w.shutdown()
+
+    records = sent(path)
+    ids = sorted(r["id"] for r in records)
+    assert ids == list(range(10)) + list(range(100, 110)) + list(range(200, 210))
+    parent_ids = sorted(r["id"] for r in records if r["pid"] == os.getpid())
+    assert parent_ids == list(range(10))
+
+
+def test_notices_queued_before_a_fork_stay_with_the_parent():
+    worker = NoticesWorker()
+    gate = threading.Event()
+    sends = []
+
+    def send():
+        gate.wait(5)
+        sends.append(os.getpid())
+        return EventsSendResult(EventsSendStatus.OK)
+
+    cfg = SimpleNamespace(
+        notices_workers=1,
+        notices_max_queue_size=10,
+        notices_drop_policy="newest",
+        notices_max_retries=0,
+        notices_retry_backoff=0.01,
+        notices_throttle_wait=1,
+    )
+    worker.push(cfg, send)  # in flight, waiting on the gate
+    worker.push(cfg, send)  # queued behind it
+
+    def child():
+        stats = worker.get_stats()
+        if stats["queue_size"] or stats["in_flight"]:
+            return False
+        gate.set()
+        worker.push(cfg, send)
+        worker.shutdown(timeout=2)
+        return sends == [os.getpid()]
+
+    assert fork(child) == 0
+    gate.set()
+    worker.shutdown(timeout=2)
+    assert sends == [os.getpid(), os.getpid()]
@@ -0,0 +1,31 @@
+from honeybadger.histogram import Histogram, exponential_bounds
+
+
+def test_exponential_bounds():
+    assert exponential_bounds(1, 2, 5) == [1, 2, 4, 8, 16]
+
+
+def test_reports_percentiles_as_bucket_bounds():
+    h = Histogram([1, 2, 4, 8])
+    for value in [1] * 50 + [3] * 40 + [7] * 9 + [6]:
+        h.record(value)
+
+    stats = h.get_stats()
+    assert stats["count"] == 100
+    assert stats["min"] == 1
+    assert stats["max"] == 7
+    assert stats["mean"] == (50 + 120 + 63 + 6) / 100
+    assert (stats["p50"], stats["p90"], stats["p99"]) == (1, 4, 7)
+
+
+def test_values_past_the_last_bound_report_the_max():
+    h = Histogram([1, 2])
+    h.record(0.5)
+    h.record(250)
+    assert h.get_stats()["p99"] == 250
+
+
+def test_empty():
+    stats = Histogram([1]).get_stats()
+    assert stats["count"] == 0
+    assert stats["p50"] == 0.0
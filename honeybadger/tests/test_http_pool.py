@@ -0,0 +1,116 @@
+import socket
+import time
+from http.server import ThreadingHTTPServer
+from urllib.error import URLError
+
+import pytest
+from six.moves.urllib import request
+
+from honeybadger.http_pool import HTTPConnectionPool, _urllib_open
+from .utils import RecordingHandler, recording_server
+
+
+@pytest.fixture
+def server():
+    with recording_server() as srv:
+        yield srv
+
+
+def _url(srv, path="/v1/events/"):
+    return "http://127.0.0.1:{}{}".format(srv.server_address[1], path)
+
+
+def _post(pool, url, data=b"{}"):
+    req = request.Request(url=url, data=data)
+    req.add_header("Content-Type", "application/json")
+    return pool.urlopen(req, timeout=5)
+
+
+def test_reuses_connection_between_requests(server):
+    pool = HTTPConnectionPool()
+    for _ in range(3):
+        assert _post(pool, _url(server)).getcode() == 201
+
+    client_addresses = {addr for _, addr, _ in server.requests}
+    assert len(server.requests) == 3
+    assert len(client_addresses) == 1
+    assert pool.idle_count() == 1
+    pool.clear()
+
+
+def test_sends_path_and_body(server):
+    pool = HTTPConnectionPool()
+    _post(pool, _url(server, "/v1/notices/?a=1"), data=b'{"x": 1}')
+    assert server.requests[0][0] == "/v1/notices/?a=1"
+    assert server.requests[0][2] == b'{"x": 1}'
+    pool.clear()
+
+
+def test_returns_error_status_instead_of_raising(server):
+    server.status = 429
+    pool = HTTPConnectionPool()
+    assert _post(pool, _url(server)).getcode() == 429
+    pool.clear()
+
+
+def test_does_not_pool_connection_closed_by_server(server):
+    server.close_after_response = True
+    pool = HTTPConnectionPool()
+    _post(pool, _url(server))
+    assert pool.idle_count() == 0
+
+
+def test_reconnects_when_pooled_connection_is_stale(server):
+    server.silently_close = True
+    pool = HTTPConnectionPool()
+    _post(pool, _url(server))
+    assert pool.idle_count() == 1
+
+    assert _post(pool, _url(server)).getcode() == 201
+    assert len(server.requests) == 2
+    pool.clear()
+
+
+def test_warm_parks_a_connection(server):
+    pool = HTTPConnectionPool()
+    pool.warm(_url(server), timeout=5)
+    assert pool.idle_count() == 1
+    _post(pool, _url(server))
+    assert pool.idle_count() == 1
+    pool.clear()
+
+
+def test_raises_url_error_when_unreachable():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    url = _url(srv)
+    srv.server_close()
+    with pytest.raises(URLError):
+        _post(HTTPConnectionPool(), url)
+
+
+def test_read_timeout_raises_url_error():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)  # accepts the connection but never answers
+    url = "http://127.0.0.1:{}/v1/events/".format(listener.getsockname()[1])
+    try:
+        start = time.monotonic()
+        with pytest.raises(URLError):
+            HTTPConnectionPool().urlopen(
+                request.Request(url, data=b"{}"), timeout=0.2, connect_timeout=5.0
+            )
+        assert time.monotonic() - start < 2.0
+    finally:
+        listener.close()
+
+
+def test_proxied_read_timeout_raises_url_error():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    url = "http://127.0.0.1:{}/v1/events/".format(listener.getsockname()[1])
+    try:
+        with pytest.raises(URLError):
+            _urllib_open(request.Request(url, data=b"{}"), timeout=0.2)
+    finally:
+        listener.close()
@@ -0,0 +1,271 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from honeybadger.notices_worker import NoticesWorker
+from honeybadger.scheduler import DeliveryScheduler
+from honeybadger.types import EventsSendResult, EventsSendStatus
+
+OK = EventsSendResult(EventsSendStatus.OK)
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(
+        notices_workers=2,
+        notices_max_queue_size=5,
+        notices_drop_policy="newest",
+        notices_max_retries=2,
+        notices_retry_backoff=0.01,
+        notices_throttle_wait=0.1,
+    )
+
+
+def record(sent, value):
+    def send():
+        sent.append(value)
+        return OK
+
+    return send
+
+
+def blocker(release):
+    def send():
+        release.wait()
+        return OK
+
+    return send
+
+
+def scripted(results, calls):
+    """A send that returns each of results in turn, then OK forever."""
+
+    def send():
+        calls.append(time.monotonic())
+        return results[len(calls) - 1] if len(calls) <= len(results) else OK
+
+    return send
+
+
+@pytest.fixture
+def worker():
+    w = NoticesWorker()
+    yield w
+    w.shutdown(timeout=1.0)
+
+
+def wait_for(predicate, timeout):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_delivers_queued_notices(worker, config):
+    sent = []
+    for i in range(3):
+        assert worker.push(config, record(sent, i))
+    assert wait_for(lambda: len(sent) == 3, 1.0)
+    assert sorted(sent) == [0, 1, 2]
+    assert worker.get_stats()["sent_notices"] == 3
+
+
+def test_thread_count_stays_flat_under_load(worker, config):
+    config.notices_max_queue_size = 1000
+    release = threading.Event()
+    before = threading.active_count()
+    for _ in range(500):
+        worker.push(config, blocker(release))
+
+    assert threading.active_count() - before == 2
+    assert worker.get_stats()["workers"] == 2
+    release.set()
+
+
+def test_drops_newest_when_full(worker, config):
+    release = threading.Event()
+    sent = []
+    for _ in range(2):  # occupy both workers
+        worker.push(config, blocker(release))
+    assert wait_for(lambda: worker.get_stats()["in_flight"] == 2, 1.0)
+
+    results = [worker.push(config, record(sent, i)) for i in range(7)]
+    assert results == [True] * 5 + [False] * 2
+    release.set()
+
+    assert wait_for(lambda: len(sent) == 5, 1.0)
+    assert sent == [0, 1, 2, 3, 4]
+    stats = worker.get_stats()
+    assert stats["dropped_notices"] == 2
+    assert stats["dropped_by_policy"] == {"newest": 2, "oldest": 0}
+
+
+def test_drops_oldest_when_configured(worker, config):
+    config.notices_drop_policy = "oldest"
+    release = threading.Event()
+    sent = []
+    for _ in range(2):
+        worker.push(config, blocker(release))
+    assert wait_for(lambda: worker.get_stats()["in_flight"] == 2, 1.0)
+
+    results = [worker.push(config, record(sent, i)) for i in range(7)]
+    assert results == [True] * 7
+    release.set()
+
+    assert wait_for(lambda: len(sent) == 5, 1.0)
+    assert sent == [2, 3, 4, 5, 6]
+    assert worker.get_stats()["dropped_by_policy"] == {"newest": 0, "oldest": 2}
+
+
+def test_failed_send_does_not_kill_worker(worker, config):
+    config.notices_workers = 1
+    sent = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    worker.push(config, boom)
+    worker.push(config, record(sent, 1))
+    assert wait_for(lambda: worker.get_stats()["failed_notices"] == 1, 1.0)
+    assert sent == [1]
+
+
+def test_shutdown_drains_queue_and_stops_threads(config):
+    w = NoticesWorker()
+    sent = []
+    for i in range(5):
+        w.push(config, record(sent, i))
+    threads = list(w._threads)
+    w.shutdown(timeout=1.0)
+    assert sorted(sent) == [0, 1, 2, 3, 4]
+    assert w.get_stats()["workers"] == 0
+    assert not any(t.is_alive() for t in threads)
+
+
+def test_flush_waits_for_queue_and_keeps_threads(worker, config):
+    release = threading.Event()
+    worker.push(config, blocker(release))
+    assert worker.flush(0.1) == {"sent_notices": 0, "pending_notices": 1}
+
+    release.set()
+    sent = []
+    worker.push(config, record(sent, 1))
+    assert worker.flush(1.0) == {"sent_notices": 2, "pending_notices": 0}
+    assert sent == [1]
+    assert worker.get_stats()["workers"] == 2
+
+
+def test_push_after_shutdown_restarts_threads(config):
+    w = NoticesWorker()
+    w.shutdown()
+    sent = []
+    w.push(config, record(sent, 1))
+    assert wait_for(lambda: sent == [1], 1.0)
+    w.shutdown()
+
+
+def test_retries_failed_send_with_backoff(worker, config):
+    calls = []
+    error = EventsSendResult(EventsSendStatus.ERROR, "got HTTP 503")
+    worker.push(config, scripted([error, error], calls))
+
+    assert wait_for(lambda: worker.get_stats()["sent_notices"] == 1, 1.0)
+    assert len(calls) == 3
+    assert calls[2] - calls[1] >= calls[1] - calls[0]  # backoff grows
+    stats = worker.get_stats()
+    assert stats["retried_notices"] == 2
+    assert stats["failed_notices"] == 0
+
+
+def test_gives_up_after_max_retries(worker, config):
+    calls = []
+    error = EventsSendResult(EventsSendStatus.ERROR, "timed out")
+    worker.push(config, scripted([error] * 10, calls))
+
+    assert wait_for(lambda: worker.get_stats()["failed_notices"] == 1, 1.0)
+    assert len(calls) == config.notices_max_retries + 1
+    assert worker.get_stats()["retry_queue_size"] == 0
+
+
+def test_rejected_notice_is_not_retried(worker, config):
+    calls = []
+    rejected = EventsSendResult(EventsSendStatus.REJECTED, "got HTTP 422")
+    worker.push(config, scripted([rejected], calls))
+
+    assert wait_for(lambda: worker.get_stats()["rejected_notices"] == 1, 1.0)
+    time.sleep(0.05)
+    assert len(calls) == 1
+    assert worker.get_stats()["retried_notices"] == 0
+
+
+def test_throttling_pauses_all_senders(worker, config):
+    calls = []
+    sent = []
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING)
+    worker.push(config, scripted([throttled], calls))
+    assert wait_for(lambda: worker.get_stats()["throttling"], 1.0)
+
+    worker.push(config, record(sent, "other"))
+    time.sleep(config.notices_throttle_wait / 2)
+    assert sent == []
+
+    assert wait_for(lambda: sent == ["other"] and len(calls) == 2, 1.0)
+    assert calls[1] - calls[0] >= config.notices_throttle_wait
+    assert not worker.get_stats()["throttling"]
+
+
+def test_open_circuit_pauses_without_using_a_retry(worker, config):
+    calls = []
+    circuit_open = EventsSendResult(
+        EventsSendStatus.CIRCUIT_OPEN, "circuit breaker open", retry_after=0.1
+    )
+    worker.push(config, scripted([circuit_open] * 5, calls))
+
+    assert wait_for(lambda: len(calls) == 6, 2.0)
+    assert wait_for(lambda: worker.get_stats()["sent_notices"] == 1, 1.0)
+    stats = worker.get_stats()
+    assert stats["retried_notices"] == 0
+    assert stats["failed_notices"] == 0
+    assert calls[1] - calls[0] >= 0.1
+
+
+def test_shutdown_does_not_wait_out_a_pause(config):
+    w = NoticesWorker()
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING)
+    config.notices_throttle_wait = 30.0
+    w.push(config, scripted([throttled], []))
+    assert wait_for(lambda: w.get_stats()["throttling"], 1.0)
+
+    start = time.monotonic()
+    w.shutdown(timeout=5.0)
+    assert time.monotonic() - start < 1.0
+
+
+def test_throttling_honors_retry_after(config):
+    w = NoticesWorker(scheduler=DeliveryScheduler())
+    config.notices_throttle_wait = 30.0
+    calls = []
+    throttled = EventsSendResult(EventsSendStatus.THROTTLING, retry_after=0.1)
+    w.push(config, scripted([throttled], calls))
+
+    assert wait_for(lambda: w.get_stats()["sent_notices"] == 1, 1.0)
+    assert 0.1 <= calls[1] - calls[0] < 1.0
+    w.shutdown(timeout=1.0)
+
+
+def test_sends_are_paced_by_scheduler(config):
+    w = NoticesWorker(scheduler=DeliveryScheduler())
+    config.delivery_rate = 20.0
+    config.delivery_burst = 1
+    sent = []
+    for i in range(3):
+        w.push(config, record(sent, i))
+
+    start = time.monotonic()
+    assert wait_for(lambda: len(sent) == 3, 1.0)
+    assert time.monotonic() - start >= 0.09
+    w.shutdown(timeout=1.0)
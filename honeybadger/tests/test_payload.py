@@ -1,6 +1,7 @@
 from six.moves import range
 from six.moves import zip
 from contextlib import contextmanager
+import json
 import os
 import sys
 
@@ -8,6 +9,7 @@ from honeybadger.payload import (
     create_payload,
     error_payload,
     server_payload,
+    truncate_payload,
     MAX_CAUSE_DEPTH,
 )
 from honeybadger.config import Configuration
@@ -324,3 +326,76 @@ def test_create_payload_falls_back_to_exception_traceback():
     backtrace = payload["error"]["backtrace"]
     assert len(backtrace) > 0
     assert any("test_payload" in frame["file"] for frame in backtrace)
+
+
+def _big_payload(frames=5, causes=0):
+    frame = {"number": 1, "file": "app.py", "method": "run", "source": {1: "x" * 80}}
+    return {
+        "notifier": {"name": "Honeybadger for Python"},
+        "error": {
+            "class": "ValueError",
+            "message": "boom",
+            "backtrace": [dict(frame) for _ in range(frames)],
+            "causes": [
+                {"class": "KeyError", "message": "k", "backtrace": [dict(frame)]}
+                for _ in range(causes)
+            ],
+        },
+        "request": {"context": {}, "params": {}},
+    }
+
+
+def test_truncate_payload_leaves_small_payloads_alone():
+    payload = _big_payload()
+    truncated, body = truncate_payload(payload, 1024 * 1024)
+    assert truncated is payload
+    assert json.loads(body)["error"]["message"] == "boom"
+
+
+def test_truncate_payload_trims_long_strings_first():
+    payload = _big_payload()
+    payload["request"]["params"]["blob"] = "a" * 100_000
+
+    truncated, body = truncate_payload(payload, 20_000)
+
+    assert len(body) <= 20_000
+    blob = truncated["request"]["params"]["blob"]
+    assert blob.startswith("a" * 4096)
+    assert blob.endswith("...[truncated 95904 chars]")
+    assert truncated["notifier"]["truncated"] == ["strings"]
+    assert truncated["error"]["backtrace"][0]["source"]  # kept
+    assert len(payload["request"]["params"]["blob"]) == 100_000  # not modified
+
+
+def test_truncate_payload_trims_large_collections():
+    payload = _big_payload()
+    payload["request"]["context"] = {"k{}".format(i): i for i in range(5000)}
+
+    truncated, body = truncate_payload(payload, 10_000)
+
+    assert len(body) <= 10_000
+    context = truncated["request"]["context"]
+    assert len(context) == 101
+    assert context["[truncated]"] == "4900 more keys"
+    assert truncated["notifier"]["truncated"] == ["strings", "collections"]
+
+
+def test_truncate_payload_drops_source_then_frames():
+    payload = _big_payload(frames=500, causes=15)
+
+    truncated, body = truncate_payload(payload, 12_000)
+
+    assert len(body) <= 12_000
+    assert "source" in truncated["notifier"]["truncated"]
+    assert "frames" in truncated["notifier"]["truncated"]
+    backtrace = truncated["error"]["backtrace"]
+    assert all(frame["source"] == {} for frame in backtrace)
+    assert backtrace[-1]["file"] == "[TRUNCATED]"
+    assert backtrace[-1]["method"].endswith("more frames")
+    assert truncated["error"]["causes"][-1]["class"] == "HoneybadgerWarning"
+
+
+def test_truncate_payload_disabled():
+    payload = _big_payload(frames=500)
+    truncated, _ = truncate_payload(payload, 0)
+    assert truncated is payload
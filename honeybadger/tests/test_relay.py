@@ -0,0 +1,109 @@
+import os
+import socket
+import time
+
+import pytest
+
+from honeybadger import relay_connection
+from honeybadger.config import Configuration
+from honeybadger.core import Honeybadger
+from honeybadger.notice import Notice
+from honeybadger.relay import Relay
+from honeybadger.testing import FakeAPIServer
+from honeybadger.types import EventsSendStatus
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets"
+)
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def server():
+    with FakeAPIServer() as server:
+        yield server
+
+
+@pytest.fixture
+def relay(tmp_path, server):
+    config = Configuration(api_key="abc", endpoint=server.url, events_timeout=0.1)
+    with Relay(str(tmp_path / "relay.sock"), config) as relay:
+        yield relay
+
+
+@pytest.fixture
+def client_config(relay):
+    yield Configuration(api_key="abc", relay_socket=relay.path)
+    relay_connection._close()
+
+
+def test_merges_events_from_clients(relay, client_config, server):
+    for i in range(3):
+        result = relay_connection.send_events(client_config, [{"n": i}])
+        assert result.status == EventsSendStatus.OK
+        relay_connection._close()  # as if from another process
+
+    assert wait_for(lambda: len(server.events) == 3)
+    assert server.stats()["requests"] == 1
+    assert relay.get_stats()["events"] == 3
+
+
+def test_forwards_notices(relay, client_config, server):
+    notice = Notice(error_class="Error", error_message="relayed", config=client_config)
+    notice_id = relay_connection.send_notice(client_config, notice)
+
+    assert wait_for(lambda: len(server.notices) == 1)
+    assert server.notices[0]["error"]["token"] == notice_id
+    assert server.notices[0]["error"]["message"] == "relayed"
+
+
+def test_events_fail_when_relay_is_down(tmp_path):
+    config = Configuration(relay_socket=str(tmp_path / "missing.sock"))
+    result = relay_connection.send_events(config, [{"n": 1}])
+    assert result.status == EventsSendStatus.ERROR
+
+
+def test_reconnects_after_relay_restart(tmp_path, server, client_config, relay):
+    assert relay_connection.send_events(client_config, [{"n": 1}]).status == (
+        EventsSendStatus.OK
+    )
+    relay.stop()
+    config = Configuration(api_key="abc", endpoint=server.url, events_timeout=0.1)
+    with Relay(relay.path, config):
+        result = relay_connection.send_events(client_config, [{"n": 2}])
+        assert result.status == EventsSendStatus.OK
+        assert wait_for(lambda: len(server.events) == 2)
+
+
+def test_refuses_to_replace_a_live_socket(relay):
+    with pytest.raises(RuntimeError):
+        Relay(relay.path, relay.config).start()
+
+
+def test_replaces_stale_socket(tmp_path, server):
+    path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    assert os.path.exists(path)
+
+    config = Configuration(api_key="abc", endpoint=server.url)
+    with Relay(path, config) as relay:
+        assert relay.get_stats()["clients"] == 0
+
+
+def test_honeybadger_uses_relay_when_configured(client_config):
+    hb = Honeybadger()
+    hb.configure(
+        api_key="abc", relay_socket=client_config.relay_socket, force_report_data=True
+    )
+    assert hb.events_worker.connection is relay_connection
+    hb.events_worker.shutdown()
@@ -0,0 +1,86 @@
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from honeybadger.scheduler import (
+    EVENTS,
+    NOTICE,
+    DeliveryScheduler,
+    backoff,
+    parse_retry_after,
+)
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(delivery_rate=20.0, delivery_burst=2)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("-5") == 0.0
+    assert 25 < parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_grows_with_jitter():
+    for attempt, full in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 10.0)]:
+        delays = {backoff(attempt, 1.0, 10.0) for _ in range(20)}
+        assert all(full / 2 <= d <= full for d in delays)
+        assert len(delays) > 1
+
+
+def test_token_bucket_paces_after_burst(config):
+    scheduler = DeliveryScheduler()
+    assert scheduler.reserve(config, EVENTS) == 0
+    assert scheduler.reserve(config, EVENTS) == 0
+    wait = scheduler.reserve(config, EVENTS)
+    assert 0 < wait <= 1 / config.delivery_rate
+
+    time.sleep(wait)
+    assert scheduler.reserve(config, EVENTS) == 0
+
+
+def test_no_pacing_without_a_rate(config):
+    config.delivery_rate = 0
+    scheduler = DeliveryScheduler()
+    assert all(scheduler.reserve(config, EVENTS) == 0 for _ in range(100))
+
+
+def test_notices_have_priority(config):
+    config.delivery_burst = 1
+    scheduler = DeliveryScheduler()
+    assert scheduler.reserve(config, EVENTS) == 0
+    wait = scheduler.reserve(config, NOTICE)
+    assert wait > 0
+
+    time.sleep(wait)
+    # The token that came back is the notice's, not the next batch's.
+    assert scheduler.reserve(config, EVENTS) > 0
+    assert scheduler.reserve(config, NOTICE) == 0
+    time.sleep(1 / config.delivery_rate)
+    assert scheduler.reserve(config, EVENTS) == 0
+
+
+def test_throttle_honors_retry_after(config):
+    scheduler = DeliveryScheduler()
+    wait = scheduler.throttled(2.0, cap=60.0)
+    assert 2.0 <= wait <= 2.2
+    assert scheduler.reserve(config, NOTICE) > 1.9
+    assert scheduler.reserve(config, EVENTS) > 1.9
+
+
+def test_throttle_backs_off_without_retry_after():
+    scheduler = DeliveryScheduler()
+    first = scheduler.throttled(None, cap=60.0)
+    second = scheduler.throttled(None, cap=60.0)
+    assert 2.5 <= first <= 5.0
+    assert 5.0 <= second <= 10.0
+    assert scheduler.get_stats()["consecutive_throttles"] == 2
+
+    scheduler.delivered()
+    assert scheduler.throttled(None, cap=60.0) <= 5.0
+    assert scheduler.throttled(None, cap=1.0) <= 1.0
@@ -0,0 +1,59 @@
+import datetime
+import json
+from dataclasses import dataclass
+
+import pytest
+
+from honeybadger import serializer
+from honeybadger.utils import StringReprJSONEncoder
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+class Unreprable:
+    def __repr__(self):
+        raise RuntimeError("nope")
+
+
+@pytest.fixture(params=serializer.available_backends())
+def backend(request):
+    previous = serializer.backend
+    serializer.use(request.param)
+    yield request.param
+    serializer.use(previous)
+
+
+def test_auto_prefers_installed_fast_backend():
+    assert serializer.backend == serializer.available_backends()[0]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        serializer.use("marshal")
+
+
+def test_matches_stdlib_encoder(backend):
+    payload = {
+        "message": "café / bar",
+        "when": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "point": Point(1, 2),
+        "items": (1, 2.5, None, True),
+        "nested": {"set": {1}, 1: "int key"},
+        "object": object,
+    }
+    expected = json.loads(json.dumps(payload, cls=StringReprJSONEncoder))
+    assert json.loads(serializer.dumps(payload)) == expected
+
+
+def test_unreprable_values(backend):
+    assert json.loads(serializer.dumps({"x": Unreprable()})) == {
+        "x": "[unserializable]"
+    }
+
+
+def test_falls_back_to_stdlib_for_huge_ints(backend):
+    assert json.loads(serializer.dumps({"n": 2**70})) == {"n": 2**70}
@@ -0,0 +1,173 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from honeybadger import connection, fake_connection
+from honeybadger.core import Honeybadger
+from honeybadger.events_worker import EventBatch
+from honeybadger.sinks import (
+    FileSink,
+    NDJSONSink,
+    StdoutSink,
+    resolve,
+    worker_config,
+)
+from honeybadger.types import EventsSendStatus
+
+
+def wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def lines(data):
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def test_file_sink_writes_ndjson(tmp_path):
+    sink = FileSink(str(tmp_path / "events.ndjson"))
+    batch = EventBatch()
+    batch.add({"n": 1})
+    batch.add({"n": 2})
+    assert sink.send_events(None, batch).status == EventsSendStatus.OK
+    assert sink.send_events(None, [{"n": 3}]).status == EventsSendStatus.OK
+    sink.close()
+
+    assert lines((tmp_path / "events.ndjson").read_bytes()) == [
+        {"n": 1},
+        {"n": 2},
+        {"n": 3},
+    ]
+    assert sink.get_stats()["events"] == 3
+
+
+def test_file_sink_rotates(tmp_path):
+    path = tmp_path / "events-{pid}.ndjson"
+    sink = FileSink(str(path), max_bytes=20, backups=2)
+    for i in range(4):
+        sink.send_events(None, [{"n": i, "pad": "xxxx"}])
+    sink.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 3
+    assert all(name.startswith("events-") for name in files)
+    assert sink.get_stats()["rotations"] == 3
+
+
+def test_stdout_sink():
+    stream = io.BytesIO()
+    sink = StdoutSink(stream)
+    sink.send_events(None, [{"n": 1}])
+    assert lines(stream.getvalue()) == [{"n": 1}]
+
+
+def test_ndjson_sink_needs_a_write_method():
+    class Incomplete(NDJSONSink):
+        pass
+
+    with pytest.raises(TypeError):
+        # pylint: disable-next=abstract-class-instantiated
+        Incomplete()
+
+
+def test_resolve():
+    assert resolve("honeybadger", connection) is connection
+    assert isinstance(resolve("stdout", connection), StdoutSink)
+    file_sink = resolve("file:/tmp/hb.ndjson", connection)
+    assert isinstance(file_sink, FileSink)
+    assert file_sink.path == "/tmp/hb.ndjson"
+    sink = StdoutSink()
+    assert resolve(sink, connection) is sink
+    with pytest.raises(ValueError):
+        resolve("kafka", connection)
+
+
+def test_worker_config_overrides():
+    class Config:
+        events_batch_size = 1000
+        events_timeout = 5.0
+        spool_dir = "/var/spool/hb"
+
+    sink = StdoutSink()
+    sink.batch_size = 10
+    config = worker_config(Config(), sink)
+    assert config.events_batch_size == 10
+    assert config.events_timeout == 5.0
+    assert config.spool_dir == ""
+    assert worker_config(Config, connection) is Config
+
+
+def test_fans_out_to_every_sink():
+    first, second = io.BytesIO(), io.BytesIO()
+    sink_list = [StdoutSink(first), StdoutSink(second)]
+    for sink in sink_list:
+        sink.batch_size = 1
+    hb = Honeybadger()
+    hb.configure(api_key="abc", environment="production", sinks=sink_list)
+    try:
+        assert hb.event("order.created", {"id": 1}) is True
+        notice_id = hb.notify(error_class="Error", error_message="fan out")
+        assert wait_for(
+            lambda: all(len(lines(s.getvalue())) == 2 for s in (first, second))
+        )
+
+        for stream in (first, second):
+            notice, event = sorted(
+                lines(stream.getvalue()), key=lambda line: "error" not in line
+            )
+            assert notice["error"]["token"] == notice_id
+            assert event["event_type"] == "order.created"
+
+        stats = hb.get_sink_stats()
+        assert [s["name"] for s in stats] == ["stdout", "stdout"]
+        assert all(s["events"] == 1 and s["notices"] == 1 for s in stats)
+    finally:
+        hb.shutdown()
+
+
+def test_honeybadger_sink_is_the_default_connection():
+    hb = Honeybadger()
+    hb.configure(environment="development", sinks=["honeybadger", "stdout"])
+    try:
+        assert hb.events_worker.connection is fake_connection
+        assert [s["name"] for s in hb.get_sink_stats()] == ["honeybadger", "stdout"]
+
+        hb.configure(sinks=[])
+        assert hb._sink_workers == []
+    finally:
+        hb.shutdown()
+
+
+def test_removing_a_sink_does_not_wait_for_its_worker():
+    writing, release = threading.Event(), threading.Event()
+
+    class StuckSink(StdoutSink):
+        batch_size = 1
+
+        def _write_locked(self, data):
+            writing.set()
+            release.wait(5)
+
+    kept, stuck = StdoutSink(io.BytesIO()), StuckSink(io.BytesIO())
+    hb = Honeybadger()
+    hb.configure(
+        api_key="abc", environment="production", shutdown_timeout=5, sinks=[kept, stuck]
+    )
+    try:
+        hb.event("order.created", {"id": 1})
+        assert writing.wait(2)
+
+        began = time.monotonic()
+        hb.configure(sinks=[kept])
+        assert time.monotonic() - began < 1
+        assert len(hb._sink_workers) == 0
+    finally:
+        release.set()
+        hb.shutdown()
@@ -0,0 +1,291 @@
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from honeybadger import cli, connection
+from honeybadger.config import Configuration
+from honeybadger.events_worker import EventsWorker
+from honeybadger.notices_worker import NoticesWorker
+from honeybadger.spool import (
+    EVENTS,
+    NOTICE,
+    Spool,
+    get_spool,
+    list_segments,
+    read_segment,
+    segment_in_use,
+)
+from honeybadger.types import EventsSendResult, EventsSendStatus
+from honeybadger.utils import encode_events
+
+from .test_events_worker import DummyConnection, wait_for
+from .utils import events_config
+
+
+def records(directory):
+    return [r for path in list_segments(directory) for r in read_segment(path)]
+
+
+def test_append_and_read_back(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append(EVENTS, b'{"a":1}')
+    spool.append(NOTICE, b'{"error":{}}')
+
+    assert records(str(tmp_path)) == [(EVENTS, b'{"a":1}'), (NOTICE, b'{"error":{}}')]
+    assert spool.get_stats()["appended_records"] == 2
+
+
+def test_segment_deleted_once_rotated_and_acked(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=32)
+    first = spool.append(EVENTS, b"x" * 20)
+    second = spool.append(EVENTS, b"y" * 20)  # rotates
+
+    assert first != second
+    assert len(list_segments(str(tmp_path))) == 2
+
+    spool.ack(first)
+    assert list_segments(str(tmp_path)) == [second]
+
+    # the active segment is emptied rather than deleted
+    spool.ack(second)
+    assert list_segments(str(tmp_path)) == [second]
+    assert os.path.getsize(second) == 0
+
+    spool.close()
+    assert list_segments(str(tmp_path)) == []
+
+
+def test_oldest_segment_evicted_over_max_bytes(tmp_path):
+    spool = Spool(str(tmp_path), max_bytes=64, segment_bytes=32)
+    for i in range(4):
+        spool.append(EVENTS, str(i).encode() * 20)
+
+    assert sum(os.path.getsize(p) for p in list_segments(str(tmp_path))) <= 64
+    assert [body[:1] for _, body in records(str(tmp_path))] == [b"2", b"3"]
+    assert spool.get_stats()["evicted_records"] == 2
+
+
+def test_torn_and_corrupt_records_are_skipped(tmp_path):
+    spool = Spool(str(tmp_path))
+    record_id = spool.append(EVENTS, b"good")
+    spool.close()
+
+    with open(record_id, "ab") as f:
+        f.write(b"E\x10\x00\x00\x00")  # header with no body
+    assert records(str(tmp_path)) == [(EVENTS, b"good")]
+
+    with open(record_id, "r+b") as f:
+        f.seek(9)
+        f.write(b"bad!")
+    assert records(str(tmp_path)) == []
+
+
+def test_claim_orphans_skips_segments_owned_by_a_live_spool(tmp_path):
+    live = Spool(str(tmp_path))
+    live.append(EVENTS, b"live")
+
+    crashed = Spool(str(tmp_path))
+    orphan = crashed.append(EVENTS, b"orphan")
+    crashed.close()  # what exiting does to its locks
+
+    spool = Spool(str(tmp_path))
+    assert spool.claim_orphans() == [orphan]
+    assert segment_in_use(orphan)
+
+    spool.release(orphan)
+    assert not os.path.exists(orphan)
+    assert records(str(tmp_path)) == [(EVENTS, b"live")]
+
+
+def test_get_spool_is_shared_per_directory(tmp_path):
+    config = SimpleNamespace(
+        spool_dir=str(tmp_path), spool_max_bytes=1024, spool_segment_bytes=256
+    )
+    assert get_spool(config) is get_spool(config)
+    assert get_spool(SimpleNamespace(spool_dir="")) is None
+
+
+@pytest.fixture
+def spool_config(tmp_path):
+    return events_config(
+        api_key="key",
+        endpoint="url",
+        environment="env",
+        events_batch_size=3,
+        events_max_queue_size=10,
+        events_timeout=0.1,
+        events_max_batch_retries=2,
+        events_throttle_wait=0.1,
+        spool_dir=str(tmp_path),
+        spool_max_bytes=1024 * 1024,
+        spool_segment_bytes=64,
+        spool_replay_rate=1000.0,
+    )
+
+
+def test_worker_leaves_undelivered_batches_in_spool(spool_config):
+    error = EventsSendResult(EventsSendStatus.ERROR, "down")
+    conn = DummyConnection(behaviors=[EventsSendResult(EventsSendStatus.OK)])
+    conn.behaviors += [error] * 10
+    w = EventsWorker(conn, spool_config)
+    try:
+        for i in range(3):
+            w.push({"id": i})
+        assert wait_for(lambda: conn.call_count == 1, 1.0)
+        for i in range(3, 6):
+            w.push({"id": i})
+        assert wait_for(lambda: conn.call_count == 3, 2.0)
+    finally:
+        w.shutdown()
+
+    bodies = [body for _, body in records(spool_config.spool_dir)]
+    assert bodies == [encode_events([{"id": 3}, {"id": 4}, {"id": 5}])]
+
+
+def test_worker_replays_orphaned_segments(spool_config):
+    crashed = Spool(spool_config.spool_dir)
+    crashed.append(EVENTS, encode_events([{"id": 1}, {"id": 2}]))
+    crashed.append(NOTICE, b'{"error":{}}')
+    crashed.close()
+
+    conn = DummyConnection()
+    notices = []
+    conn.send_notice_body = lambda config, body: notices.append(body)
+    w = EventsWorker(conn, spool_config)
+    w.start()  # replays without waiting for a push
+    try:
+        assert wait_for(lambda: conn.batches and notices, 2.0)
+        assert conn.batches == [[{"id": 1}, {"id": 2}]]
+        assert notices == [b'{"error":{}}']
+        assert wait_for(lambda: not w.get_stats()["replay_pending"], 1.0)
+    finally:
+        w.shutdown()
+
+    assert records(spool_config.spool_dir) == []
+
+
+def test_replay_keeps_notices_the_connection_cannot_send(spool_config, caplog):
+    crashed = Spool(spool_config.spool_dir)
+    crashed.append(EVENTS, encode_events([{"id": 1}]))
+    crashed.append(NOTICE, b'{"error":{}}')
+    crashed.close()
+
+    conn = DummyConnection()  # no send_notice_body, like the relay
+    w = EventsWorker(conn, spool_config)
+    w.start()
+    try:
+        assert wait_for(lambda: conn.batches, 2.0)
+        assert wait_for(lambda: not w.get_stats()["replay_pending"], 1.0)
+    finally:
+        w.shutdown()
+
+    # The live segment keeps it, so the next process replays it in turn
+    assert (NOTICE, b'{"error":{}}') in records(spool_config.spool_dir)
+    assert "Kept 1 spooled notice(s)" in caplog.text
+
+
+def test_replay_is_rate_limited(spool_config):
+    spool_config.spool_replay_rate = 5.0
+    crashed = Spool(spool_config.spool_dir)
+    for i in range(20):
+        crashed.append(EVENTS, encode_events([{"id": i}]))
+    crashed.close()
+
+    conn = DummyConnection()
+    w = EventsWorker(conn, spool_config)
+    w.start()  # replays without waiting for a push
+    try:
+        time.sleep(0.5)
+        assert 1 <= len(conn.batches) <= 8
+    finally:
+        w.shutdown()
+
+
+def test_cli_inspect(tmp_path, capsys):
+    spool = Spool(str(tmp_path))
+    spool.append(EVENTS, b"{}")
+    spool.append(NOTICE, b"{}")
+
+    assert cli.main(["spool", "inspect", str(tmp_path)]) == 0
+
+    out = capsys.readouterr().out
+    assert "1 event batches, 1 notices  (in use)" in out
+    assert "total: 1 segments" in out
+
+
+def test_cli_upload(tmp_path, capsys):
+    crashed = Spool(str(tmp_path))
+    crashed.append(EVENTS, encode_events([{"id": 1}]))
+    crashed.append(NOTICE, b'{"error":{}}')
+    crashed.close()
+
+    ok = EventsSendResult(EventsSendStatus.OK)
+    with patch("honeybadger.connection.send_events", return_value=ok) as events, patch(
+        "honeybadger.connection._send_notice_request", return_value=ok
+    ) as notices:
+        assert cli.main(["spool", "upload", str(tmp_path), "--api-key", "k"]) == 0
+
+    assert events.call_args[0][1] == [{"id": 1}]
+    assert notices.call_args[0][1].data == b'{"error":{}}'
+    assert list_segments(str(tmp_path)) == []
+    assert "uploaded 2 records" in capsys.readouterr().out
+
+
+def test_cli_upload_keeps_segment_on_failure(tmp_path):
+    crashed = Spool(str(tmp_path))
+    crashed.append(EVENTS, encode_events([{"id": 1}]))
+    crashed.close()
+
+    error = EventsSendResult(EventsSendStatus.ERROR, "down")
+    with patch("honeybadger.connection.send_events", return_value=error):
+        assert cli.main(["spool", "upload", str(tmp_path), "--api-key", "k"]) == 1
+
+    assert len(list_segments(str(tmp_path))) == 1
+
+
+def test_notice_stays_spooled_until_delivered(tmp_path, monkeypatch):
+    config = Configuration(
+        api_key="key", spool_dir=str(tmp_path), notices_max_retries=0
+    )
+    error = EventsSendResult(EventsSendStatus.ERROR, "down")
+    ok = EventsSendResult(EventsSendStatus.OK)
+
+    # A worker of its own, not stuck behind notices other tests left queued
+    worker = NoticesWorker()
+    monkeypatch.setattr(connection, "notices_worker", worker)
+    with patch("honeybadger.connection._send_notice_request", return_value=error):
+        connection.send_notice_body(config, b'{"error":{"token":"1"}}')
+        assert wait_for(lambda: worker.get_stats()["failed_notices"] == 1, 1.0)
+    assert records(str(tmp_path)) == [(NOTICE, b'{"error":{"token":"1"}}')]
+
+    spool = get_spool(config)
+    with patch("honeybadger.connection._send_notice_request", return_value=ok):
+        connection.send_notice_body(config, b'{"error":{"token":"2"}}')
+        assert wait_for(lambda: spool.get_stats()["acked_records"] == 1, 1.0)
+    worker.shutdown()
+
+
+@pytest.mark.parametrize("policy", ["newest", "oldest"])
+def test_notice_dropped_by_a_full_queue_is_not_left_spooled(
+    tmp_path, monkeypatch, policy
+):
+    config = Configuration(
+        api_key="key",
+        spool_dir=str(tmp_path),
+        notices_max_queue_size=1,
+        notices_drop_policy=policy,
+    )
+    worker = NoticesWorker()
+    worker._paused_until = time.monotonic() + 60  # hold notices in the queue
+    monkeypatch.setattr(connection, "notices_worker", worker)
+
+    connection.send_notice_body(config, b'{"error":{"token":"1"}}')
+    connection.send_notice_body(config, b'{"error":{"token":"2"}}')
+
+    spool = get_spool(config)
+    assert spool.get_stats()["acked_records"] == 1
+    assert worker.get_stats()["dropped_by_policy"][policy] == 1
+    worker.shutdown(0)
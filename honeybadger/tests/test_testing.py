@@ -0,0 +1,100 @@
+import gzip
+import http.client
+import json
+import time
+
+from honeybadger.config import Configuration
+from honeybadger.connection import send_events
+from honeybadger.testing import FakeAPIServer, run_load
+from honeybadger.types import EventsSendStatus
+from six.moves.urllib import error, request
+
+
+def post(server, path, body, headers=None):
+    req = request.Request(
+        server.url + path,
+        data=body,
+        headers=dict({"X-API-Key": "abc"}, **(headers or {})),
+    )
+    try:
+        with request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except error.HTTPError as e:
+        return e.code, None
+
+
+def test_records_notices_and_events():
+    with FakeAPIServer() as server:
+        status, body = post(server, "/v1/notices/", b'{"error": {"class": "E"}}')
+        assert status == 201
+        assert body["id"]
+
+        events = b'{"n": 1}\n{"n": 2}'
+        status, _ = post(
+            server,
+            "/v1/events/",
+            gzip.compress(events),
+            {"Content-Encoding": "gzip"},
+        )
+        assert status == 201
+
+        assert server.notices == [{"error": {"class": "E"}}]
+        assert server.events == [{"n": 1}, {"n": 2}]
+        stats = server.stats()
+        assert stats["requests"] == 2
+        assert stats["notices"] == 1
+        assert stats["events"] == 2
+        assert stats["statuses"] == {201: 2}
+
+
+def test_injects_faults():
+    with FakeAPIServer(throttle_rate=1.0) as server:
+        assert post(server, "/v1/events/", b"{}")[0] == 429
+        server.throttle_rate = 0.0
+        server.error_rate = 1.0
+        assert post(server, "/v1/events/", b"{}")[0] == 503
+        server.error_rate = 0.0
+        server.scripted_statuses.extend([500, 201])
+        assert post(server, "/v1/events/", b"{}")[0] == 500
+        assert post(server, "/v1/events/", b"{}")[0] == 201
+        assert server.events == [{}]
+
+
+def test_checks_api_key():
+    with FakeAPIServer(api_key="secret") as server:
+        assert post(server, "/v1/notices/", b"{}")[0] == 403
+        assert server.stats()["notices"] == 0
+
+
+def test_answers_keep_alive_requests_without_delay():
+    with FakeAPIServer(record=False) as server:
+        conn = http.client.HTTPConnection(server.url.split("//")[1])
+        start = time.monotonic()
+        for _ in range(20):
+            conn.request("POST", "/v1/events/", body=b"{}")
+            conn.getresponse().read()
+        elapsed = time.monotonic() - start
+        conn.close()
+    assert elapsed < 0.4, f"{elapsed / 20 * 1000:.0f}ms per request"
+
+
+def test_client_sends_to_server():
+    with FakeAPIServer(throttle_rate=1.0) as server:
+        config = Configuration(api_key="abc", endpoint=server.url)
+        result = send_events(config, [{"event_type": "x"}])
+        assert result.status == EventsSendStatus.THROTTLING
+
+        server.throttle_rate = 0.0
+        result = send_events(config, [{"event_type": "x"}])
+        assert result.status == EventsSendStatus.OK
+        assert server.events == [{"event_type": "x"}]
+
+
+def test_run_load():
+    # In a child process, so notices other tests left queued don't slow it down
+    report = run_load(processes=1, threads=2, duration=0.3, notice_ratio=0.2, rate=50)
+    assert report.events_attempted > 0
+    assert report.event_drop_rate == 0.0
+    assert report.server["events"] == report.events_attempted
+    assert report.server["notices"] == report.notices_attempted
+    assert "events:" in report.format()
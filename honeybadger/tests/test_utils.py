@@ -1,7 +1,11 @@
+import gzip
 import time
+import zlib
 from unittest.mock import patch
 
+from honeybadger.config import Configuration
 from honeybadger.utils import (
+    compress_body,
     filter_dict,
     filter_env_vars,
     get_duration,
@@ -108,3 +112,36 @@ def test_sanitize_request_id():
     assert sanitize_request_id(None) is None
     assert sanitize_request_id("") is None
     assert sanitize_request_id("   ") is None
+
+
+def test_compress_body_disabled_by_default():
+    data = b"x" * 10_000
+    assert compress_body(Configuration(), data) == (data, None)
+
+
+def test_compress_body_gzip():
+    config = Configuration(compression="gzip", compression_threshold=10)
+    data = b'{"event_type": "db.query"}\n' * 100
+    body, encoding = compress_body(config, data)
+    assert encoding == "gzip"
+    assert len(body) < len(data)
+    assert gzip.decompress(body) == data
+
+
+def test_compress_body_deflate():
+    config = Configuration(compression="deflate", compression_threshold=10)
+    data = b'{"event_type": "db.query"}\n' * 100
+    body, encoding = compress_body(config, data)
+    assert encoding == "deflate"
+    assert zlib.decompress(body) == data
+
+
+def test_compress_body_skips_small_bodies():
+    config = Configuration(compression="gzip", compression_threshold=1024)
+    assert compress_body(config, b"{}") == (b"{}", None)
+
+
+def test_compress_body_unknown_method_sends_uncompressed(caplog):
+    config = Configuration(compression="brotli", compression_threshold=0)
+    assert compress_body(config, b"{}") == (b"{}", None)
+    assert "Unknown compression method 'brotli'" in caplog.text
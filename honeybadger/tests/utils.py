@@ -1,13 +1,16 @@
 from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from mock import patch
 from mock import DEFAULT
+import dataclasses
 import inspect
 import six
 import time
 from functools import wraps
-from threading import Event
+from threading import Event, Thread
+from types import SimpleNamespace
 from honeybadger import honeybadger
-from honeybadger.config import Configuration
+from honeybadger.config import BaseConfig, Configuration
 
 
 @contextmanager
@@ -19,7 +22,8 @@ def mock_urlopen(func, status=201):
         return DEFAULT
 
     with patch(
-        "six.moves.urllib.request.urlopen", side_effect=mock_was_called
+        "honeybadger.http_pool.HTTPConnectionPool.urlopen",
+        side_effect=mock_was_called,
     ) as request_mock:
         yield request_mock
         mock_called_event.wait(0.5)
@@ -60,3 +64,56 @@ def with_config(config):
         return wrapper
 
     return decorator
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Answers every POST with server.status and records (path, client, body)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append((self.path, self.client_address, body))
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "2")
+        if self.server.close_after_response:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b"{}")
+        if self.server.silently_close:
+            # Close without announcing it, like an expired keep-alive.
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def recording_server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    srv.requests = []
+    srv.status = 201
+    srv.close_after_response = False
+    srv.silently_close = False
+    t = Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    t.start()
+    try:
+        yield srv
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def events_config(**settings):
+    """
+    A bare config for an EventsWorker: the default events settings and
+    shutdown_timeout, with settings on top.
+    """
+    defaults = BaseConfig()
+    values = {
+        f.name: getattr(defaults, f.name)
+        for f in dataclasses.fields(BaseConfig)
+        if f.name.startswith("events_") or f.name == "shutdown_timeout"
+    }
+    values.update(settings)
+    return SimpleNamespace(**values)
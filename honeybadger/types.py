@@ -7,12 +7,17 @@ class EventsSendStatus(Enum):
     OK = "ok"
     THROTTLING = "throttling"
     ERROR = "error"
+    # The API refused the payload itself (4xx); sending it again won't help.
+    REJECTED = "rejected"
+    # Not attempted: the circuit breaker is open. Try again after retry_after.
+    CIRCUIT_OPEN = "circuit_open"
 
 
 @dataclass(frozen=True)
 class EventsSendResult:
     status: EventsSendStatus
     reason: Optional[str] = None
+    retry_after: Optional[float] = None  # seconds
 
 
 Notice = Dict[str, Any]
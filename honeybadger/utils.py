@@ -1,6 +1,15 @@
 import json
+import logging
+import os
 import time
 import re
+import gzip
+import weakref
+import zlib
+
+from . import serializer
+
+logger = logging.getLogger(__name__)
 
 
 class StringReprJSONEncoder(json.JSONEncoder):
@@ -11,6 +20,60 @@ class StringReprJSONEncoder(json.JSONEncoder):
             return "[unserializable]"
 
 
+_fork_aware: "weakref.WeakSet[object]" = weakref.WeakSet()
+
+
+def reinit_after_fork(obj):
+    """
+    Call obj._after_fork() in each forked child for as long as obj is alive,
+    so it can replace locks and connections inherited from the parent.
+    """
+    _fork_aware.add(obj)
+
+
+def _after_fork_in_child():
+    for obj in list(_fork_aware):
+        obj._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def encode_events(events):
+    """Encode a batch of events as an NDJSON request body."""
+    return b"\n".join(serializer.dumps(it) for it in events)
+
+
+def decode_events(body):
+    """Inverse of encode_events."""
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def compress_body(config, data):
+    """Compress a request body according to config.compression.
+
+    Bodies smaller than config.compression_threshold are sent as-is, since the
+    gzip/deflate framing would outweigh the savings. An unknown method is
+    logged and the body sent as-is, so a bad setting never stops a report.
+
+    :return: a tuple of (body, content_encoding); content_encoding is None
+        when the body was left uncompressed.
+    """
+    method = (config.compression or "none").lower()
+    if method == "none" or len(data) < config.compression_threshold:
+        return data, None
+
+    level = config.compression_level
+    if method == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0), "gzip"
+    if method == "deflate":
+        return zlib.compress(data, level), "deflate"
+
+    logger.warning("Unknown compression method %r: sending uncompressed", method)
+    return data, None
+
+
 # List of allowed CGI environment variables
 CGI_ALLOWLIST = [
     "AUTH_TYPE",
@@ -18,7 +18,7 @@ setup(
     author="Dave Sullivan",
     author_email="dave@davesullivan.ca",
     license="MIT",
-    packages=["honeybadger", "honeybadger.contrib"],
+    packages=["honeybadger", "honeybadger.contrib", "honeybadger.testing"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -30,4 +30,5 @@ setup(
         "Topic :: System :: Monitoring",
     ],
     install_requires=["psutil", "six"],
+    entry_points={"console_scripts": ["honeybadger=honeybadger.cli:main"]},
 )